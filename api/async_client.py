@@ -0,0 +1,244 @@
+"""
+Asyncio client for the Arkham REST API.
+
+Mirrors api/trading_api.py and api/market_api.py on top of one shared
+aiohttp session, so a single event loop can drive many concurrent requests.
+Return values on failure match the sync functions (None or an empty list).
+"""
+import asyncio
+import logging
+import time
+from urllib.parse import urlencode
+import aiohttp
+from api import retry
+from api.metrics import get_metrics
+from api.pair_registry import get_pair_registry
+from api.scheduler import get_scheduler
+from api.trading_api import build_order, after_place, after_cancel
+from config.api_config import (
+    BASE_URL,
+    HTTP_CONNECT_TIMEOUT,
+    HTTP_READ_TIMEOUT,
+    ASYNC_HTTP_POOL_SIZE
+)
+from utils.auth import get_signer
+
+logger = logging.getLogger(__name__)
+
+class AsyncArkhamClient:
+    def __init__(self, pool_size=ASYNC_HTTP_POOL_SIZE):
+        self.logger = logging.getLogger(__name__)
+        self.pool_size = pool_size
+        self.session = None
+        self.pair_registry = get_pair_registry()
+        self._pairs_lock = None
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def open(self):
+        """Create the shared session; called lazily by every request"""
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_size,
+                keepalive_timeout=60,
+                ttl_dns_cache=300
+            )
+            timeout = aiohttp.ClientTimeout(
+                sock_connect=HTTP_CONNECT_TIMEOUT,
+                sock_read=HTTP_READ_TIMEOUT
+            )
+            self.session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=timeout,
+                auto_decompress=True,
+                headers={
+                    'Accept': 'application/json',
+                    'Accept-Encoding': 'gzip, deflate'
+                }
+            )
+        return self.session
+
+    async def close(self):
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
+        self.session = None
+
+    async def _request(self, method, path, params=None, data=None, signed=False):
+        """Send a request and return (status, parsed body or text), retrying transient failures"""
+        session = await self.open()
+        policy = retry.policy_for(method, path)
+
+        # Sign exactly the query string and body bytes that go on the wire
+        query = f"?{urlencode(params)}" if params else ""
+        body = get_signer().encode(data) if data is not None else b''
+        scheduler = get_scheduler()
+        timer = get_metrics().timed(method, path)
+
+        async def send(deadline):
+            timer.attempt()
+            # Wait for a rate-limit slot before signing so the expiry window is not spent queueing
+            await scheduler.acquire_async(method, path)
+            headers = get_signer().sign(method, f"{path}{query}", body) if signed else None
+            try:
+                async with session.request(
+                    method,
+                    f"{BASE_URL}{path}{query}",
+                    data=body or None,
+                    headers=headers,
+                    timeout=aiohttp.ClientTimeout(total=max(0.05, deadline - time.monotonic()))
+                ) as response:
+                    scheduler.observe(path, response.status, response.headers)
+                    timer.response(response.status)
+                    if response.status in retry.RETRYABLE_STATUSES:
+                        raise retry.ApiError(response.status, await response.text())
+                    if response.status == 200:
+                        return response.status, await response.json(content_type=None)
+                    return response.status, await response.text()
+            except aiohttp.ClientConnectorError as e:
+                # Never reached the exchange: safe to retry any request
+                raise retry.ApiError(None, str(e), retryable=True) from e
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                raise retry.ApiError(None, str(e) or type(e).__name__, retryable=policy.idempotent) from e
+
+        with timer:
+            status, result = await retry.call_async(path, send, policy)
+            timer.failed = status != 200
+        return status, result
+
+    async def get_trading_pairs(self):
+        try:
+            status, result = await self._request('GET', '/public/pairs')
+            if status == 200:
+                return result
+            self.logger.error(f"Failed to get trading pairs: {result}")
+            return []
+        except Exception as e:
+            self.logger.error(f"Error getting trading pairs: {e}")
+            return []
+
+    async def get_ticker(self, symbol):
+        try:
+            status, result = await self._request('GET', '/public/ticker', params={'symbol': symbol})
+            if status == 200:
+                return result
+            self.logger.error(f"Failed to get ticker: {result}")
+            return None
+        except Exception as e:
+            self.logger.error(f"Error getting ticker: {e}")
+            return None
+
+    async def get_pair_info(self, symbol):
+        """Get trading pair information including minimum sizes and price precision"""
+        try:
+            status, result = await self._request('GET', '/public/pair', params={'symbol': symbol})
+            if status == 200:
+                return result
+            self.logger.error(f"Failed to get pair info: {result}")
+            return None
+        except Exception as e:
+            self.logger.error(f"Error getting pair info: {e}")
+            return None
+
+    async def get_pair_spec(self, symbol):
+        """Get PairSpec from the shared registry, loading it without blocking the loop"""
+        pair = self.pair_registry.pairs.get(symbol)
+        if pair:
+            return pair
+
+        if self._pairs_lock is None:
+            self._pairs_lock = asyncio.Lock()
+        async with self._pairs_lock:
+            # Another task may have loaded the pairs while we waited
+            pair = self.pair_registry.pairs.get(symbol)
+            if pair:
+                return pair
+            pairs = await self.get_trading_pairs()
+            if pairs:
+                self.pair_registry.update(pairs)
+            return self.pair_registry.pairs.get(symbol)
+
+    async def place_order(self, symbol, side, order_type, size, price=None):
+        try:
+            pair = await self.get_pair_spec(symbol)
+            if not pair:
+                raise Exception("Could not get pair information")
+
+            data = build_order(pair, symbol, side, order_type, size, price)
+
+            self.logger.info(f"Placing order: {data}")
+            status, result = None, None
+            try:
+                status, result = await self._request('POST', '/orders/new', data=data, signed=True)
+            finally:
+                after_place(data, result if status == 200 else None)
+            if status == 200:
+                return result
+            self.logger.error(f"Failed to place order: {result}")
+            return None
+        except Exception as e:
+            self.logger.error(f"Error placing order: {e}")
+            return None
+
+    async def cancel_order(self, order_id):
+        try:
+            status, result = None, None
+            try:
+                status, result = await self._request(
+                    'POST', '/orders/cancel', data={"orderId": order_id}, signed=True
+                )
+            finally:
+                after_cancel(order_id, result if status == 200 else None)
+            if status == 200:
+                return result
+            self.logger.error(f"Failed to cancel order: {result}")
+            return None
+        except Exception as e:
+            self.logger.error(f"Error canceling order: {e}")
+            return None
+
+    async def get_balances(self):
+        try:
+            status, result = await self._request('GET', '/account/balances', signed=True)
+            if status == 200:
+                return result
+            self.logger.error(f"Failed to get balances: {result}")
+            return []
+        except Exception as e:
+            self.logger.error(f"Error getting balances: {e}")
+            return []
+
+    async def get_order_history(self, symbol=None, limit=100):
+        try:
+            params = {}
+            if symbol:
+                params['symbol'] = symbol
+            params['limit'] = limit
+
+            status, result = await self._request('GET', '/orders/history', params=params, signed=True)
+            if status == 200:
+                return result
+            self.logger.error(f"Failed to get order history: {result}")
+            return []
+        except Exception as e:
+            self.logger.error(f"Error getting order history: {e}")
+            return []
+
+    async def get_active_orders(self, symbol=None):
+        try:
+            params = {}
+            if symbol:
+                params['symbol'] = symbol
+
+            status, result = await self._request('GET', '/orders', params=params, signed=True)
+            if status == 200:
+                return result
+            self.logger.error(f"Failed to get active orders: {result}")
+            return []
+        except Exception as e:
+            self.logger.error(f"Error getting active orders: {e}")
+            return []
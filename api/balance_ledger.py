@@ -0,0 +1,256 @@
+"""
+In-process ledger of free and reserved balances per asset.
+
+Loaded from /account/balances and /orders, then kept current by our own
+placements, cancels and fills so balance checks need no network call.
+A background reconciliation replaces it with the exchange's view to catch
+drift from fees, external trades or missed events. It runs early on
+request, when a fill was seen without its exact execution (market orders,
+fills found by polling).
+"""
+import logging
+import threading
+import time
+from api import trading_api
+from api import pair_registry
+from config.api_config import BALANCE_RECONCILE_INTERVAL
+
+RECONCILE_ATTEMPTS = 3  # fetches tried while local updates keep racing the snapshot
+
+def split_symbol(symbol):
+    """(base, quote) assets for a pair symbol"""
+    pair = pair_registry.get_pair_spec(symbol)
+    if pair and pair.base_symbol and pair.quote_symbol:
+        return pair.base_symbol, pair.quote_symbol
+    base, _, quote = symbol.replace('/', '_').partition('_')
+    return base, quote
+
+class BalanceLedger:
+    def __init__(self, reconcile_interval=BALANCE_RECONCILE_INTERVAL):
+        self.logger = logging.getLogger(__name__)
+        self.reconcile_interval = reconcile_interval
+        self.lock = threading.RLock()
+        self.balances = {}  # asset -> {'free': float, 'reserved': float}
+        self.orders = {}  # orderId -> {'symbol', 'side', 'price', 'remaining', 'asset', 'reserved'}
+        self.loaded_at = 0
+        self.version = 0  # bumped by every local change
+        self.reconcile_thread = None
+        self.wake = threading.Event()  # set to reconcile before the interval is up
+
+    def _asset(self, asset):
+        return self.balances.setdefault(asset, {'free': 0.0, 'reserved': 0.0})
+
+    def _move(self, asset, free=0.0, reserved=0.0):
+        entry = self._asset(asset)
+        entry['free'] += free
+        entry['reserved'] = max(0.0, entry['reserved'] + reserved)
+
+    def ensure_loaded(self):
+        if not self.loaded_at:
+            self.reconcile()
+            self.start_background_reconcile()
+
+    def free(self, asset):
+        self.ensure_loaded()
+        with self.lock:
+            return max(0.0, self.balances.get(asset, {}).get('free', 0.0))
+
+    def reserved(self, asset):
+        self.ensure_loaded()
+        with self.lock:
+            return self.balances.get(asset, {}).get('reserved', 0.0)
+
+    def total(self, asset):
+        return self.free(asset) + self.reserved(asset)
+
+    def open_orders(self, symbol=None, side=None):
+        """Open orders known to the ledger, optionally filtered"""
+        self.ensure_loaded()
+        with self.lock:
+            return [
+                dict(order, orderId=order_id)
+                for order_id, order in self.orders.items()
+                if (symbol is None or order['symbol'] == symbol) and (side is None or order['side'] == side)
+            ]
+
+    def reserved_in_orders(self, symbol, side):
+        """Remaining size of open orders for a symbol and side"""
+        return sum(order['remaining'] for order in self.open_orders(symbol, side))
+
+    def _track(self, order_id, symbol, side, price, remaining):
+        """Reserve funds for an open limit order"""
+        base, quote = split_symbol(symbol)
+        if side == 'sell':
+            asset, amount = base, remaining
+        else:
+            asset, amount = quote, remaining * price
+        self.orders[order_id] = {
+            'symbol': symbol,
+            'side': side,
+            'price': price,
+            'remaining': remaining,
+            'asset': asset,
+            'reserved': amount
+        }
+        return asset, amount
+
+    def record_placed(self, order_id, symbol, side, order_type, size, price=None):
+        """Reserve funds for a limit order we just placed"""
+        if order_id is None or order_type == 'market' or not price:
+            # Market orders reserve nothing; they fill at once at a price we don't
+            # learn without the order stream, so take the exchange's balances
+            if order_id is not None and order_type == 'market':
+                self.request_reconcile()
+            return
+        with self.lock:
+            if order_id in self.orders:
+                return
+            asset, amount = self._track(order_id, symbol, side, float(price), float(size))
+            self._move(asset, free=-amount, reserved=amount)
+            self.version += 1
+
+    def record_cancelled(self, order_id):
+        """Release what is still reserved by a cancelled order"""
+        with self.lock:
+            order = self.orders.pop(order_id, None)
+            if order:
+                self._move(order['asset'], free=order['reserved'], reserved=-order['reserved'])
+                self.version += 1
+
+    def record_all_cancelled(self, symbol=None):
+        """Release reservations after a mass cancel"""
+        with self.lock:
+            for order_id in [o for o, order in self.orders.items() if symbol is None or order['symbol'] == symbol]:
+                self.record_cancelled(order_id)
+
+    def record_fill(self, order_id, symbol, side, fill_size, fill_price, final=False):
+        """Move funds for an execution; final releases anything left reserved"""
+        if not symbol or fill_size <= 0 and not final:
+            return
+        base, quote = split_symbol(symbol)
+        with self.lock:
+            order = self.orders.get(order_id)
+            if fill_size > 0 and fill_price:
+                notional = fill_size * fill_price
+                if side == 'sell':
+                    self._move(quote, free=notional)
+                    if order:
+                        used = min(fill_size, order['reserved'])
+                        order['reserved'] -= used
+                        self._move(base, reserved=-used, free=-(fill_size - used))
+                    else:
+                        self._move(base, free=-fill_size)
+                else:
+                    self._move(base, free=fill_size)
+                    if order:
+                        used = min(fill_size * order['price'], order['reserved'])
+                        order['reserved'] -= used
+                        # Fills better than the limit price return the difference
+                        self._move(quote, reserved=-used, free=used - notional)
+                    else:
+                        self._move(quote, free=-notional)
+                if order:
+                    order['remaining'] = max(0.0, order['remaining'] - fill_size)
+            if final:
+                order = self.orders.pop(order_id, None)
+                if order:
+                    self._move(order['asset'], free=order['reserved'], reserved=-order['reserved'])
+            self.version += 1
+
+    def record_closed(self, order_id, fill_price=None):
+        """An order found gone by polling, not cancelled: its remainder filled at fill_price or its limit"""
+        with self.lock:
+            order = self.orders.get(order_id)
+            if order:
+                self.record_fill(order_id, order['symbol'], order['side'], order['remaining'],
+                                 fill_price or order['price'], final=True)
+        # The actual executions are only known to the exchange
+        self.request_reconcile()
+
+    def apply_order_event(self, event):
+        """Update from an api.order_stream.OrderEvent"""
+        if event.type == 'cancel':
+            if event.fill_size > 0:
+                self.record_fill(event.order_id, event.symbol, event.side, event.fill_size, event.fill_price)
+            self.record_cancelled(event.order_id)
+        elif event.type in ('fill', 'partial_fill'):
+            self.record_fill(
+                event.order_id, event.symbol, event.side,
+                event.fill_size, event.fill_price,
+                final=event.type == 'fill'
+            )
+
+    def reconcile(self):
+        """Replace the ledger with the exchange's balances and open orders.
+
+        Local updates landing during the fetch may be missing from the
+        snapshot, so it is fetched again; after RECONCILE_ATTEMPTS it is
+        taken anyway, the exchange being the reference and the next round
+        catching what it missed.
+        """
+        for attempt in range(RECONCILE_ATTEMPTS):
+            version = self.version
+            balances = trading_api.get_balances()
+            if not balances:
+                self.logger.error("Balance reconciliation failed: no balances")
+                return False
+            orders = trading_api.get_active_orders()
+            if self.version == version or not self.loaded_at:
+                break
+            self.logger.debug(f"Balance snapshot raced local updates (attempt {attempt + 1})")
+
+        with self.lock:
+            drift = {}
+            new_balances = {}
+            for balance in balances:
+                free = float(balance.get('free') or 0)
+                total = float(balance.get('balance') or free)
+                new_balances[balance['symbol']] = {'free': free, 'reserved': max(0.0, total - free)}
+                old = self.balances.get(balance['symbol'])
+                if old and abs(old['free'] - free) > 1e-9:
+                    drift[balance['symbol']] = free - old['free']
+
+            self.balances = new_balances
+            self.orders = {}
+            for order in orders or []:
+                remaining = float(order.get('size') or 0) - float(order.get('executedSize') or 0)
+                if remaining > 0:
+                    self._track(order['orderId'], order['symbol'], order['side'], float(order.get('price') or 0), remaining)
+
+            if drift and self.loaded_at:
+                self.logger.info(f"Balance ledger corrected drift: {drift}")
+            self.loaded_at = time.time()
+            self.version += 1
+        return True
+
+    def request_reconcile(self):
+        """Reconcile in the background now instead of at the next interval"""
+        self.wake.set()
+
+    def start_background_reconcile(self):
+        """Reconcile with the exchange in a daemon thread every reconcile_interval"""
+        if self.reconcile_thread and self.reconcile_thread.is_alive():
+            return
+        self.reconcile_thread = threading.Thread(target=self._reconcile_loop, daemon=True)
+        self.reconcile_thread.start()
+
+    def _reconcile_loop(self):
+        while True:
+            self.wake.wait(self.reconcile_interval)
+            self.wake.clear()
+            try:
+                self.reconcile()
+            except Exception as e:
+                self.logger.error(f"Error reconciling balances: {e}")
+
+_ledger = None
+_ledger_lock = threading.Lock()
+
+def get_balance_ledger():
+    """Get the shared balance ledger, loaded on first read"""
+    global _ledger
+    if _ledger is None:
+        with _ledger_lock:
+            if _ledger is None:
+                _ledger = BalanceLedger()
+    return _ledger
@@ -0,0 +1,85 @@
+"""
+Single-flight coalescing for repeated account reads.
+
+Callers asking for the same key while a request is in flight wait for it
+instead of sending their own, and answers stay fresh for a short window.
+Our own order placements and cancels invalidate everything.
+"""
+import copy
+import threading
+import time
+from config.api_config import READ_COALESCE_WINDOW
+
+class _Call:
+    def __init__(self, generation):
+        self.done = threading.Event()
+        self.generation = generation
+        self.result = None
+        self.error = None
+
+class SingleFlight:
+    def __init__(self, window=READ_COALESCE_WINDOW):
+        self.window = window
+        self.lock = threading.Lock()
+        self.inflight = {}  # key -> _Call
+        self.cache = {}  # key -> (monotonic time, result)
+        self.generation = 0
+        self.stats = {'calls': 0, 'executed': 0, 'shared_inflight': 0, 'served_fresh': 0}
+
+    def do(self, key, fn):
+        """Return fn()'s result, sharing it with identical concurrent or recent calls"""
+        with self.lock:
+            self.stats['calls'] += 1
+            cached = self.cache.get(key)
+            if cached and time.monotonic() - cached[0] <= self.window:
+                self.stats['served_fresh'] += 1
+                return copy.deepcopy(cached[1])
+
+            call = self.inflight.get(key)
+            if call is not None:
+                self.stats['shared_inflight'] += 1
+                leader = False
+            else:
+                call = _Call(self.generation)
+                self.inflight[key] = call
+                self.stats['executed'] += 1
+                leader = True
+
+        if leader:
+            try:
+                call.result = fn()
+            except Exception as e:
+                call.error = e
+            with self.lock:
+                if self.inflight.get(key) is call:
+                    del self.inflight[key]
+                # A result that started before an invalidation may already be stale
+                if call.error is None and call.generation == self.generation:
+                    self.cache[key] = (time.monotonic(), call.result)
+            call.done.set()
+        else:
+            call.done.wait()
+
+        if call.error is not None:
+            raise call.error
+        # Callers get their own copy so one caller's edits do not leak into another's
+        return copy.deepcopy(call.result)
+
+    def invalidate(self):
+        """Drop cached answers; reads already in flight are not reused by new callers"""
+        with self.lock:
+            self.generation += 1
+            self.cache.clear()
+            self.inflight.clear()
+
+    def get_stats(self):
+        with self.lock:
+            stats = dict(self.stats)
+        stats['saved'] = stats['shared_inflight'] + stats['served_fresh']
+        return stats
+
+_account_reads = SingleFlight()
+
+def get_account_reads():
+    """Get the coalescer shared by balance and active-order reads"""
+    return _account_reads
@@ -1,12 +1,18 @@
-import requests
 import logging
-from config.api_config import BASE_URL
+from api import transport
+from api.market_stream import get_market_stream
+from api import pair_registry
+from api.tick_store import RECORDING, get_tick_store
+from config.api_config import TRANSPORT_MODE
 
 logger = logging.getLogger(__name__)
 
+# A replayed session has no live socket; its prices come from the recorded REST calls
+USE_MARKET_STREAM = TRANSPORT_MODE != 'replay'
+
 def get_trading_pairs():
     try:
-        response = requests.get(f"{BASE_URL}/public/pairs")
+        response = transport.get("/public/pairs")
         if response.status_code == 200:
             return response.json()
         else:
@@ -18,12 +24,61 @@ def get_trading_pairs():
 
 def get_ticker(symbol):
     try:
-        response = requests.get(f"{BASE_URL}/public/ticker?symbol={symbol}")
+        response = transport.get("/public/ticker", params={'symbol': symbol})
         if response.status_code == 200:
-            return response.json()
+            ticker = response.json()
+            if RECORDING and ticker and ticker.get('price'):
+                get_tick_store().record_price(symbol, float(ticker['price']))
+            return ticker
         else:
             logger.error(f"Failed to get ticker: {response.text}")
             return None
     except Exception as e:
         logger.error(f"Error getting ticker: {e}")
-        return None
\ No newline at end of file
+        return None
+
+def get_current_price(symbol):
+    """Last price from the WebSocket feed, falling back to REST when it is down"""
+    if USE_MARKET_STREAM:
+        try:
+            stream = get_market_stream()
+            stream.track(symbol)
+            price = stream.get_price(symbol)
+            if price:
+                return price
+        except Exception as e:
+            logger.error(f"Error reading price from market stream: {e}")
+
+    ticker = get_ticker(symbol)
+    if ticker and 'price' in ticker:
+        return float(ticker['price'])
+    return None
+
+def get_book_top(symbol):
+    """Best bid and ask from the WebSocket feed, or None when it is down"""
+    if not USE_MARKET_STREAM:
+        return None
+    try:
+        stream = get_market_stream()
+        stream.track(symbol)
+        quote = stream.get_quote(symbol)
+        if quote and quote.get('bid') and quote.get('ask'):
+            return quote['bid'], quote['ask']
+    except Exception as e:
+        logger.error(f"Error reading book top from market stream: {e}")
+    return None
+
+def get_order_book(symbol):
+    """Local L2 book fed by the WebSocket, or None when it is down or resyncing"""
+    if not USE_MARKET_STREAM:
+        return None
+    try:
+        pair = pair_registry.get_pair_spec(symbol)
+        if not pair:
+            return None
+        stream = get_market_stream()
+        stream.track_book(symbol, pair.tick)
+        return stream.get_book(symbol)
+    except Exception as e:
+        logger.error(f"Error reading order book: {e}")
+        return None
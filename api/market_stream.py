@@ -0,0 +1,149 @@
+"""
+Public market-data feed over WS_URL.
+
+Keeps the last trade price and best bid/ask per symbol in memory so price
+checks cost nothing. Readers fall back to REST when the socket is down.
+"""
+import logging
+import threading
+import time
+from api.order_book import OrderBook
+from api.tick_store import RECORDING, get_tick_store
+from api.ws_client import WebSocketClient
+from config.api_config import WS_URL, WS_STALE_AFTER
+
+logger = logging.getLogger(__name__)
+
+class MarketStream(WebSocketClient):
+    def __init__(self, url=WS_URL, stale_after=WS_STALE_AFTER):
+        super().__init__(url)
+        self.logger = logging.getLogger(__name__)
+        self.stale_after = stale_after
+        # symbol -> {'price', 'price_time', 'bid', 'ask', 'bid_size', 'ask_size', 'top_time'}
+        self.quotes = {}
+        self.symbols = set()
+        self.books = {}  # symbol -> OrderBook
+
+    def track(self, symbol):
+        """Start the feed if needed and subscribe to a symbol's ticker and top of book"""
+        if symbol in self.symbols:
+            return
+        self.symbols.add(symbol)
+        self.subscribe('ticker', {'symbol': symbol})
+        self.subscribe('l1_updates', {'symbol': symbol})
+        self.start()
+
+    def track_book(self, symbol, tick_size):
+        """Maintain a local L2 book for a symbol from snapshot plus deltas"""
+        if symbol in self.books:
+            return
+        self.books[symbol] = OrderBook(symbol, tick_size)
+        self.subscribe('l2_updates', {'symbol': symbol, 'snapshot': True})
+        self.start()
+
+    def get_book(self, symbol):
+        """Synced order book for a symbol, or None while it is down or resyncing"""
+        book = self.books.get(symbol)
+        if not self.connected or not book or not book.is_synced:
+            return None
+        return book
+
+    def resync_book(self, symbol):
+        """Resubscribe to get a fresh snapshot after a sequence gap"""
+        params = {'symbol': symbol, 'snapshot': True}
+        self.unsubscribe('l2_updates', params)
+        self.subscribe('l2_updates', params)
+
+    def _fresh(self, symbol, time_key):
+        """Quote for a symbol if the part stamped by time_key is current, else None"""
+        if not self.connected:
+            return None
+        quote = self.quotes.get(symbol)
+        if not quote or time.monotonic() - quote.get(time_key, float('-inf')) > self.stale_after:
+            return None
+        return quote
+
+    def get_quote(self, symbol):
+        """Latest top of book for a symbol, or None if the feed is down or stale"""
+        return self._fresh(symbol, 'top_time')
+
+    def get_price(self, symbol):
+        """Last trade price; ticker updates keep it fresh, top-of-book updates don't"""
+        quote = self._fresh(symbol, 'price_time')
+        return quote['price'] if quote and quote.get('price') else None
+
+    def on_disconnect(self):
+        # Old quotes must not be served once updates have stopped
+        self.quotes = {}
+        for book in self.books.values():
+            book.is_synced = False
+
+    def on_message(self, message):
+        channel = message.get('channel')
+        data = message.get('data')
+        if not data:
+            return
+        if channel == 'l2_updates':
+            self.on_book_message(message.get('type'), data)
+            return
+        if channel not in ('ticker', 'l1_updates'):
+            return
+
+        symbol = data.get('symbol')
+        if not symbol:
+            return
+
+        # Replace the dict instead of mutating it so readers on other threads see a whole quote
+        quote = dict(self.quotes.get(symbol) or {})
+        if channel == 'ticker':
+            if data.get('price'):
+                quote['price'] = float(data['price'])
+                quote['price_time'] = time.monotonic()
+        else:
+            if data.get('bidPrice'):
+                quote['bid'] = float(data['bidPrice'])
+                quote['bid_size'] = float(data.get('bidSize', 0))
+            if data.get('askPrice'):
+                quote['ask'] = float(data['askPrice'])
+                quote['ask_size'] = float(data.get('askSize', 0))
+            quote['top_time'] = time.monotonic()
+        self.quotes[symbol] = quote
+        if RECORDING:
+            self.record(channel, symbol, quote)
+
+    def record(self, channel, symbol, quote):
+        try:
+            if channel == 'ticker':
+                if quote.get('price'):
+                    get_tick_store().record_price(symbol, quote['price'])
+            elif quote.get('bid') and quote.get('ask'):
+                get_tick_store().record_top(symbol, quote['bid'], quote['ask'], quote['bid_size'], quote['ask_size'])
+        except Exception as e:
+            self.logger.error(f"Error recording market data: {e}")
+
+    def on_book_message(self, message_type, data):
+        book = self.books.get(data.get('symbol'))
+        if not book:
+            return
+        revision = data.get('revisionId')
+        if message_type == 'snapshot':
+            book.apply_snapshot(data.get('bids', []), data.get('asks', []), revision)
+            return
+
+        gaps = book.gaps
+        book.apply_update(data['side'], data['price'], data['size'], revision)
+        if book.gaps > gaps:
+            # Only the update that found the gap triggers a resync
+            self.resync_book(book.symbol)
+
+_stream = None
+_stream_lock = threading.Lock()
+
+def get_market_stream():
+    """Get the shared market stream, created on first use"""
+    global _stream
+    if _stream is None:
+        with _stream_lock:
+            if _stream is None:
+                _stream = MarketStream()
+    return _stream
@@ -0,0 +1,249 @@
+"""
+Per-endpoint request metrics for the API layer.
+
+Every REST call is timed end to end (scheduler wait and retries included),
+counted, and tracked as in flight while it runs. Latencies go into
+cumulative Prometheus buckets plus a window of recent samples for
+p50/p90/p99. Metrics are exported in the Prometheus text format to a file
+(for node_exporter's textfile collector) and/or a local HTTP endpoint.
+"""
+import bisect
+import logging
+import os
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from config.api_config import METRICS_FILE, METRICS_PORT, METRICS_EXPORT_INTERVAL
+
+# Upper bounds in seconds; +Inf is implicit
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUANTILES = (0.5, 0.9, 0.99)
+RECENT_SAMPLES = 1024
+
+logger = logging.getLogger(__name__)
+
+class LatencyHistogram:
+    def __init__(self, buckets=LATENCY_BUCKETS, window=RECENT_SAMPLES):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self.recent = deque(maxlen=window)
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        self.max = max(self.max, seconds)
+        self.recent.append(seconds)
+
+    def quantiles(self, quantiles=QUANTILES):
+        """Quantiles over the recent samples"""
+        samples = sorted(self.recent)
+        if not samples:
+            return {q: 0.0 for q in quantiles}
+        return {q: samples[min(len(samples) - 1, int(q * len(samples)))] for q in quantiles}
+
+class EndpointMetrics:
+    def __init__(self, method, path):
+        self.method = method
+        self.path = path
+        self.latency = LatencyHistogram()
+        self.requests = 0
+        self.errors = 0  # calls that raised or ended in a non-200 response
+        self.retries = 0
+        self.in_flight = 0
+        self.statuses = {}  # HTTP status -> responses, counting every attempt
+
+class CallTimer:
+    """Times one call; set failed when the call returned an error response"""
+
+    def __init__(self, metrics, endpoint):
+        self.metrics = metrics
+        self.endpoint = endpoint
+        self.attempts = 0
+        self.failed = False
+
+    def attempt(self):
+        self.attempts += 1
+        if self.attempts > 1:
+            with self.metrics.lock:
+                self.endpoint.retries += 1
+
+    def response(self, status):
+        with self.metrics.lock:
+            self.endpoint.statuses[status] = self.endpoint.statuses.get(status, 0) + 1
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        with self.metrics.lock:
+            self.endpoint.in_flight += 1
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self.started
+        with self.metrics.lock:
+            self.endpoint.in_flight -= 1
+            self.endpoint.requests += 1
+            if exc_type is not None or self.failed:
+                self.endpoint.errors += 1
+            self.endpoint.latency.observe(elapsed)
+        return False
+
+class ApiMetrics:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.endpoints = {}  # (method, path) -> EndpointMetrics
+
+    def timed(self, method, path):
+        """Context manager timing one API call to method path"""
+        key = (method, path)
+        endpoint = self.endpoints.get(key)
+        if endpoint is None:
+            with self.lock:
+                endpoint = self.endpoints.setdefault(key, EndpointMetrics(method, path))
+        return CallTimer(self, endpoint)
+
+    def snapshot(self):
+        """Summary per endpoint, latencies in milliseconds"""
+        with self.lock:
+            rows = []
+            for endpoint in self.endpoints.values():
+                quantiles = endpoint.latency.quantiles()
+                rows.append({
+                    'method': endpoint.method,
+                    'path': endpoint.path,
+                    'requests': endpoint.requests,
+                    'errors': endpoint.errors,
+                    'retries': endpoint.retries,
+                    'in_flight': endpoint.in_flight,
+                    'p50_ms': quantiles[0.5] * 1000,
+                    'p90_ms': quantiles[0.9] * 1000,
+                    'p99_ms': quantiles[0.99] * 1000,
+                    'max_ms': endpoint.latency.max * 1000
+                })
+        return sorted(rows, key=lambda row: (row['path'], row['method']))
+
+    def render_prometheus(self):
+        """All metrics in the Prometheus text exposition format"""
+        lines = []
+
+        def family(name, kind, help_text):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        with self.lock:
+            endpoints = sorted(self.endpoints.values(), key=lambda e: (e.path, e.method))
+            labels = {e: f'method="{e.method}",endpoint="{e.path}"' for e in endpoints}
+
+            family('arkham_api_requests_total', 'counter', 'API calls, retries included in one call')
+            lines += [f"arkham_api_requests_total{{{labels[e]}}} {e.requests}" for e in endpoints]
+            family('arkham_api_errors_total', 'counter', 'API calls that failed or returned a non-200 status')
+            lines += [f"arkham_api_errors_total{{{labels[e]}}} {e.errors}" for e in endpoints]
+            family('arkham_api_retries_total', 'counter', 'Extra attempts made by the retry policy')
+            lines += [f"arkham_api_retries_total{{{labels[e]}}} {e.retries}" for e in endpoints]
+            family('arkham_api_responses_total', 'counter', 'HTTP responses per status, every attempt')
+            for e in endpoints:
+                lines += [
+                    f'arkham_api_responses_total{{{labels[e]},status="{status}"}} {count}'
+                    for status, count in sorted(e.statuses.items())
+                ]
+            family('arkham_api_in_flight', 'gauge', 'API calls currently running')
+            lines += [f"arkham_api_in_flight{{{labels[e]}}} {e.in_flight}" for e in endpoints]
+
+            family('arkham_api_latency_seconds', 'histogram', 'API call latency including queueing and retries')
+            for e in endpoints:
+                cumulative = 0
+                for bound, count in zip(e.latency.buckets + ('+Inf',), e.latency.counts):
+                    cumulative += count
+                    lines.append(f'arkham_api_latency_seconds_bucket{{{labels[e]},le="{bound}"}} {cumulative}')
+                lines.append(f"arkham_api_latency_seconds_sum{{{labels[e]}}} {e.latency.sum:.6f}")
+                lines.append(f"arkham_api_latency_seconds_count{{{labels[e]}}} {e.latency.count}")
+
+            family('arkham_api_recent_latency_seconds', 'summary', f'API call latency over the last {RECENT_SAMPLES} calls')
+            for e in endpoints:
+                for q, value in e.latency.quantiles().items():
+                    lines.append(f'arkham_api_recent_latency_seconds{{{labels[e]},quantile="{q}"}} {value:.6f}')
+            family('arkham_api_latency_max_seconds', 'gauge', 'Slowest API call since start')
+            lines += [f"arkham_api_latency_max_seconds{{{labels[e]}}} {e.latency.max:.6f}" for e in endpoints]
+        return '\n'.join(lines) + '\n'
+
+    def write_textfile(self, path):
+        """Write the metrics atomically so a scraper never reads a partial file"""
+        tmp = f"{path}.tmp"
+        with open(tmp, 'w') as f:
+            f.write(self.render_prometheus())
+        os.replace(tmp, path)
+
+class MetricsExporter:
+    """Publishes metrics to a file every interval and/or over HTTP at /metrics"""
+
+    def __init__(self, metrics, path=METRICS_FILE, port=METRICS_PORT, interval=METRICS_EXPORT_INTERVAL):
+        self.metrics = metrics
+        self.path = path
+        self.port = port
+        self.interval = interval
+        self.stop_event = threading.Event()
+        self.server = None
+
+    def start(self):
+        if self.path:
+            threading.Thread(target=self._write_loop, daemon=True).start()
+        if self.port:
+            self.server = ThreadingHTTPServer(('127.0.0.1', self.port), self._handler())
+            threading.Thread(target=self.server.serve_forever, daemon=True).start()
+            logger.info(f"Serving metrics on http://127.0.0.1:{self.port}/metrics")
+        return self
+
+    def stop(self):
+        self.stop_event.set()
+        if self.server:
+            self.server.shutdown()
+            self.server = None
+        if self.path:
+            self._write()
+
+    def _write(self):
+        try:
+            self.metrics.write_textfile(self.path)
+        except OSError as e:
+            logger.warning(f"Failed to write metrics to {self.path}: {e}")
+
+    def _write_loop(self):
+        while not self.stop_event.wait(self.interval):
+            self._write()
+
+    def _handler(self):
+        metrics = self.metrics
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                body = metrics.render_prometheus().encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+_metrics = ApiMetrics()
+_exporter = None
+
+def get_metrics():
+    return _metrics
+
+def start_exporter():
+    """Start exporting if METRICS_FILE or METRICS_PORT is configured"""
+    global _exporter
+    if _exporter is None and (METRICS_FILE or METRICS_PORT):
+        _exporter = MetricsExporter(_metrics).start()
+    return _exporter
@@ -0,0 +1,179 @@
+"""
+In-memory L2 order book built from snapshot plus delta messages.
+
+Price levels are kept as integer ticks in a sorted list (best price by
+index, O(log n) lookups) plus a sparse Fenwick tree of sizes, so depth and
+cumulative-size queries never rescan the book.
+"""
+import bisect
+import logging
+import threading
+
+_TREE_SIZE = 1 << 40  # Tick index space, large enough for any price / tick ratio
+
+class _FenwickTree:
+    """Sparse binary indexed tree of level sizes keyed by tick index"""
+
+    def __init__(self):
+        self.tree = {}
+
+    def add(self, index, delta):
+        index += 1  # Fenwick indices start at 1
+        tree = self.tree
+        while index <= _TREE_SIZE:
+            tree[index] = tree.get(index, 0.0) + delta
+            index += index & -index
+
+    def prefix(self, index):
+        """Sum of sizes for ticks 0..index"""
+        index += 1
+        total = 0.0
+        tree = self.tree
+        while index > 0:
+            total += tree.get(index, 0.0)
+            index -= index & -index
+        return total
+
+    def range(self, low, high):
+        """Sum of sizes for ticks low..high inclusive"""
+        if high < low:
+            return 0.0
+        total = self.prefix(high) - (self.prefix(low - 1) if low > 0 else 0.0)
+        return max(0.0, total)
+
+class BookSide:
+    def __init__(self, is_bid):
+        self.is_bid = is_bid
+        self.sizes = {}  # tick -> size
+        self.ticks = []  # Sorted ascending
+        self.sizes_tree = _FenwickTree()
+
+    def set(self, tick, size):
+        """Set the resting size at a tick, removing the level when size is zero"""
+        old = self.sizes.get(tick, 0.0)
+        if size > 0:
+            if tick not in self.sizes:
+                bisect.insort(self.ticks, tick)
+            self.sizes[tick] = size
+        elif tick in self.sizes:
+            del self.sizes[tick]
+            del self.ticks[bisect.bisect_left(self.ticks, tick)]
+        if size != old:
+            self.sizes_tree.add(tick, max(size, 0.0) - old)
+
+    def clear(self):
+        self.sizes = {}
+        self.ticks = []
+        self.sizes_tree = _FenwickTree()
+
+    def best(self):
+        if not self.ticks:
+            return None
+        return self.ticks[-1] if self.is_bid else self.ticks[0]
+
+    def top(self, levels):
+        """Best levels as (tick, size), best first"""
+        ticks = self.ticks[-levels:][::-1] if self.is_bid else self.ticks[:levels]
+        return [(tick, self.sizes[tick]) for tick in ticks]
+
+    def size_between(self, low_tick, high_tick):
+        return self.sizes_tree.range(low_tick, high_tick)
+
+class OrderBook:
+    def __init__(self, symbol, tick_size):
+        self.logger = logging.getLogger(__name__)
+        self.symbol = symbol
+        self.tick_size = float(tick_size)
+        self.bids = BookSide(is_bid=True)
+        self.asks = BookSide(is_bid=False)
+        self.revision = None
+        self.is_synced = False
+        self.gaps = 0
+        self.lock = threading.Lock()
+
+    def to_tick(self, price):
+        return int(round(float(price) / self.tick_size))
+
+    def to_price(self, tick):
+        return tick * self.tick_size
+
+    def side(self, side):
+        return self.bids if side in ('buy', 'bid', 'bids') else self.asks
+
+    def apply_snapshot(self, bids, asks, revision=None):
+        """Replace the book with a full snapshot of [{'price', 'size'}] levels"""
+        with self.lock:
+            self.bids.clear()
+            self.asks.clear()
+            for level in bids:
+                self.bids.set(self.to_tick(level['price']), float(level['size']))
+            for level in asks:
+                self.asks.set(self.to_tick(level['price']), float(level['size']))
+            self.revision = revision
+            self.is_synced = True
+
+    def apply_update(self, side, price, size, revision=None):
+        """Apply one level delta; returns False on a sequence gap so the caller resyncs"""
+        with self.lock:
+            if not self.is_synced:
+                return False
+            if revision is not None and self.revision is not None and revision != self.revision + 1:
+                if revision <= self.revision:
+                    return True  # Already applied
+                self.gaps += 1
+                self.is_synced = False
+                self.logger.warning(f"Order book gap for {self.symbol}: expected {self.revision + 1}, got {revision}")
+                return False
+
+            self.side(side).set(self.to_tick(price), float(size))
+            if revision is not None:
+                self.revision = revision
+            return True
+
+    def best_bid(self):
+        tick = self.bids.best()
+        return self.to_price(tick) if tick is not None else None
+
+    def best_ask(self):
+        tick = self.asks.best()
+        return self.to_price(tick) if tick is not None else None
+
+    def mid_price(self):
+        bid, ask = self.best_bid(), self.best_ask()
+        if bid is None or ask is None:
+            return None
+        return (bid + ask) / 2
+
+    def spread(self):
+        bid, ask = self.best_bid(), self.best_ask()
+        if bid is None or ask is None:
+            return None
+        return ask - bid
+
+    def depth(self, side, ticks):
+        """Total size resting within N ticks of the best price on a side"""
+        book_side = self.side(side)
+        best = book_side.best()
+        if best is None:
+            return 0.0
+        if book_side.is_bid:
+            return book_side.size_between(best - ticks, best)
+        return book_side.size_between(best, best + ticks)
+
+    def cumulative_size(self, side, price):
+        """Size resting at prices as good as or better than price, i.e. queue ahead of it"""
+        book_side = self.side(side)
+        best = book_side.best()
+        if best is None:
+            return 0.0
+        tick = self.to_tick(price)
+        if book_side.is_bid:
+            return book_side.size_between(tick, best)
+        return book_side.size_between(best, tick)
+
+    def size_at(self, side, price):
+        return self.side(side).sizes.get(self.to_tick(price), 0.0)
+
+    def top(self, side, levels=10):
+        """Best levels as (price, size), best first"""
+        return [(self.to_price(tick), size) for tick, size in self.side(side).top(levels)]
@@ -0,0 +1,197 @@
+"""
+Local order and trade store in SQLite (WAL mode).
+
+Order history is synced incrementally: each sync asks for a small page of
+the newest history rows and only widens it while every row on the page is
+new, so a quiet account costs one short response per sync. Order-stream
+updates and fills are written as they arrive. Readers (the GUI history
+table, order-status lookups) query the store instead of the API.
+"""
+import json
+import logging
+import sqlite3
+import threading
+import time
+from api import trading_api
+from api.order_tracker import get_order_tracker
+from config.api_config import ORDER_STORE_FILE, ORDER_HISTORY_PAGE, ORDER_HISTORY_MAX_PAGE
+
+FINAL_STATUSES = ('closed', 'cancelled')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS orders (
+    order_id INTEGER PRIMARY KEY,
+    symbol TEXT NOT NULL,
+    side TEXT,
+    status TEXT,
+    price REAL,
+    size REAL,
+    executed_size REAL,
+    time INTEGER,
+    updated_at REAL,
+    raw TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS orders_symbol_time ON orders (symbol, time DESC);
+CREATE TABLE IF NOT EXISTS trades (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    order_id INTEGER NOT NULL,
+    symbol TEXT,
+    side TEXT,
+    size REAL,
+    price REAL,
+    time REAL
+);
+CREATE INDEX IF NOT EXISTS trades_order ON trades (order_id);
+CREATE INDEX IF NOT EXISTS trades_symbol_time ON trades (symbol, time);
+CREATE TABLE IF NOT EXISTS sync_state (
+    symbol TEXT PRIMARY KEY,
+    synced_at REAL,
+    rows INTEGER
+);
+"""
+
+UPSERT_ORDER = """
+INSERT INTO orders (order_id, symbol, side, status, price, size, executed_size, time, updated_at, raw)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(order_id) DO UPDATE SET
+    status = excluded.status,
+    price = excluded.price,
+    size = excluded.size,
+    executed_size = excluded.executed_size,
+    updated_at = excluded.updated_at,
+    raw = excluded.raw
+"""
+
+def _float(value):
+    try:
+        return float(value) if value not in (None, '') else None
+    except (TypeError, ValueError):
+        return None
+
+class OrderStore:
+    def __init__(self, path=ORDER_STORE_FILE, page=ORDER_HISTORY_PAGE, max_page=ORDER_HISTORY_MAX_PAGE):
+        self.logger = logging.getLogger(__name__)
+        self.path = path
+        self.page = page
+        self.max_page = max_page
+        self.local = threading.local()  # one connection per thread; WAL lets readers run alongside the writer
+        self.sync_lock = threading.Lock()
+        with self._connect() as db:
+            db.executescript(SCHEMA)
+
+    def _connect(self):
+        db = getattr(self.local, 'db', None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=5)
+            db.execute('PRAGMA journal_mode=WAL')
+            db.execute('PRAGMA synchronous=NORMAL')
+            self.local.db = db
+        return db
+
+    def upsert_orders(self, orders):
+        """Insert or update orders as returned by the API or the order stream"""
+        now = time.time()
+        rows = [
+            (
+                order['orderId'], order.get('symbol'), order.get('side'), order.get('status'),
+                _float(order.get('price')), _float(order.get('size')), _float(order.get('executedSize')),
+                order.get('time'), now, json.dumps(order, separators=(',', ':'))
+            )
+            for order in orders if order and order.get('orderId') is not None
+        ]
+        if rows:
+            with self._connect() as db:
+                db.executemany(UPSERT_ORDER, rows)
+        return len(rows)
+
+    def record_trade(self, order_id, symbol, side, size, price):
+        with self._connect() as db:
+            db.execute(
+                'INSERT INTO trades (order_id, symbol, side, size, price, time) VALUES (?, ?, ?, ?, ?, ?)',
+                (order_id, symbol, side, size, price, time.time())
+            )
+
+    def apply_order_event(self, event):
+        """Store an api.order_stream.OrderEvent"""
+        self.upsert_orders([event.order])
+        if event.fill_size > 0:
+            self.record_trade(event.order_id, event.symbol, event.side, event.fill_size, event.fill_price)
+
+    def get_order(self, order_id):
+        row = self._connect().execute('SELECT raw FROM orders WHERE order_id = ?', (order_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def history(self, symbol=None, limit=100):
+        """Closed and cancelled orders, newest first"""
+        query = f"SELECT raw FROM orders WHERE status IN {FINAL_STATUSES}"
+        params = []
+        if symbol:
+            query += ' AND symbol = ?'
+            params.append(symbol)
+        query += ' ORDER BY time DESC LIMIT ?'
+        params.append(limit)
+        return [json.loads(row[0]) for row in self._connect().execute(query, params)]
+
+    def history_version(self, symbol=None):
+        """Changes whenever the stored history for a symbol changes"""
+        query = f"SELECT COUNT(*), MAX(updated_at) FROM orders WHERE status IN {FINAL_STATUSES}"
+        params = ()
+        if symbol:
+            query += ' AND symbol = ?'
+            params = (symbol,)
+        return tuple(self._connect().execute(query, params).fetchone())
+
+    def trades(self, order_id):
+        return [
+            {'size': size, 'price': price, 'time': at}
+            for size, price, at in self._connect().execute(
+                'SELECT size, price, time FROM trades WHERE order_id = ? ORDER BY id', (order_id,)
+            )
+        ]
+
+    def _missing(self, orders):
+        """Orders from a history page that the store does not hold in that state yet"""
+        ids = [order['orderId'] for order in orders]
+        if not ids:
+            return []
+        placeholders = ','.join('?' * len(ids))
+        known = dict(self._connect().execute(
+            f'SELECT order_id, status FROM orders WHERE order_id IN ({placeholders})', ids
+        ).fetchall())
+        return [order for order in orders if known.get(order['orderId']) != order.get('status')]
+
+    def sync_history(self, symbol=None):
+        """Pull history rows the store has not seen; returns how many were new"""
+        with self.sync_lock:
+            page = self.page
+            while True:
+                rows = trading_api.get_order_history(symbol, limit=page)
+                missing = self._missing(rows)
+                # A page of nothing but new rows may have cut off more new rows
+                if len(rows) < page or len(missing) < len(rows) or page >= self.max_page:
+                    break
+                page = min(self.max_page, page * 4)
+
+            self.upsert_orders(missing)
+            for order in missing:
+                get_order_tracker().apply(order)
+            with self._connect() as db:
+                db.execute(
+                    'INSERT OR REPLACE INTO sync_state (symbol, synced_at, rows) VALUES (?, ?, ?)',
+                    (symbol or '', time.time(), len(missing))
+                )
+            if missing:
+                self.logger.debug(f"Synced {len(missing)} new history rows for {symbol or 'all symbols'}")
+            return len(missing)
+
+_store = None
+_store_lock = threading.Lock()
+
+def get_order_store():
+    """Get the shared order store, created on first use"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = OrderStore()
+    return _store
@@ -0,0 +1,138 @@
+"""
+Private order-status stream over WS_URL.
+
+Turns order_statuses updates into fill, partial-fill and cancel events so
+fills are handled as soon as the exchange reports them. REST reconciliation
+is only needed after a reconnect.
+"""
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Optional
+from api.balance_ledger import get_balance_ledger
+from api.coalescer import get_account_reads
+from api.order_store import get_order_store
+from api.tick_store import RECORDING, get_tick_store
+from api.order_tracker import get_order_tracker
+from api.ws_client import WebSocketClient
+from config.api_config import WS_URL
+from utils.auth import generate_auth_headers
+
+FINAL_STATUSES = ('closed', 'cancelled')
+
+@dataclass
+class OrderEvent:
+    type: str  # 'fill', 'partial_fill', 'cancel' or 'update'
+    order_id: str
+    symbol: Optional[str]
+    side: Optional[str]
+    fill_size: float  # Newly executed size carried by this update
+    fill_price: Optional[float]
+    executed_size: float  # Total executed so far
+    avg_price: Optional[float]
+    order: dict
+    received: float = field(default_factory=time.perf_counter)  # For reaction traces
+
+class OrderStream(WebSocketClient):
+    def __init__(self, url=WS_URL):
+        super().__init__(url)
+        self.logger = logging.getLogger(__name__)
+        self.executed = {}  # orderId -> (executed size, its average price) already reported
+        self.order_listeners = []
+        self.reconnect_listeners = []
+        self.subscribe('order_statuses', {'snapshot': True})
+
+    def get_headers(self):
+        headers = generate_auth_headers('GET', '/ws')
+        headers.pop('Content-Type', None)
+        return headers
+
+    def add_order_listener(self, listener):
+        """Called with each OrderEvent, on the stream thread"""
+        self.order_listeners.append(listener)
+
+    def add_reconnect_listener(self, listener):
+        """Called after every (re)connect, when REST reconciliation is due"""
+        self.reconnect_listeners.append(listener)
+
+    def on_connect(self):
+        get_order_tracker().set_live(self, True)
+        for listener in self.reconnect_listeners:
+            listener()
+
+    def on_disconnect(self):
+        # Updates are missed until the next connect; tracked open states are stale
+        get_order_tracker().set_live(self, False)
+
+    def stop(self):
+        super().stop()
+        get_order_tracker().set_live(self, False)
+
+    def on_message(self, message):
+        if message.get('channel') != 'order_statuses':
+            return
+        data = message.get('data')
+        orders = data if isinstance(data, list) else [data]
+        for order in orders:
+            if order:
+                self.process_order_update(order)
+
+    def process_order_update(self, order):
+        """Turn an order snapshot (from the stream or REST) into an event"""
+        order_id = order.get('orderId')
+        if order_id is None:
+            return None
+
+        status = order.get('status')
+        size = float(order.get('size') or 0)
+        executed_size = float(order.get('executedSize') or 0)
+        avg_price = float(order['avgPrice']) if order.get('avgPrice') else None
+
+        # Report only what executed since the last update for this order
+        reported_size, reported_avg = self.executed.get(order_id, (0.0, None))
+        fill_size = max(0.0, executed_size - reported_size)
+        if fill_size > 0 and avg_price and (reported_size == 0 or reported_avg):
+            # One update may aggregate several executions; lastPrice is only the latest of them
+            fill_price = (executed_size * avg_price - reported_size * (reported_avg or 0.0)) / fill_size
+        else:
+            fill_price = order.get('lastPrice') or order.get('avgPrice') or order.get('price')
+
+        if status in FINAL_STATUSES:
+            self.executed.pop(order_id, None)
+        else:
+            self.executed[order_id] = (executed_size, avg_price)
+
+        if status == 'cancelled':
+            event_type = 'cancel'
+        elif status == 'closed' or (size > 0 and executed_size >= size):
+            event_type = 'fill'
+        elif fill_size > 0:
+            event_type = 'partial_fill'
+        else:
+            event_type = 'update'
+
+        event = OrderEvent(
+            type=event_type,
+            order_id=order_id,
+            symbol=order.get('symbol'),
+            side=order.get('side'),
+            fill_size=fill_size,
+            fill_price=float(fill_price) if fill_price else None,
+            executed_size=executed_size,
+            avg_price=avg_price,
+            order=order
+        )
+        if event_type != 'update':
+            # Fills and cancels move balances and open orders; don't serve older reads
+            get_account_reads().invalidate()
+            get_balance_ledger().apply_order_event(event)
+        get_order_tracker().apply(order)
+        try:
+            get_order_store().apply_order_event(event)
+            if RECORDING:
+                get_tick_store().apply_order_event(event)
+        except Exception as e:
+            self.logger.error(f"Error storing order update: {e}")
+        for listener in self.order_listeners:
+            listener(event)
+        return event
@@ -0,0 +1,222 @@
+"""
+In-memory order index keyed by orderId.
+
+Each order carries a lifecycle state (new, partially filled, filled,
+cancelled) with executed and remaining size. It is fed by our own
+submissions and cancels, the private order stream, active-order snapshots
+and synced history, so status checks are a dict lookup instead of REST
+calls and list scans.
+
+States only move forward; a late or duplicated update can never reopen a
+filled or cancelled order, nor reduce its executed size.
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Optional
+
+NEW = 'new'
+PARTIALLY_FILLED = 'partially_filled'
+FILLED = 'filled'
+CANCELLED = 'cancelled'
+
+# Orders that are no longer open are forgotten after RETIRED_TTL seconds, or
+# oldest first once more than MAX_RETIRED of them are kept
+RETIRED_TTL = 3600.0
+MAX_RETIRED = 10000
+
+OPEN_STATES = (NEW, PARTIALLY_FILLED)
+FINAL_STATES = (FILLED, CANCELLED)
+
+TRANSITIONS = {
+    NEW: {NEW, PARTIALLY_FILLED, FILLED, CANCELLED},
+    PARTIALLY_FILLED: {PARTIALLY_FILLED, FILLED, CANCELLED},
+    # Final states only accept repeats, which may still report a larger executed size
+    FILLED: {FILLED},
+    CANCELLED: {CANCELLED}
+}
+
+def _float(value, default=0.0):
+    try:
+        return float(value) if value not in (None, '') else default
+    except (TypeError, ValueError):
+        return default
+
+@dataclass
+class TrackedOrder:
+    order_id: object
+    symbol: str
+    side: str
+    size: float
+    price: Optional[float] = None
+    executed: float = 0.0
+    avg_price: Optional[float] = None
+    state: str = NEW
+    vanished: bool = False  # left the active list before we learned how it ended
+    updated: float = field(default_factory=time.monotonic)
+
+    @property
+    def remaining(self):
+        return 0.0 if self.state in FINAL_STATES else max(0.0, self.size - self.executed)
+
+    @property
+    def is_open(self):
+        return self.state in OPEN_STATES and not self.vanished
+
+def state_of(order):
+    """Lifecycle state for an order dict from the API or the stream"""
+    status = order.get('status')
+    size = _float(order.get('size'))
+    executed = _float(order.get('executedSize'))
+    if status == 'cancelled':
+        return CANCELLED
+    if status == 'closed' or (size > 0 and executed >= size):
+        return FILLED
+    if executed > 0:
+        return PARTIALLY_FILLED
+    return NEW
+
+class OrderTracker:
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self.lock = threading.Lock()
+        self.orders = {}  # orderId -> TrackedOrder
+        self.open_by_symbol = {}  # symbol -> {orderId: TrackedOrder}
+        self.retired = OrderedDict()  # orderId -> monotonic time it stopped being open, oldest first
+        self.live_streams = set()  # Order streams currently connected
+
+    @property
+    def live(self):
+        """True while at least one private order stream is connected"""
+        return bool(self.live_streams)
+
+    def set_live(self, stream, live):
+        """Record whether one order stream is connected; others keep their own state"""
+        with self.lock:
+            if live:
+                self.live_streams.add(stream)
+            else:
+                self.live_streams.discard(stream)
+
+    def get(self, order_id):
+        return self.orders.get(order_id)
+
+    def _index(self, tracked):
+        open_orders = self.open_by_symbol.setdefault(tracked.symbol, {})
+        if tracked.is_open:
+            open_orders[tracked.order_id] = tracked
+            self.retired.pop(tracked.order_id, None)
+        else:
+            open_orders.pop(tracked.order_id, None)
+            if tracked.order_id not in self.retired:
+                self.retired[tracked.order_id] = time.monotonic()
+            self._evict()
+
+    def _evict(self):
+        """Forget filled, cancelled and vanished orders past their TTL or over the cap"""
+        expired = time.monotonic() - RETIRED_TTL
+        while self.retired:
+            order_id, retired_at = next(iter(self.retired.items()))
+            if retired_at > expired and len(self.retired) <= MAX_RETIRED:
+                break
+            self.retired.popitem(last=False)
+            self.orders.pop(order_id, None)
+
+    def _transition(self, tracked, state, executed=None, avg_price=None):
+        if state not in TRANSITIONS[tracked.state]:
+            return False
+        if executed is not None and executed < tracked.executed:
+            # Out-of-order update: keep the newer fill information
+            executed, avg_price = tracked.executed, tracked.avg_price
+        tracked.state = state
+        if executed is not None:
+            tracked.executed = executed
+        if avg_price is not None:
+            tracked.avg_price = avg_price
+        tracked.vanished = False
+        tracked.updated = time.monotonic()
+        self._index(tracked)
+        return True
+
+    def apply(self, order):
+        """Apply an order dict from a submission response, the stream, a snapshot or history"""
+        order_id = order.get('orderId')
+        if order_id is None:
+            return None
+        state = state_of(order)
+        executed = _float(order.get('executedSize'))
+        avg_price = _float(order.get('avgPrice'), None) or None
+        with self.lock:
+            tracked = self.orders.get(order_id)
+            if tracked is None:
+                tracked = self.orders[order_id] = TrackedOrder(
+                    order_id=order_id,
+                    symbol=order.get('symbol'),
+                    side=order.get('side'),
+                    size=_float(order.get('size')),
+                    price=_float(order.get('price'), None) or None,
+                    executed=executed,
+                    avg_price=avg_price,
+                    state=state
+                )
+                self._index(tracked)
+            else:
+                self._transition(tracked, state, executed, avg_price)
+            return tracked
+
+    def track_submitted(self, data, result):
+        """Start tracking an order we just placed"""
+        if not isinstance(result, dict) or result.get('orderId') is None:
+            return None
+        return self.apply({**data, **result})
+
+    def mark_cancelled(self, order_id):
+        with self.lock:
+            tracked = self.orders.get(order_id)
+            if tracked:
+                self._transition(tracked, CANCELLED)
+            return tracked
+
+    def mark_all_cancelled(self, symbol=None):
+        with self.lock:
+            for tracked in list(self.orders.values()):
+                if tracked.state in OPEN_STATES and (symbol is None or tracked.symbol == symbol):
+                    self._transition(tracked, CANCELLED)
+
+    def sync_open(self, active_orders, symbol=None, as_of=None):
+        """Apply an active-orders snapshot taken at monotonic time as_of.
+
+        Tracked open orders missing from it have been filled or cancelled;
+        they are flagged vanished until the outcome is known.
+        """
+        for order in active_orders:
+            self.apply(order)
+        active_ids = {order.get('orderId') for order in active_orders}
+        with self.lock:
+            symbols = [symbol] if symbol else list(self.open_by_symbol)
+            for sym in symbols:
+                for order_id, tracked in list(self.open_by_symbol.get(sym, {}).items()):
+                    # Orders changed after the snapshot was requested may simply not be in it yet
+                    if order_id not in active_ids and (as_of is None or tracked.updated < as_of):
+                        tracked.vanished = True
+                        self._index(tracked)
+
+    def open_orders(self, symbol, side=None):
+        """Open orders for a symbol, optionally one side"""
+        orders = self.open_by_symbol.get(symbol, {})
+        return [tracked for tracked in list(orders.values()) if side is None or tracked.side == side]
+
+    def has_open(self, symbol, side=None):
+        orders = self.open_by_symbol.get(symbol, {})
+        return any(side is None or tracked.side == side for tracked in list(orders.values()))
+
+    def open_size(self, symbol, side):
+        """Remaining size of open orders for a symbol and side"""
+        return sum(tracked.remaining for tracked in self.open_orders(symbol, side))
+
+_tracker = OrderTracker()
+
+def get_order_tracker():
+    return _tracker
@@ -0,0 +1,224 @@
+"""
+Pair metadata registry.
+
+Loads every pair from /public/pairs once, keeps it in a disk cache with a TTL
+and exposes precompiled quantizers so order formatting needs no network call.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from api import market_api
+from config.api_config import PAIR_CACHE_FILE, PAIR_CACHE_TTL
+from utils.fixed_point import Scale, DOWN, UP, NEAREST, to_units
+
+logger = logging.getLogger(__name__)
+
+class PairSpec:
+    """Precision rules for one pair, parsed once when the registry loads.
+
+    Prices and sizes are quantized on fixed-point scales (utils.fixed_point),
+    so rounding and the min-size and min-notional checks are exact integer
+    operations on ticks and lots.
+    """
+
+    __slots__ = (
+        'symbol', 'base_symbol', 'quote_symbol',
+        'tick', 'tick_decimals', 'lot', 'lot_decimals', 'price_scale', 'size_scale',
+        'min_size', 'min_size_str', 'min_lots', 'min_notional', 'min_notional_str', 'min_notional_units', 'info'
+    )
+
+    def __init__(self, info):
+        self.info = info
+        self.symbol = info['symbol']
+        self.base_symbol = info.get('baseSymbol')
+        self.quote_symbol = info.get('quoteSymbol')
+
+        self.price_scale = Scale(str(info['minTickPrice']))
+        self.tick = self.price_scale.step
+        self.tick_decimals = self.price_scale.decimals
+
+        # Sizes are stepped by minLotSize when the exchange reports it
+        self.size_scale = Scale(str(info.get('minLotSize') or info['minSize']))
+        self.lot = self.size_scale.step
+        self.lot_decimals = self.size_scale.decimals
+
+        self.min_size = float(info['minSize'])
+        self.min_size_str = str(info['minSize'])
+        self.min_lots = max(1, self.size_scale.steps(self.min_size_str, UP))
+        self.min_notional = float(info.get('minNotional') or 0)
+        self.min_notional_str = str(info.get('minNotional') or 0)
+        # ticks * lots * step units is a notional in 10**-(tick_decimals + lot_decimals)
+        self.min_notional_units = to_units(self.min_notional_str, self.tick_decimals + self.lot_decimals, UP)
+
+    def price_ticks(self, price, rounding=NEAREST):
+        """Whole number of ticks for a price, nearest by default"""
+        return self.price_scale.steps(price, rounding)
+
+    def size_lots(self, size, rounding=DOWN):
+        """Whole number of lots for a size, rounded down by default"""
+        return self.size_scale.steps(size, rounding)
+
+    def parse_price(self, price, rounding=NEAREST):
+        """Fixed-point price on the tick grid"""
+        return self.price_scale.parse(price, rounding)
+
+    def parse_size(self, size, rounding=DOWN):
+        """Fixed-point size on the lot grid"""
+        return self.size_scale.parse(size, rounding)
+
+    def format_price(self, price):
+        """Round price to the tick grid and format it for the wire"""
+        return self.price_scale.format(self.price_ticks(price))
+
+    def format_size(self, size):
+        """Round size down to the lot grid and format it for the wire"""
+        return self.size_scale.format(self.size_lots(size))
+
+    def meets_min_size(self, size):
+        return self.size_lots(size) >= self.min_lots
+
+    def notional(self, price, size):
+        return float(price) * float(size)
+
+    def notional_units(self, ticks, lots):
+        return ticks * self.price_scale.step_units * lots * self.size_scale.step_units
+
+    def meets_notional(self, price, size):
+        return self.notional_units(self.price_ticks(price), self.size_lots(size)) >= self.min_notional_units
+
+class PairRegistry:
+    def __init__(self, cache_file=PAIR_CACHE_FILE, ttl=PAIR_CACHE_TTL):
+        self.logger = logging.getLogger(__name__)
+        self.cache_file = cache_file
+        self.ttl = ttl
+        self.pairs = {}  # PairSpec by symbol
+        self.loaded_at = 0
+        self.lock = threading.Lock()
+        self.refresh_thread = None
+        self.min_miss_refresh_interval = 60  # seconds between refreshes on unknown symbols
+        self.last_miss_refresh = 0
+        self.min_load_retry_interval = 10  # seconds between load attempts while loading fails
+        self.last_load_attempt = 0
+
+    def get(self, symbol):
+        """Get PairSpec for a symbol, loading the registry on first use"""
+        if not self.pairs:
+            if time.time() - self.last_load_attempt < self.min_load_retry_interval:
+                # The last load failed moments ago; don't hammer the endpoint on every order
+                return None
+            self.last_load_attempt = time.time()
+            if not self.load():
+                return None
+
+        spec = self.pairs.get(symbol)
+        if spec is None and time.time() - self.last_miss_refresh >= self.min_miss_refresh_interval:
+            # New listing since the last load
+            self.last_miss_refresh = time.time()
+            self.refresh()
+            spec = self.pairs.get(symbol)
+        return spec
+
+    def load(self):
+        """Load from the disk cache when fresh, otherwise from /public/pairs"""
+        with self.lock:
+            if self.pairs:
+                return True
+
+            cached_pairs, fetched_at = self._read_cache()
+            if cached_pairs and time.time() - fetched_at < self.ttl:
+                self._index(cached_pairs, fetched_at)
+                self.logger.info(f"Loaded {len(self.pairs)} pairs from cache")
+            elif not self._fetch():
+                if not cached_pairs:
+                    return False
+                self.logger.warning("Using stale pair cache, could not refresh from API")
+                self._index(cached_pairs, fetched_at)
+
+        self.start_background_refresh()
+        return True
+
+    def refresh(self):
+        """Reload all pairs from /public/pairs"""
+        with self.lock:
+            return self._fetch()
+
+    def update(self, pairs, persist=True):
+        """Replace the registry contents with an already fetched pair list"""
+        with self.lock:
+            fetched_at = time.time()
+            self._index(pairs, fetched_at)
+            if persist:
+                self._write_cache(pairs, fetched_at)
+
+    def start_background_refresh(self):
+        """Refresh the registry in a daemon thread each time the TTL expires"""
+        if self.refresh_thread and self.refresh_thread.is_alive():
+            return
+        self.refresh_thread = threading.Thread(target=self._refresh_loop, daemon=True)
+        self.refresh_thread.start()
+
+    def _refresh_loop(self):
+        while True:
+            wait = max(1, self.loaded_at + self.ttl - time.time())
+            time.sleep(wait)
+            if not self.refresh():
+                # Keep serving the current data and retry shortly
+                self.loaded_at = time.time() - self.ttl + 60
+
+    def _fetch(self):
+        try:
+            pairs = market_api.get_trading_pairs()
+            if not pairs:
+                self.logger.error("Failed to load pair metadata")
+                return False
+
+            fetched_at = time.time()
+            self._index(pairs, fetched_at)
+            self._write_cache(pairs, fetched_at)
+            self.logger.info(f"Loaded {len(self.pairs)} pairs from API")
+            return True
+        except Exception as e:
+            self.logger.error(f"Error loading pair metadata: {e}")
+            return False
+
+    def _index(self, pairs, fetched_at):
+        index = {}
+        for info in pairs:
+            try:
+                index[info['symbol']] = PairSpec(info)
+            except (KeyError, ValueError, ArithmeticError) as e:
+                self.logger.warning(f"Skipping pair with invalid metadata {info.get('symbol')}: {e}")
+        # Swap in one step so readers never see a partial index
+        self.pairs = index
+        self.loaded_at = fetched_at
+
+    def _read_cache(self):
+        try:
+            if not os.path.exists(self.cache_file):
+                return None, 0
+            with open(self.cache_file, 'r') as f:
+                cache = json.load(f)
+            return cache['pairs'], float(cache['fetched_at'])
+        except Exception as e:
+            self.logger.warning(f"Could not read pair cache: {e}")
+            return None, 0
+
+    def _write_cache(self, pairs, fetched_at):
+        try:
+            tmp_file = f"{self.cache_file}.tmp"
+            with open(tmp_file, 'w') as f:
+                json.dump({'fetched_at': fetched_at, 'pairs': pairs}, f)
+            os.replace(tmp_file, self.cache_file)
+        except Exception as e:
+            self.logger.warning(f"Could not write pair cache: {e}")
+
+_registry = PairRegistry()
+
+def get_pair_registry():
+    return _registry
+
+def get_pair_spec(symbol):
+    """Get cached PairSpec for a symbol, or None if it is unknown"""
+    return _registry.get(symbol)
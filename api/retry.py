@@ -0,0 +1,232 @@
+"""
+Retry policy engine shared by the REST clients.
+
+Failures are classified first: rate limits, 5xx and connection problems
+are retried with exponential backoff and jitter inside a per-call deadline,
+while rejections such as insufficient balance fail immediately. Each
+endpoint has a circuit breaker so a dead endpoint fails in milliseconds
+instead of timing out on every call.
+"""
+import asyncio
+import logging
+import random
+import threading
+import time
+from dataclasses import dataclass
+import requests
+from config.api_config import (
+    RETRY_ATTEMPTS,
+    RETRY_BASE_DELAY,
+    RETRY_MAX_DELAY,
+    READ_DEADLINE,
+    ORDER_DEADLINE,
+    CIRCUIT_FAILURE_THRESHOLD,
+    CIRCUIT_RESET_TIMEOUT
+)
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+# Statuses that say the request was turned away before it was processed; a
+# 5xx may come after an order was accepted, so placements never retry those
+UNPROCESSED_STATUSES = {429}
+
+class ApiError(Exception):
+    def __init__(self, status, message, retryable=None):
+        super().__init__(f"{status}: {message}" if status else message)
+        self.status = status
+        self.message = message
+        self.retryable = status in RETRYABLE_STATUSES if retryable is None else retryable
+
+class CircuitOpenError(ApiError):
+    def __init__(self, endpoint, retry_in):
+        super().__init__(None, f"Circuit open for {endpoint}, retry in {retry_in:.1f}s", retryable=False)
+        self.endpoint = endpoint
+
+def is_retryable(error, idempotent=True):
+    """Whether a failure is worth retrying; non-idempotent calls only retry if nothing was sent"""
+    if isinstance(error, ApiError):
+        if error.status is None:
+            # Transport failures are classified where they are raised
+            return error.retryable
+        return error.retryable and (idempotent or error.status in UNPROCESSED_STATUSES)
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    if isinstance(error, (requests.exceptions.ReadTimeout, requests.exceptions.ConnectionError)):
+        # The request may have reached the exchange; only safe to repeat reads and cancels
+        return idempotent
+    return False
+
+class Backoff:
+    """Exponential backoff with jitter: each delay is in [d/2, d], d doubling up to max_delay"""
+
+    def __init__(self, base=RETRY_BASE_DELAY, max_delay=RETRY_MAX_DELAY):
+        self.base = base
+        self.max_delay = max_delay
+        self.attempt = 0
+
+    def next(self):
+        delay = min(self.max_delay, self.base * 2 ** self.attempt)
+        self.attempt += 1
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    def reset(self):
+        self.attempt = 0
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    attempts: int = RETRY_ATTEMPTS
+    base_delay: float = RETRY_BASE_DELAY
+    max_delay: float = RETRY_MAX_DELAY
+    deadline: float = READ_DEADLINE
+    idempotent: bool = True
+
+READ_POLICY = RetryPolicy()
+CANCEL_POLICY = RetryPolicy(deadline=ORDER_DEADLINE)
+PLACE_POLICY = RetryPolicy(deadline=ORDER_DEADLINE, idempotent=False)
+
+def policy_for(method, path):
+    if path.startswith('/orders/cancel'):
+        return CANCEL_POLICY
+    if method == 'GET':
+        return READ_POLICY
+    return PLACE_POLICY
+
+class CircuitBreaker:
+    def __init__(self, threshold=CIRCUIT_FAILURE_THRESHOLD, reset_timeout=CIRCUIT_RESET_TIMEOUT):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.trial_running = False
+        self.lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return 'closed'
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return 'half_open'
+        return 'open'
+
+    def allow(self):
+        """Whether a request may go out; in half-open state one trial at a time"""
+        with self.lock:
+            state = self.state
+            if state == 'closed':
+                return True
+            if state == 'half_open' and not self.trial_running:
+                self.trial_running = True
+                return True
+            return False
+
+    def retry_in(self):
+        if self.opened_at is None:
+            return 0.0
+        return max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_running = False
+
+    def release_trial(self):
+        """End a half-open trial that was abandoned before it had an outcome"""
+        with self.lock:
+            self.trial_running = False
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            self.trial_running = False
+            if self.opened_at is not None or self.failures >= self.threshold:
+                # A failed trial re-opens the breaker for another full timeout
+                self.opened_at = time.monotonic()
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+def get_breaker(endpoint):
+    with _breakers_lock:
+        breaker = _breakers.get(endpoint)
+        if breaker is None:
+            breaker = _breakers[endpoint] = CircuitBreaker()
+        return breaker
+
+def _check_breaker(endpoint):
+    breaker = get_breaker(endpoint) if endpoint else None
+    if breaker and not breaker.allow():
+        raise CircuitOpenError(endpoint, breaker.retry_in())
+    return breaker
+
+def is_endpoint_failure(error):
+    """Whether a failure says the endpoint is unhealthy, whether or not it is retried"""
+    if isinstance(error, CircuitOpenError):
+        return False
+    if isinstance(error, ApiError):
+        return error.status is None or error.status in RETRYABLE_STATUSES
+    return isinstance(error, (requests.exceptions.Timeout, requests.exceptions.ConnectionError))
+
+def _after_failure(endpoint, breaker, error, policy, backoff, deadline):
+    """Seconds to wait before the next attempt, or None to give up"""
+    retryable = is_retryable(error, policy.idempotent)
+    if breaker:
+        if is_endpoint_failure(error):
+            breaker.record_failure()
+        else:
+            # The endpoint answered; a rejection says nothing about its health
+            breaker.record_success()
+    if not retryable or backoff.attempt + 1 >= policy.attempts:
+        return None
+    delay = backoff.next()
+    if time.monotonic() + delay >= deadline:
+        return None
+    logger.warning(f"Retrying {endpoint or 'call'} in {delay:.2f}s after: {error}")
+    return delay
+
+def call(endpoint, fn, policy=READ_POLICY):
+    """Run fn(deadline) under the policy; endpoint=None skips the circuit breaker"""
+    deadline = time.monotonic() + policy.deadline
+    backoff = Backoff(policy.base_delay, policy.max_delay)
+    while True:
+        breaker = _check_breaker(endpoint)
+        try:
+            result = fn(deadline)
+        except Exception as e:
+            delay = _after_failure(endpoint, breaker, e, policy, backoff, deadline)
+            if delay is None:
+                raise
+            time.sleep(delay)
+            continue
+        except BaseException:
+            # Cancelled or interrupted: no verdict on the endpoint, but free the trial slot
+            if breaker:
+                breaker.release_trial()
+            raise
+        if breaker:
+            breaker.record_success()
+        return result
+
+async def call_async(endpoint, fn, policy=READ_POLICY):
+    """Coroutine version of call; fn(deadline) must return an awaitable"""
+    deadline = time.monotonic() + policy.deadline
+    backoff = Backoff(policy.base_delay, policy.max_delay)
+    while True:
+        breaker = _check_breaker(endpoint)
+        try:
+            result = await fn(deadline)
+        except Exception as e:
+            delay = _after_failure(endpoint, breaker, e, policy, backoff, deadline)
+            if delay is None:
+                raise
+            await asyncio.sleep(delay)
+            continue
+        except BaseException:
+            # Cancelled or interrupted: no verdict on the endpoint, but free the trial slot
+            if breaker:
+                breaker.release_trial()
+            raise
+        if breaker:
+            breaker.record_success()
+        return result
@@ -0,0 +1,246 @@
+"""
+Rate-limit-aware request scheduler shared by every REST call.
+
+Each endpoint class has a token bucket. Waiting requests are admitted in
+priority order (cancels, then placements, then bot reads, then UI reads),
+and limits tighten when the exchange answers 429 or reports no remaining
+quota in its headers.
+"""
+import asyncio
+import heapq
+import itertools
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from enum import IntEnum
+from config.api_config import RATE_LIMITS, MAX_RATE_LIMIT_PAUSE
+
+class Priority(IntEnum):
+    CANCEL = 0
+    PLACE = 1
+    BOT_READ = 2
+    UI_READ = 3
+
+class TokenBucket:
+    def __init__(self, rate, burst):
+        self.base_rate = float(rate)
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self.tokens = float(burst)
+        self.last = time.monotonic()
+        self.paused_until = 0.0
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.last) * self.rate)
+        self.last = now
+
+    def wait_time(self, now):
+        """Seconds until a token is available"""
+        self._refill(now)
+        if now < self.paused_until:
+            return self.paused_until - now
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def take(self):
+        self.tokens -= 1
+
+    def pause(self, seconds):
+        """Stop admitting requests for a while and halve the rate"""
+        now = time.monotonic()
+        self.paused_until = max(self.paused_until, now + seconds)
+        self.rate = max(self.base_rate * 0.1, self.rate * 0.5)
+        self.tokens = min(self.tokens, 0.0)
+
+    def recover(self):
+        """Creep back towards the configured rate after successful calls"""
+        if self.rate < self.base_rate:
+            self.rate = min(self.base_rate, self.rate * 1.05)
+
+class LaneStats:
+    def __init__(self):
+        self.requests = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.queued = 0
+
+    def record(self, wait):
+        self.requests += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+
+    def as_dict(self):
+        return {
+            'requests': self.requests,
+            'queued': self.queued,
+            'avg_wait_ms': self.total_wait / self.requests * 1000 if self.requests else 0.0,
+            'max_wait_ms': self.max_wait * 1000
+        }
+
+def classify(method, path):
+    """Endpoint class and default priority for a request"""
+    if path.startswith('/public/'):
+        return 'public', Priority.BOT_READ
+    if path.startswith('/orders/cancel'):
+        return 'orders', Priority.CANCEL
+    if path.startswith('/orders/new'):
+        return 'orders', Priority.PLACE
+    return 'account', Priority.BOT_READ
+
+class RequestScheduler:
+    def __init__(self, limits=RATE_LIMITS):
+        self.logger = logging.getLogger(__name__)
+        self.buckets = {name: TokenBucket(rate, burst) for name, (rate, burst) in limits.items()}
+        self.queues = {name: [] for name in limits}
+        self.stats = {priority: LaneStats() for priority in Priority}
+        self.cond = threading.Condition()
+        self.sequence = itertools.count()
+        self.local = threading.local()
+        self.slow_wait_warning = 1.0  # seconds
+
+    @contextmanager
+    def priority(self, priority):
+        """Run reads made in this block (on this thread) in the given lane"""
+        previous = getattr(self.local, 'priority', None)
+        self.local.priority = priority
+        try:
+            yield
+        finally:
+            self.local.priority = previous
+
+    def _resolve(self, method, path, priority):
+        endpoint_class, default = classify(method, path)
+        if priority is None:
+            priority = default
+            override = getattr(self.local, 'priority', None)
+            # Only reads can be moved between lanes; cancels and placements keep theirs
+            if override is not None and default == Priority.BOT_READ:
+                priority = override
+        return endpoint_class, Priority(priority)
+
+    def _try_admit(self, endpoint_class, entry):
+        """Admit entry if it heads its queue and a token is free; else seconds to wait"""
+        queue = self.queues[endpoint_class]
+        if queue[0] != entry:
+            return None
+        wait = self.buckets[endpoint_class].wait_time(time.monotonic())
+        if wait > 0:
+            return wait
+        self.buckets[endpoint_class].take()
+        heapq.heappop(queue)
+        self.cond.notify_all()
+        return 0.0
+
+    def _enqueue(self, endpoint_class, priority):
+        entry = (int(priority), next(self.sequence))
+        heapq.heappush(self.queues[endpoint_class], entry)
+        self.stats[priority].queued += 1
+        return entry
+
+    def _abandon(self, endpoint_class, priority, entry):
+        """Drop a waiter that gave up (cancelled or interrupted) so it cannot block the queue"""
+        queue = self.queues[endpoint_class]
+        if entry in queue:
+            queue.remove(entry)
+            heapq.heapify(queue)
+            self.stats[priority].queued -= 1
+            self.cond.notify_all()
+
+    def _finish(self, priority, path, start):
+        waited = time.monotonic() - start
+        stats = self.stats[priority]
+        stats.queued -= 1
+        stats.record(waited)
+        if waited >= self.slow_wait_warning:
+            self.logger.warning(f"{priority.name} request {path} waited {waited * 1000:.0f} ms for rate limit")
+        return waited
+
+    def acquire(self, method, path, priority=None):
+        """Block until the request may be sent; returns seconds spent waiting"""
+        endpoint_class, priority = self._resolve(method, path, priority)
+        start = time.monotonic()
+        with self.cond:
+            entry = self._enqueue(endpoint_class, priority)
+            admitted = False
+            try:
+                while True:
+                    wait = self._try_admit(endpoint_class, entry)
+                    if wait == 0.0:
+                        admitted = True
+                        break
+                    # Behind another request: woken when the head is admitted
+                    self.cond.wait(timeout=wait if wait is not None else 0.5)
+            finally:
+                if not admitted:
+                    self._abandon(endpoint_class, priority, entry)
+        return self._finish(priority, path, start)
+
+    async def acquire_async(self, method, path, priority=None):
+        """Event-loop friendly acquire sharing the same buckets and lanes"""
+        endpoint_class, priority = self._resolve(method, path, priority)
+        start = time.monotonic()
+        with self.cond:
+            entry = self._enqueue(endpoint_class, priority)
+        admitted = False
+        try:
+            while True:
+                with self.cond:
+                    wait = self._try_admit(endpoint_class, entry)
+                if wait == 0.0:
+                    admitted = True
+                    break
+                await asyncio.sleep(min(wait, 0.05) if wait is not None else 0.01)
+        finally:
+            if not admitted:
+                with self.cond:
+                    self._abandon(endpoint_class, priority, entry)
+        return self._finish(priority, path, start)
+
+    def observe(self, path, status, headers):
+        """Learn from a response: back off on 429 or exhausted quota headers"""
+        endpoint_class, _ = classify('GET', path)
+        bucket = self.buckets[endpoint_class]
+        with self.cond:
+            if status == 429:
+                retry_after = _header_float(headers, 'Retry-After', 1.0)
+                bucket.pause(retry_after)
+                self.logger.warning(f"Rate limited on {path}, pausing {endpoint_class} for {retry_after}s")
+                return
+
+            remaining = _header_float(headers, 'X-RateLimit-Remaining')
+            if remaining is not None and remaining <= 0:
+                reset = _reset_seconds(_header_float(headers, 'X-RateLimit-Reset', 1.0))
+                bucket.pause(reset)
+            else:
+                bucket.recover()
+
+    def get_stats(self):
+        """Queue wait statistics per priority lane"""
+        with self.cond:
+            return {priority.name: stats.as_dict() for priority, stats in self.stats.items()}
+
+def _header_float(headers, name, default=None):
+    try:
+        value = headers.get(name) if headers else None
+        return float(value) if value is not None else default
+    except (TypeError, ValueError):
+        return default
+
+def _reset_seconds(reset):
+    """Pause for an X-RateLimit-Reset value, which venues send as seconds or as an epoch time"""
+    if reset > 1e12:
+        reset = reset / 1000 - time.time()  # Epoch milliseconds
+    elif reset > 1e9:
+        reset -= time.time()  # Epoch seconds
+    return min(MAX_RATE_LIMIT_PAUSE, max(0.0, reset))
+
+_scheduler = RequestScheduler()
+
+def get_scheduler():
+    return _scheduler
+
+def request_priority(priority):
+    """Context manager putting reads on this thread into a lane, e.g. UI refreshes"""
+    return _scheduler.priority(priority)
@@ -0,0 +1,165 @@
+"""
+Record and replay REST traffic for offline profiling.
+
+In record mode every request that goes through the shared session is
+appended to a JSONL tape along with its response and latency. In replay
+mode the session answers from that tape instead of the network, so the
+unchanged api/ functions and the bot loops on top of them can be run and
+profiled deterministically:
+
+    ARKHAM_TRANSPORT_MODE=record python main.py
+    ARKHAM_TRANSPORT_MODE=replay ARKHAM_REPLAY_SPEED=0 python -m benchmarks.bench_replay
+
+Requests are matched on method, path, sorted query and body; auth headers
+are ignored and never written to the tape. Repeated identical requests get
+the recorded responses in order, then the last one again.
+"""
+import json
+import logging
+import threading
+import time
+from collections import defaultdict, deque
+from urllib.parse import urlsplit, parse_qsl, urlencode
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from config.api_config import BASE_URL
+
+TAPE_VERSION = 1
+
+# Response headers worth keeping: the rest is noise for replay
+KEPT_HEADERS = ('Content-Type', 'Retry-After', 'X-RateLimit-Limit', 'X-RateLimit-Remaining', 'X-RateLimit-Reset')
+
+logger = logging.getLogger(__name__)
+
+def request_key(method, url, body):
+    """Stable identity of a request: method, path under BASE_URL, sorted query, body"""
+    parts = urlsplit(url)
+    prefix = urlsplit(BASE_URL).path
+    path = parts.path[len(prefix):] if parts.path.startswith(prefix) else parts.path
+    query = urlencode(sorted(parse_qsl(parts.query)))
+    if isinstance(body, bytes):
+        body = body.decode('utf-8')
+    return method, f"{path}?{query}" if query else path, body or None
+
+class RecordingAdapter(HTTPAdapter):
+    """HTTPAdapter that appends each exchange to a JSONL tape"""
+
+    def __init__(self, tape_path, **kwargs):
+        super().__init__(**kwargs)
+        self.tape_path = tape_path
+        self.write_lock = threading.Lock()
+        self.started = time.monotonic()
+        self.tape = open(tape_path, 'a', encoding='utf-8')
+        self._write({'tape': TAPE_VERSION, 'base_url': BASE_URL, 'started': time.time()})
+
+    def _write(self, record):
+        line = json.dumps(record, separators=(',', ':'))
+        with self.write_lock:
+            self.tape.write(line + '\n')
+            self.tape.flush()
+
+    def send(self, request, **kwargs):
+        method, path, body = request_key(request.method, request.url, request.body)
+        record = {'t': round(time.monotonic() - self.started, 6), 'method': method, 'path': path, 'request': body}
+        start = time.monotonic()
+        try:
+            response = super().send(request, **kwargs)
+            content = response.content  # Read now so the tape holds the full body
+        except Exception as e:
+            record.update(elapsed=round(time.monotonic() - start, 6), error=type(e).__name__, message=str(e))
+            self._write(record)
+            raise
+        record.update(
+            elapsed=round(time.monotonic() - start, 6),
+            status=response.status_code,
+            headers={name: response.headers[name] for name in KEPT_HEADERS if name in response.headers},
+            body=content.decode('utf-8', errors='replace')
+        )
+        self._write(record)
+        return response
+
+    def close(self):
+        super().close()
+        with self.write_lock:
+            self.tape.close()
+
+# Recorded exception names mapped back to what requests would raise
+_ERRORS = {
+    'ConnectTimeout': requests.exceptions.ConnectTimeout,
+    'ReadTimeout': requests.exceptions.ReadTimeout,
+    'Timeout': requests.exceptions.Timeout,
+    'SSLError': requests.exceptions.SSLError
+}
+
+class ReplayAdapter(BaseAdapter):
+    """Adapter that serves responses from a tape instead of the network"""
+
+    def __init__(self, tape_path, speed=1.0):
+        super().__init__()
+        self.speed = speed
+        self.lock = threading.Lock()
+        self.entries = defaultdict(deque)  # request key -> recorded exchanges in order
+        self.last = {}  # request key -> last exchange served
+        self.stats = {'served': 0, 'repeated': 0, 'missed': 0}
+        self.load(tape_path)
+
+    def load(self, tape_path):
+        with open(tape_path, encoding='utf-8') as tape:
+            for line in tape:
+                record = json.loads(line)
+                if 'method' in record:
+                    self.entries[(record['method'], record['path'], record.get('request'))].append(record)
+
+    def _next(self, key):
+        with self.lock:
+            queue = self.entries.get(key)
+            if queue:
+                record = self.last[key] = queue.popleft()
+                self.stats['served'] += 1
+            elif key in self.last:
+                record = self.last[key]
+                self.stats['repeated'] += 1
+            else:
+                self.stats['missed'] += 1
+                return None
+        return record
+
+    def send(self, request, **kwargs):
+        key = request_key(request.method, request.url, request.body)
+        record = self._next(key)
+        if record is None:
+            logger.warning(f"Replay tape has no response for {key[0]} {key[1]}")
+            record = {'status': 404, 'headers': {}, 'body': '{"message":"not recorded"}', 'elapsed': 0}
+
+        if self.speed > 0 and record.get('elapsed'):
+            time.sleep(record['elapsed'] / self.speed)
+
+        if 'error' in record:
+            raise _ERRORS.get(record['error'], requests.exceptions.ConnectionError)(record.get('message'), request=request)
+
+        response = requests.Response()
+        response.status_code = record['status']
+        response.headers = CaseInsensitiveDict(record.get('headers') or {})
+        response._content = record['body'].encode('utf-8')
+        response.encoding = 'utf-8'
+        response.url = request.url
+        response.request = request
+        response.reason = 'OK' if record['status'] == 200 else 'Replayed'
+        return response
+
+    def close(self):
+        pass
+
+def mount(session, mode, tape_path, speed=1.0, **adapter_kwargs):
+    """Install the record or replay adapter on a session; 'live' leaves it untouched"""
+    if mode == 'record':
+        adapter = RecordingAdapter(tape_path, **adapter_kwargs)
+    elif mode == 'replay':
+        adapter = ReplayAdapter(tape_path, speed)
+    else:
+        return None
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    logger.info(f"Transport in {mode} mode using {tape_path}")
+    return adapter
@@ -0,0 +1,243 @@
+"""
+Local market history in memory-mapped columnar files.
+
+Prices the bot observes are appended per symbol under TICK_STORE_DIR:
+ticker prices from the market stream and REST, top of book from
+l1_updates, and the account's own fills from the order stream. Each series
+is a directory of raw float64 columns, one file per column, all growing in
+step and sorted by time:
+
+    ticks/BTC_USDT/ticks/{time,price}.f8
+    ticks/BTC_USDT/tops/{time,bid,ask,bid_size,ask_size}.f8
+    ticks/BTC_USDT/trades/{time,price,size,side}.f8
+
+Rows are buffered and appended in batches. Reads map the files with
+numpy.memmap and return views: a time window is found by binary search,
+narrowed first by a sparse in-memory index (the time of every
+TICK_STORE_INDEX_STRIDE-th row), and sliced without being copied or loaded. ohlcv() buckets a
+window into candles with vectorized reductions over those views.
+"""
+import atexit
+import logging
+import os
+import threading
+import time
+import numpy as np
+from config.api_config import (
+    TRANSPORT_MODE, TICK_STORE_DIR, TICK_STORE_FLUSH_ROWS, TICK_STORE_FLUSH_INTERVAL, TICK_STORE_INDEX_STRIDE
+)
+
+SERIES = {
+    'ticks': ('time', 'price'),
+    'tops': ('time', 'bid', 'ask', 'bid_size', 'ask_size'),
+    'trades': ('time', 'price', 'size', 'side')  # side: 1 buy, -1 sell
+}
+DTYPE = np.dtype(np.float64)
+
+# A replayed session serves recorded prices again; don't append them twice
+RECORDING = bool(TICK_STORE_DIR) and TRANSPORT_MODE != 'replay'
+
+logger = logging.getLogger(__name__)
+
+def ohlcv(columns, interval):
+    """Candles of interval seconds from a series' columns: time, open, high, low, close, volume.
+
+    Prices are the mid for top-of-book rows. Volume is traded size where the
+    series has one, otherwise the number of rows. Buckets without rows are
+    left out.
+    """
+    times = columns['time']
+    if not len(times):
+        return {key: np.empty(0, DTYPE) for key in ('time', 'open', 'high', 'low', 'close', 'volume')}
+    prices = columns['price'] if 'price' in columns else (columns['bid'] + columns['ask']) / 2
+    buckets = np.floor_divide(times, interval)
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(buckets)) + 1))
+    ends = np.append(starts[1:], len(times))
+    if 'size' in columns:
+        volume = np.add.reduceat(columns['size'], starts)
+    else:
+        volume = (ends - starts).astype(DTYPE)
+    return {
+        'time': buckets[starts] * interval,
+        'open': prices[starts],
+        'high': np.maximum.reduceat(prices, starts),
+        'low': np.minimum.reduceat(prices, starts),
+        'close': prices[ends - 1],
+        'volume': volume
+    }
+
+class ColumnSeries:
+    """Append-only float64 columns with one row count, sorted by the time column.
+
+    A read-only series belongs to another process's writer: it never
+    truncates and picks up new rows from the file sizes on every read.
+    """
+
+    def __init__(self, path, columns, flush_rows=TICK_STORE_FLUSH_ROWS, flush_interval=TICK_STORE_FLUSH_INTERVAL,
+                 stride=TICK_STORE_INDEX_STRIDE, readonly=False):
+        self.path = path
+        self.columns = columns
+        self.files = [os.path.join(path, f"{column}.f8") for column in columns]
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
+        self.stride = stride
+        self.readonly = readonly
+        self.lock = threading.Lock()
+        self.buffer = []
+        self.flushed_at = time.monotonic()
+        self.views = {column: np.empty(0, DTYPE) for column in columns}
+        self.mapped = 0
+        self.index = np.empty(0, DTYPE)  # time of every stride-th row
+        if not readonly:
+            os.makedirs(path, exist_ok=True)
+        self.rows = self._stored_rows()
+        if not readonly:
+            self._repair()
+        self.last_time = self._last_time()
+
+    def _stored_rows(self):
+        sizes = [os.path.getsize(file) if os.path.exists(file) else 0 for file in self.files]
+        return min(sizes) // DTYPE.itemsize
+
+    def _repair(self):
+        # A batch torn by a crash leaves some columns longer than others
+        for file in self.files:
+            with open(file, 'ab') as f:
+                f.truncate(self.rows * DTYPE.itemsize)
+
+    def _last_time(self):
+        if not self.rows:
+            return float('-inf')
+        with open(self.files[0], 'rb') as f:
+            f.seek((self.rows - 1) * DTYPE.itemsize)
+            return float(np.frombuffer(f.read(DTYPE.itemsize), DTYPE)[0])
+
+    def __len__(self):
+        with self.lock:
+            return (self._stored_rows() if self.readonly else self.rows) + len(self.buffer)
+
+    def append(self, row):
+        """Add a row (time first); times going backwards are clamped to keep the column sorted"""
+        with self.lock:
+            self.last_time = max(float(row[0]), self.last_time)
+            self.buffer.append((self.last_time,) + tuple(row[1:]))
+            if len(self.buffer) >= self.flush_rows or time.monotonic() - self.flushed_at >= self.flush_interval:
+                self._flush()
+
+    def flush(self):
+        with self.lock:
+            self._flush()
+
+    def _flush(self):
+        self.flushed_at = time.monotonic()
+        if not self.buffer:
+            return
+        block = np.array(self.buffer, dtype=DTYPE)
+        self.buffer = []
+        for j, file in enumerate(self.files):
+            with open(file, 'ab') as f:
+                f.write(np.ascontiguousarray(block[:, j]).tobytes())
+        self.rows += len(block)
+
+    def _view(self):
+        """Column views over every stored row, remapped only when rows were added"""
+        if self.readonly:
+            self.rows = self._stored_rows()
+        else:
+            self._flush()
+        if self.rows != self.mapped:
+            self.views = {
+                column: np.memmap(file, dtype=DTYPE, mode='r', shape=(self.rows,))
+                for column, file in zip(self.columns, self.files)
+            }
+            self.mapped = self.rows
+            indexed = len(self.index) * self.stride
+            if indexed < self.rows:
+                self.index = np.concatenate((self.index, self.views['time'][indexed::self.stride]))
+        return self.views, self.rows
+
+    def _locate(self, times, rows, value, side):
+        """searchsorted(times, value, side), touching one index block of the mapped column"""
+        k = int(np.searchsorted(self.index, value, side))
+        lo = max(k - 1, 0) * self.stride
+        hi = min(k * self.stride, rows)
+        return lo + int(np.searchsorted(times[lo:hi], value, side))
+
+    def range(self, start=None, end=None):
+        """Columns of the rows with start <= time < end, as views of the files"""
+        with self.lock:
+            views, rows = self._view()
+        times = views['time']
+        first = self._locate(times, rows, start, 'left') if start is not None else 0
+        last = self._locate(times, rows, end, 'left') if end is not None else rows
+        return {column: view[first:max(first, last)] for column, view in views.items()}
+
+class TickStore:
+    def __init__(self, root=TICK_STORE_DIR, readonly=False, **series_options):
+        self.root = root
+        self.readonly = readonly
+        self.series_options = series_options
+        self.series = {}  # (symbol, kind) -> ColumnSeries
+        self.lock = threading.Lock()
+
+    def get_series(self, symbol, kind='ticks', create=True):
+        """The ColumnSeries of one symbol and kind; None if it was never recorded and create is off"""
+        key = (symbol, kind)
+        series = self.series.get(key)
+        if series is None:
+            path = os.path.join(self.root, symbol, kind)
+            if (self.readonly or not create) and not os.path.isdir(path):
+                return None
+            with self.lock:
+                series = self.series.get(key)
+                if series is None:
+                    series = self.series[key] = ColumnSeries(path, SERIES[kind], readonly=self.readonly,
+                                                             **self.series_options)
+        return series
+
+    def record_price(self, symbol, price, at=None):
+        self.get_series(symbol, 'ticks').append((at or time.time(), price))
+
+    def record_top(self, symbol, bid, ask, bid_size=0.0, ask_size=0.0, at=None):
+        self.get_series(symbol, 'tops').append((at or time.time(), bid, ask, bid_size, ask_size))
+
+    def record_trade(self, symbol, price, size, side, at=None):
+        self.get_series(symbol, 'trades').append((at or time.time(), price, size, 1.0 if side == 'buy' else -1.0))
+
+    def apply_order_event(self, event):
+        """Record the fill in an api.order_stream.OrderEvent, if it has one"""
+        if event.fill_size > 0 and event.fill_price and event.symbol:
+            self.record_trade(event.symbol, event.fill_price, event.fill_size, event.side)
+
+    def read(self, symbol, kind='ticks', start=None, end=None):
+        """Columns of symbol's kind series with start <= time < end, memory-mapped"""
+        series = self.get_series(symbol, kind, create=False)
+        if series is None:
+            return {column: np.empty(0, DTYPE) for column in SERIES[kind]}
+        return series.range(start, end)
+
+    def ohlcv(self, symbol, interval, start=None, end=None, kind='ticks'):
+        return ohlcv(self.read(symbol, kind, start, end), interval)
+
+    def symbols(self):
+        return sorted(os.listdir(self.root)) if os.path.isdir(self.root) else []
+
+    def flush(self):
+        for series in list(self.series.values()):
+            try:
+                series.flush()
+            except Exception as e:
+                logger.error(f"Error flushing {series.path}: {e}")
+
+_store = None
+_store_lock = threading.Lock()
+
+def get_tick_store():
+    """Get the shared recording tick store, created on first use"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = TickStore()
+                atexit.register(_store.flush)
+    return _store
@@ -1,17 +1,21 @@
-import json
-import requests
 import logging
-from decimal import Decimal
+import time
 from urllib.parse import urlencode
-from config.api_config import BASE_URL
-from utils.auth import generate_auth_headers
+from api import transport
+from api import balance_ledger
+from api import order_tracker
+from api.coalescer import get_account_reads
+from api.pair_registry import get_pair_spec
+from utils.auth import generate_auth_headers, get_signer
+from utils.fixed_point import Scale, DOWN, NEAREST
+from utils.tracing import span
 
 logger = logging.getLogger(__name__)
 
 def get_pair_info(symbol):
     """Get trading pair information including minimum sizes and price precision"""
     try:
-        response = requests.get(f"{BASE_URL}/public/pair?symbol={symbol}")
+        response = transport.get("/public/pair", params={'symbol': symbol})
         if response.status_code == 200:
             return response.json()
         else:
@@ -23,64 +27,100 @@ def get_pair_info(symbol):
 
 def format_number(number, tick_size):
     """Format number according to tick size"""
-    tick_decimals = abs(Decimal(str(tick_size)).as_tuple().exponent)
-    return f"{{:.{tick_decimals}f}}".format(float(number))
+    scale = Scale(tick_size)
+    return scale.format(scale.steps(number))
 
-def place_order(symbol, side, order_type, size, price=None):
-    try:
-        # Get pair info for minimum sizes and price precision
-        pair_info = get_pair_info(symbol)
-        if not pair_info:
-            raise Exception("Could not get pair information")
+def build_order(pair, symbol, side, order_type, size, price=None):
+    """Build the /orders/new body, rounded and validated against pair rules"""
+    # Round size down to the lot size and validate it, in whole lots
+    lots = pair.size_scale.steps(size, DOWN)
+    size = pair.size_scale.format(lots)
+    if lots < pair.min_lots:
+        raise Exception(f"Size {size} is below minimum {pair.min_size_str}")
 
-        # Format size and price according to pair requirements
-        min_size = Decimal(pair_info['minSize'])
-        min_tick_price = Decimal(pair_info['minTickPrice'])
-        min_notional = Decimal(pair_info['minNotional'])
+    # Validate and format price for limit orders
+    data = {
+        "symbol": symbol,
+        "side": side,
+        "type": order_type,
+        "size": size,
+        "postOnly": False
+    }
 
-        # Validate size
-        size = Decimal(str(size))
-        if size < min_size:
-            raise Exception(f"Size {size} is below minimum {min_size}")
+    if price and order_type != 'market':
+        # Round price to valid tick size
+        ticks = pair.price_scale.steps(price, NEAREST)
+        price = pair.price_scale.format(ticks)
+        data["price"] = price
 
-        # Format size according to lot size
-        size = format_number(size, min_size)
+        # Check minimum notional
+        if pair.notional_units(ticks, lots) < pair.min_notional_units:
+            raise Exception(f"Order notional {pair.notional(price, size)} is below minimum {pair.min_notional_str}")
 
-        # Validate and format price for limit orders
-        data = {
-            "symbol": symbol,
-            "side": side,
-            "type": order_type,
-            "size": size,
-            "postOnly": False
-        }
+    return data
 
-        if price and order_type != 'market':
-            price = Decimal(str(price))
-            # Round price to valid tick size
-            price = format_number(price, min_tick_price)
-            data["price"] = price
+# Bookkeeping after an order request, shared by this module and the async
+# client. result is the parsed 200 response, or None when the request failed
+# or its response was lost; balances and open orders may have changed either way.
 
-            # Check minimum notional
-            notional = Decimal(price) * Decimal(size)
-            if notional < min_notional:
-                raise Exception(f"Order notional {notional} is below minimum {min_notional}")
+def after_place(data, result):
+    get_account_reads().invalidate()
+    if result is None:
+        return
+    balance_ledger.get_balance_ledger().record_placed(
+        result.get('orderId'), data['symbol'], data['side'], data['type'], data['size'], data.get('price')
+    )
+    order_tracker.get_order_tracker().track_submitted(data, result)
+
+def after_cancel(order_id, result):
+    get_account_reads().invalidate()
+    if result is None:
+        return
+    balance_ledger.get_balance_ledger().record_cancelled(order_id)
+    order_tracker.get_order_tracker().mark_cancelled(order_id)
+
+def after_cancel_all(result):
+    get_account_reads().invalidate()
+    if result is None:
+        return
+    balance_ledger.get_balance_ledger().record_all_cancelled()
+    order_tracker.get_order_tracker().mark_all_cancelled()
+
+def place_order(symbol, side, order_type, size, price=None):
+    with span('place_order'):
+        return _place_order(symbol, side, order_type, size, price)
+
+def _place_order(symbol, side, order_type, size, price):
+    try:
+        with span('build_order'):
+            # Precision rules come from the cached pair registry, no round-trip here
+            pair = get_pair_spec(symbol)
+            if not pair:
+                raise Exception("Could not get pair information")
+
+            data = build_order(pair, symbol, side, order_type, size, price)
 
         path = '/orders/new'
-        headers = generate_auth_headers('POST', path, json.dumps(data))
+        # Body is encoded once; the signed bytes are the bytes sent
+        with span('sign'):
+            headers, body = get_signer().sign_json('POST', path, data)
         
         logger.info(f"Placing order: {data}")
-        response = requests.post(
-            f"{BASE_URL}{path}",
-            headers=headers,
-            json=data
-        )
-        
-        if response.status_code == 200:
-            return response.json()
-        else:
+        result = None
+        try:
+            response = transport.post(
+                path,
+                headers=headers,
+                data=body
+            )
+            if response.status_code == 200:
+                result = response.json()
+        finally:
+            after_place(data, result)
+
+        if result is None:
             logger.error(f"Failed to place order: {response.text}")
-            return None
+        return result
     except Exception as e:
         logger.error(f"Error placing order: {e}")
         return None
@@ -92,35 +132,69 @@ def cancel_order(order_id):
             "orderId": order_id
         }
         
-        headers = generate_auth_headers('POST', path, json.dumps(data))
-        response = requests.post(
-            f"{BASE_URL}{path}",
-            headers=headers,
-            json=data
-        )
-        
-        if response.status_code == 200:
-            return response.json()
-        else:
+        # Body is encoded once; the signed bytes are the bytes sent
+        headers, body = get_signer().sign_json('POST', path, data)
+        result = None
+        try:
+            response = transport.post(
+                path,
+                headers=headers,
+                data=body
+            )
+            if response.status_code == 200:
+                result = response.json()
+        finally:
+            after_cancel(order_id, result)
+
+        if result is None:
             logger.error(f"Failed to cancel order: {response.text}")
-            return None
+        return result
     except Exception as e:
         logger.error(f"Error canceling order: {e}")
         return None
 
+def cancel_all_orders():
+    """Cancel every open order on the account (not only this bot's)"""
+    try:
+        path = '/orders/cancel/all'
+        data = {}
+
+        # Body is encoded once; the signed bytes are the bytes sent
+        headers, body = get_signer().sign_json('POST', path, data)
+        result = None
+        try:
+            response = transport.post(
+                path,
+                headers=headers,
+                data=body
+            )
+            if response.status_code == 200:
+                result = response.json()
+        finally:
+            after_cancel_all(result)
+
+        if result is None:
+            logger.error(f"Failed to cancel all orders: {response.text}")
+        return result
+    except Exception as e:
+        logger.error(f"Error canceling all orders: {e}")
+        return None
+
+def _fetch_balances():
+    path = '/account/balances'
+    headers = generate_auth_headers('GET', path)
+    response = transport.get(
+        path,
+        headers=headers
+    )
+    if response.status_code != 200:
+        raise Exception(f"Failed to get balances: {response.text}")
+    return response.json()
+
 def get_balances():
+    """Get account balances; concurrent and recent identical reads share one request"""
     try:
-        path = '/account/balances'
-        headers = generate_auth_headers('GET', path)
-        response = requests.get(
-            f"{BASE_URL}{path}",
-            headers=headers
-        )
-        if response.status_code == 200:
-            return response.json()
-        else:
-            logger.error(f"Failed to get balances: {response.text}")
-            return []
+        return get_account_reads().do(('balances',), _fetch_balances)
     except Exception as e:
         logger.error(f"Error getting balances: {e}")
         return []
@@ -136,8 +210,8 @@ def get_order_history(symbol=None, limit=100):
         query = f"?{urlencode(params)}" if params else ""
         headers = generate_auth_headers('GET', f"{path}{query}")
         
-        response = requests.get(
-            f"{BASE_URL}{path}",
+        response = transport.get(
+            path,
             headers=headers,
             params=params
         )
@@ -151,27 +225,31 @@ def get_order_history(symbol=None, limit=100):
         logger.error(f"Error getting order history: {e}")
         return []
 
+def _fetch_active_orders(symbol):
+    path = '/orders'
+    params = {}
+    if symbol:
+        params['symbol'] = symbol
+
+    query = f"?{urlencode(params)}" if params else ""
+    headers = generate_auth_headers('GET', f"{path}{query}")
+
+    requested_at = time.monotonic()
+    response = transport.get(
+        path,
+        headers=headers,
+        params=params
+    )
+    if response.status_code != 200:
+        raise Exception(f"Failed to get active orders: {response.text}")
+    orders = response.json()
+    order_tracker.get_order_tracker().sync_open(orders, symbol, as_of=requested_at)
+    return orders
+
 def get_active_orders(symbol=None):
+    """Get open orders; concurrent and recent identical reads share one request"""
     try:
-        path = '/orders'
-        params = {}
-        if symbol:
-            params['symbol'] = symbol
-            
-        query = f"?{urlencode(params)}" if params else ""
-        headers = generate_auth_headers('GET', f"{path}{query}")
-        
-        response = requests.get(
-            f"{BASE_URL}{path}",
-            headers=headers,
-            params=params
-        )
-        
-        if response.status_code == 200:
-            return response.json()
-        else:
-            logger.error(f"Failed to get active orders: {response.text}")
-            return []
+        return get_account_reads().do(('active_orders', symbol), lambda: _fetch_active_orders(symbol))
     except Exception as e:
         logger.error(f"Error getting active orders: {e}")
-        return []
\ No newline at end of file
+        return []
@@ -0,0 +1,143 @@
+"""
+Shared HTTP transport for all Arkham REST calls.
+
+Keeps one requests.Session with a bounded keep-alive connection pool so
+repeated calls reuse TCP/TLS connections instead of handshaking every time.
+"""
+import logging
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from api import retry
+from api.metrics import get_metrics
+from api import tape
+from api.scheduler import get_scheduler
+from utils.tracing import span
+from config.api_config import (
+    BASE_URL,
+    HTTP_POOL_SIZE,
+    HTTP_CONNECT_TIMEOUT,
+    HTTP_READ_TIMEOUT,
+    HTTP_PREWARM_CONNECTIONS,
+    HTTP_PREWARM_PATH,
+    TRANSPORT_MODE,
+    TRANSPORT_TAPE,
+    REPLAY_SPEED
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMEOUT = (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT)
+
+_session = None
+_session_lock = threading.Lock()
+
+def create_session(pool_size=HTTP_POOL_SIZE, mode=TRANSPORT_MODE, tape_path=TRANSPORT_TAPE):
+    """Create a session with a bounded keep-alive pool and compression enabled.
+
+    mode 'record' also writes every exchange to tape_path; 'replay' serves
+    responses from it instead of the network (see api.tape).
+    """
+    session = requests.Session()
+    pool = dict(
+        pool_connections=1,
+        pool_maxsize=pool_size,
+        pool_block=True,  # Wait for a free connection instead of opening extra ones
+        max_retries=0
+    )
+    if not tape.mount(session, mode, tape_path, REPLAY_SPEED, **pool):
+        adapter = HTTPAdapter(**pool)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+    session.headers.update({
+        'Accept': 'application/json',
+        'Accept-Encoding': 'gzip, deflate',
+        'Connection': 'keep-alive'
+    })
+    return session
+
+def get_session():
+    """Get the shared session, creating it on first use"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = create_session()
+    return _session
+
+def close_session():
+    """Close the shared session and drop all pooled connections"""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+def bounded_timeout(timeout, deadline):
+    """Cap (connect, read) timeouts so one attempt cannot outlive the call deadline"""
+    remaining = max(0.05, deadline - time.monotonic())
+    if isinstance(timeout, tuple):
+        return tuple(min(t, remaining) for t in timeout)
+    return min(timeout, remaining)
+
+def request(method, path, params=None, headers=None, json=None, data=None, timeout=DEFAULT_TIMEOUT, priority=None, policy=None):
+    """Send a request to BASE_URL through the shared pool, paced by the scheduler.
+
+    Transient failures (429, 5xx, connection errors) are retried under the
+    endpoint's retry policy; if they persist an exception is raised. Other
+    non-200 responses are returned to the caller as before.
+    """
+    scheduler = get_scheduler()
+    timer = get_metrics().timed(method, path)
+
+    def send(deadline):
+        timer.attempt()
+        with span('rate_limit_wait'):
+            scheduler.acquire(method, path, priority)
+        response = get_session().request(
+            method,
+            f"{BASE_URL}{path}",
+            params=params,
+            headers=headers,
+            json=json,
+            data=data,
+            timeout=bounded_timeout(timeout, deadline)
+        )
+        scheduler.observe(path, response.status_code, response.headers)
+        timer.response(response.status_code)
+        if response.status_code in retry.RETRYABLE_STATUSES:
+            raise retry.ApiError(response.status_code, response.text)
+        return response
+
+    with timer, span(f"{method} {path}"):
+        response = retry.call(path, send, policy or retry.policy_for(method, path))
+        timer.failed = response.status_code != 200
+    return response
+
+def get(path, params=None, headers=None, timeout=DEFAULT_TIMEOUT, priority=None, policy=None):
+    return request('GET', path, params=params, headers=headers, timeout=timeout, priority=priority, policy=policy)
+
+def post(path, headers=None, json=None, data=None, timeout=DEFAULT_TIMEOUT, priority=None, policy=None):
+    return request('POST', path, headers=headers, json=json, data=data, timeout=timeout, priority=priority, policy=policy)
+
+def prewarm(connections=HTTP_PREWARM_CONNECTIONS, wait=False):
+    """Open pooled connections ahead of the first trading call"""
+    def warm():
+        try:
+            # Reading the body hands the socket back to the pool
+            get(HTTP_PREWARM_PATH).content
+        except Exception as e:
+            logger.warning(f"Connection pre-warm failed: {e}")
+
+    # Concurrent requests force the pool to open separate sockets
+    threads = [
+        threading.Thread(target=warm, daemon=True)
+        for _ in range(min(connections, HTTP_POOL_SIZE))
+    ]
+    for thread in threads:
+        thread.start()
+    if wait:
+        for thread in threads:
+            thread.join()
+    return threads
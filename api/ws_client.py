@@ -0,0 +1,150 @@
+"""
+Reconnecting WebSocket client running on its own event loop thread.
+
+Subscriptions are remembered and replayed after every reconnect. Subclasses
+handle decoded messages in on_message().
+"""
+import asyncio
+import json
+import logging
+import random
+import threading
+import aiohttp
+from config.api_config import WS_URL, WS_HEARTBEAT, WS_RECONNECT_MAX_DELAY
+
+class WebSocketClient:
+    def __init__(self, url=WS_URL, heartbeat=WS_HEARTBEAT):
+        self.logger = logging.getLogger(__name__)
+        self.url = url
+        self.heartbeat = heartbeat
+        self.subscriptions = {}  # (channel, params json) -> subscribe message
+        self.listeners = []  # Called with every decoded message
+        self.connected = False
+        self.is_running = False
+        self.reconnects = 0
+        self.loop = None
+        self.thread = None
+        self.ws = None
+        self._started = threading.Event()
+
+    def start(self):
+        """Start the connection thread if it is not running"""
+        if self.thread and self.thread.is_alive():
+            return
+        self.is_running = True
+        self._started.clear()
+        self.thread = threading.Thread(target=self._run_loop, daemon=True)
+        self.thread.start()
+        self._started.wait(timeout=5)
+
+    def stop(self):
+        self.is_running = False
+        if self.loop and self.ws is not None:
+            asyncio.run_coroutine_threadsafe(self.ws.close(), self.loop)
+        if self.thread and self.thread.is_alive():
+            self.thread.join(timeout=5)
+        self.connected = False
+
+    def subscribe(self, channel, params=None):
+        """Subscribe now if connected, and again after every reconnect"""
+        params = params or {}
+        key = (channel, json.dumps(params, sort_keys=True))
+        if key in self.subscriptions:
+            return
+        message = {'method': 'subscribe', 'args': {'channel': channel, 'params': params}}
+        self.subscriptions[key] = message
+        if self.connected:
+            self.send(message)
+
+    def unsubscribe(self, channel, params=None):
+        params = params or {}
+        message = self.subscriptions.pop((channel, json.dumps(params, sort_keys=True)), None)
+        if message and self.connected:
+            self.send({'method': 'unsubscribe', 'args': message['args']})
+
+    def send(self, message):
+        """Send a message from any thread"""
+        if self.loop is None or self.ws is None:
+            return False
+        asyncio.run_coroutine_threadsafe(self.ws.send_str(json.dumps(message)), self.loop)
+        return True
+
+    def add_listener(self, listener):
+        self.listeners.append(listener)
+
+    def get_headers(self):
+        """Headers for the WebSocket handshake, overridden for private streams"""
+        return None
+
+    def on_connect(self):
+        """Called on the loop thread after each (re)connect and resubscribe"""
+
+    def on_disconnect(self):
+        """Called on the loop thread when the connection drops"""
+
+    def on_message(self, message):
+        """Handle one decoded message"""
+
+    def _run_loop(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self._started.set()
+        try:
+            self.loop.run_until_complete(self._connect_forever())
+        finally:
+            self.loop.close()
+
+    async def _connect_forever(self):
+        attempt = 0
+        async with aiohttp.ClientSession() as session:
+            while self.is_running:
+                try:
+                    async with session.ws_connect(
+                        self.url,
+                        headers=self.get_headers(),
+                        heartbeat=self.heartbeat
+                    ) as ws:
+                        self.ws = ws
+                        self.connected = True
+                        attempt = 0
+                        self.logger.info(f"WebSocket connected to {self.url}")
+
+                        for message in list(self.subscriptions.values()):
+                            await ws.send_str(json.dumps(message))
+                        self.on_connect()
+
+                        async for msg in ws:
+                            if msg.type == aiohttp.WSMsgType.TEXT:
+                                self._dispatch(msg.data)
+                            elif msg.type in (aiohttp.WSMsgType.ERROR, aiohttp.WSMsgType.CLOSED):
+                                break
+
+                except Exception as e:
+                    self.logger.warning(f"WebSocket error: {e}")
+                finally:
+                    if self.connected:
+                        self.connected = False
+                        self.on_disconnect()
+                    self.ws = None
+
+                if self.is_running:
+                    # Exponential backoff with jitter before reconnecting
+                    attempt += 1
+                    self.reconnects += 1
+                    delay = min(WS_RECONNECT_MAX_DELAY, 2 ** min(attempt, 5)) * random.uniform(0.5, 1.0)
+                    self.logger.info(f"WebSocket reconnecting in {delay:.1f}s")
+                    await asyncio.sleep(delay)
+
+    def _dispatch(self, raw):
+        try:
+            message = json.loads(raw)
+        except ValueError:
+            self.logger.warning(f"Invalid WebSocket message: {raw[:200]}")
+            return
+
+        try:
+            self.on_message(message)
+            for listener in self.listeners:
+                listener(message)
+        except Exception as e:
+            self.logger.error(f"Error handling WebSocket message: {e}")
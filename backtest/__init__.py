@@ -0,0 +1,3 @@
+"""
+Offline backtesting of the grid and volume strategies over price history.
+"""
@@ -0,0 +1,47 @@
+"""
+Price series for backtests, as NumPy arrays.
+
+Text files hold one price or 'time,price' per line, as the simulator's
+--price-path reads them; a .npy file holds either a 1-D array of prices or
+an (n, 2) array of times and prices. Prices recorded by the bot come from
+the tick store as memory-mapped views.
+"""
+import numpy as np
+from api.tick_store import TickStore
+from config.api_config import TICK_STORE_DIR
+
+def load_prices(path):
+    """(times or None, prices) from path; times are seconds"""
+    if str(path).endswith('.npy'):
+        data = np.load(path)
+        if data.ndim == 2:
+            return np.ascontiguousarray(data[:, 0], dtype=np.float64), np.ascontiguousarray(data[:, 1], dtype=np.float64)
+        return None, np.asarray(data, dtype=np.float64)
+
+    times, prices = [], []
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            fields = line.split(',')
+            try:
+                price = float(fields[-1])
+                t = float(fields[0]) if len(fields) > 1 else None
+            except ValueError:
+                continue  # Header row
+            prices.append(price)
+            times.append(t)
+    if not prices or any(t is None for t in times):
+        return None, np.array(prices, dtype=np.float64)
+    return np.array(times, dtype=np.float64), np.array(prices, dtype=np.float64)
+
+def load_recorded(symbol, start=None, end=None, root=TICK_STORE_DIR or 'ticks'):
+    """(times, prices) of symbol's recorded ticker prices with start <= time < end"""
+    columns = TickStore(root, readonly=True).read(symbol, 'ticks', start, end)
+    return columns['time'], columns['price']
+
+def random_walk(n, start=100.0, volatility=0.001, seed=0):
+    """Geometric random walk of n prices, one per second"""
+    rng = np.random.default_rng(seed)
+    return start * np.exp(np.cumsum(rng.normal(0.0, volatility, n)))
@@ -0,0 +1,271 @@
+"""
+Event-driven backtest of the grid and volume strategies.
+
+A run builds a real BotWorker on a SimulatedVenue and replays a price
+series through it. Each tick moves the simulated market. The fills it
+causes go to BotWorker.handle_order_event as order stream events, and
+check_price_deviation runs while no grid order has filled, as in
+BotWorker.monitor_orders. Grid levels, position averaging, take-profits and
+re-centering are the live code paths.
+
+Between events nothing the strategy does depends on the price, so unless a
+trailing sell is being managed the loop jumps, with a vectorized search,
+straight to the next tick that crosses a resting order or the re-center
+threshold. Equity is marked to market on every tick afterwards, from the
+balances recorded at each event.
+"""
+import logging
+import random
+import time
+from collections import deque
+from dataclasses import dataclass, asdict
+import numpy as np
+from api.pair_registry import get_pair_registry
+from backtest.venue import SimulatedVenue
+from simulator.exchange_server import DEFAULT_PAIRS
+from trading.volume.delay_manager import DelayManager
+from trading.volume.price_monitor import PriceMonitor
+from trading.volume.trailing_monitor import MIN_ADJUSTMENT_INTERVAL, POLL_INTERVAL
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PAIR = DEFAULT_PAIRS[0]
+DEFAULT_PARAMS = {
+    'symbol': DEFAULT_PAIR['symbol'],
+    'mode': 'Grid Trading',
+    'usdt_amount': 1000.0,
+    'num_orders': 10,
+    'price_drop': 5.0,
+    'first_order_offset': 0.5,
+    'target_profit_pct': 1.0,
+    'price_deviation_pct': 1.0,
+    'min_delay': 0.0,
+    'max_delay': 0.0,
+    'use_trailing_limit': False
+}
+SEARCH_CHUNK = 4096  # first block of ticks the fast path scans for the next event
+
+@dataclass
+class BacktestResult:
+    params: dict
+    pnl: float = 0.0  # quote, marked to market at the last price
+    pnl_pct: float = 0.0  # of starting equity
+    turnover: float = 0.0  # quote notional traded
+    max_drawdown_pct: float = 0.0
+    fills: int = 0
+    cycles: int = 0  # sell orders filled: take-profits or volume sells
+    fees: float = 0.0
+    final_equity: float = 0.0
+    ticks: int = 0
+    steps: int = 0  # ticks the loop stopped at; the rest were skipped
+    elapsed: float = 0.0
+
+    def to_dict(self):
+        return asdict(self)
+
+class SimulatedVolumeTrader:
+    """VolumeTrader's sell side on simulated time.
+
+    The random delay, the market or trailing-limit sell and the re-grid
+    callback follow VolumeTrader.handle_filled_buy and TrailingMonitor's
+    loop. Their sleeping and polling threads are replaced by step() on
+    every tick; the price rules are PriceMonitor's own. Fills wait out their
+    delays one after another, as the blocking live handler makes them, and a
+    sell that comes due while a trailing sell rests is merged into it.
+    """
+
+    def __init__(self, venue, symbol, min_delay, max_delay, first_order_offset):
+        self.venue = venue
+        self.symbol = symbol
+        self.use_trailing_limit = False
+        self.price_deviation_pct = 0
+        self.delay_manager = DelayManager(min_delay, max_delay, lambda delay: None)
+        self.price_monitor = PriceMonitor(first_order_offset)  # No symbol: no live order book lookups
+        self.now = 0.0
+        self.pending = deque()  # (size, callback) of filled buys not yet sold
+        self.due = None  # When the head of pending has waited out its delay
+        self.sell_order = None
+        self.callback = None
+        self.last_adjustment = 0.0
+        self.last_poll = 0.0
+
+    @property
+    def active(self):
+        return self.due is not None or self.sell_order is not None
+
+    def handle_filled_buy(self, filled_order, setup_new_grid_callback):
+        self.pending.append((float(filled_order['size']), setup_new_grid_callback))
+        if self.due is None:
+            self._start_delay()
+
+    def step(self, now, price):
+        self.now = now
+        if self.due is not None and now >= self.due:
+            size, callback = self.pending.popleft()
+            self._start_delay()
+            self._sell(price, size, callback)
+        elif self.sell_order and now - self.last_poll >= POLL_INTERVAL:
+            self.last_poll = now
+            self._trail(price)
+
+    def on_event(self, event):
+        if self.sell_order and event.order_id == self.sell_order['orderId'] and event.type == 'fill':
+            self.sell_order = None
+            self.callback()
+
+    def stop(self):
+        self.pending.clear()
+        self.due = None
+        self.sell_order = None
+
+    def _start_delay(self):
+        self.due = self.now + self.delay_manager.get_random_delay() if self.pending else None
+
+    def _sell(self, price, size, callback):
+        if self.use_trailing_limit and self.sell_order:
+            resting = self.venue.engine.orders.get(self.sell_order['orderId'])
+            if resting is not None and self.venue.cancel_order(resting.order_id):
+                size += resting.remaining
+        # As BalanceManager.validate_sell_size: never more than 99.9% of what is held
+        size = min(size, self.venue.free(self.venue.base) * 0.999)
+        if not self.use_trailing_limit:
+            if self.venue.place_order(self.symbol, 'sell', 'market', size):
+                callback()
+            return
+
+        self.price_monitor.reset_tracking()
+        self.price_monitor.observe(price)
+        sell_price = self.price_monitor.calculate_trailing_price(price, self.price_deviation_pct)
+        self.sell_order = self.venue.place_order(self.symbol, 'sell', 'limitGtc', size, sell_price)
+        self.callback = callback
+        self.last_adjustment = self.last_poll = self.now
+
+    def _trail(self, price):
+        self.price_monitor.observe(price)
+        needs_adjustment = self.price_monitor.calculate_price_deviation(
+            price, float(self.sell_order['price']), self.price_deviation_pct
+        )
+        if not needs_adjustment or self.now - self.last_adjustment < MIN_ADJUSTMENT_INTERVAL:
+            return
+        order = self.venue.engine.orders.get(self.sell_order['orderId'])
+        if order is None or not self.venue.cancel_order(order.order_id):
+            return
+        new_price = self.price_monitor.calculate_trailing_price(price, self.price_deviation_pct)
+        self.sell_order = self.venue.place_order(self.symbol, 'sell', 'limitGtc', order.remaining, new_price)
+        self.last_adjustment = self.now
+        if not self.sell_order:
+            # Too small to re-place; what is left is dust
+            self.callback()
+
+def next_event(prices, start, low, high):
+    """First index from start whose price is at or below low or at or above high"""
+    n = len(prices)
+    chunk = SEARCH_CHUNK
+    i = start
+    while i < n:
+        block = prices[i:i + chunk]
+        hits = np.flatnonzero((block <= low) | (block >= high))
+        if len(hits):
+            return i + int(hits[0])
+        i += chunk
+        chunk = min(chunk * 2, 1 << 20)
+    return n
+
+def max_drawdown_pct(equity):
+    peaks = np.maximum.accumulate(equity)
+    return float(np.max((peaks - equity) / peaks) * 100) if len(equity) else 0.0
+
+def run_backtest(prices, params=None, times=None, pair=DEFAULT_PAIR, initial_usdt=None, initial_base=0.0,
+                 fee_pct=0.0, spread=0.0002, tick_interval=1.0, seed=0, fast_path=True):
+    """Replay prices (and their times in seconds, or one tick_interval apart) through BotWorker"""
+    # Qt is only needed once a run starts
+    from gui.bot_worker import BotWorker
+
+    start = time.perf_counter()
+    prices = np.asarray(prices, dtype=np.float64)
+    params = {**DEFAULT_PARAMS, **(params or {}), 'symbol': pair['symbol']}
+    # Fills come from the simulated venue; one placement thread keeps runs deterministic
+    params.update(use_order_stream=False, max_concurrent_orders=1)
+    result = BacktestResult(params=dict(params), ticks=len(prices))
+    if not len(prices):
+        return result
+
+    random.seed(seed)  # DelayManager draws from the module-level generator
+    get_pair_registry().update([pair], persist=False)
+    initial_usdt = params['usdt_amount'] if initial_usdt is None else initial_usdt
+    venue = SimulatedVenue(pair, prices[0], {pair['quoteSymbol']: initial_usdt, pair['baseSymbol']: initial_base},
+                           fee_pct=fee_pct, spread=spread)
+    volume_trader = None
+    if params['mode'] != "Grid Trading":
+        volume_trader = SimulatedVolumeTrader(venue, pair['symbol'], params['min_delay'], params['max_delay'],
+                                              params['first_order_offset'])
+    worker = BotWorker(params, venue=venue, volume_trader=volume_trader)
+
+    def process_events():
+        while True:
+            events = venue.drain_events()
+            if not events:
+                return
+            for event in events:
+                if event.side == 'sell' and event.type == 'fill':
+                    result.cycles += 1
+                worker.handle_order_event(event)
+                if volume_trader:
+                    volume_trader.on_event(event)
+
+    start_equity = initial_usdt + initial_base * prices[0]
+    steps, quote, base = [], [], []
+    worker.setup_grid()
+    deviation = 1 + params['price_deviation_pct'] / 100
+    i = 0
+    while i < len(prices):
+        price = prices[i]
+        now = times[i] if times is not None else i * tick_interval
+        if volume_trader:
+            # Fills this move causes start their sell delays now, not at the last stop
+            volume_trader.now = now
+        venue.move_price(price)
+        process_events()
+        if volume_trader:
+            volume_trader.step(now, price)
+            process_events()
+        if not worker.has_filled_orders:
+            worker.check_price_deviation()
+            process_events()
+        steps.append(i)
+        quote.append(venue.total(pair['quoteSymbol']))
+        base.append(venue.total(pair['baseSymbol']))
+
+        if not fast_path or (volume_trader and volume_trader.sell_order):
+            i += 1
+            continue
+        low, high = venue.resting_range()
+        low = -np.inf if low is None else low
+        high = np.inf if high is None else high
+        if not worker.has_filled_orders and worker.grid_orders:
+            top = max(float(order['price']) for order in worker.grid_orders.values())
+            high = min(high, top * deviation)
+        end = len(prices)
+        if volume_trader and volume_trader.due is not None:
+            # The next sell is due at a known time whatever the price does
+            due = volume_trader.due
+            end = int(np.searchsorted(times, due)) if times is not None else int(np.ceil(due / tick_interval))
+            end = min(max(end, i + 1), len(prices))
+        i = next_event(prices[:end], i + 1, low, high)
+
+    if volume_trader:
+        volume_trader.stop()
+
+    # Balances only change at steps; mark them to market on every tick in between
+    lengths = np.diff(np.append(steps, len(prices)))
+    equity = np.repeat(quote, lengths) + np.repeat(base, lengths) * prices
+    result.final_equity = float(equity[-1])
+    result.pnl = result.final_equity - float(start_equity)
+    result.pnl_pct = result.pnl / float(start_equity) * 100 if start_equity else 0.0
+    result.max_drawdown_pct = max_drawdown_pct(equity)
+    result.turnover = venue.turnover
+    result.fills = venue.fills
+    result.fees = venue.fees
+    result.steps = len(steps)
+    result.elapsed = time.perf_counter() - start
+    return result
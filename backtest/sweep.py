@@ -0,0 +1,142 @@
+"""
+Parameter sweep of the backtest across all cores.
+
+    python -m backtest.sweep prices.csv --num-orders 5 10 20 --price-drop 3 5 10 \\
+        --target-profit-pct 0.5 1 2 --rank pnl
+
+Every combination of the listed values is one run_backtest. Runs go to a
+process pool; the price series is copied once into shared memory, and each
+worker maps it as a NumPy array instead of receiving a pickled copy per
+task. Results are ranked by PnL, turnover or drawdown.
+"""
+import argparse
+import itertools
+import json
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context, shared_memory
+import numpy as np
+from backtest.data import load_prices, load_recorded, random_walk
+from backtest.engine import DEFAULT_PAIR, DEFAULT_PARAMS, run_backtest
+
+SWEPT = ('num_orders', 'price_drop', 'first_order_offset', 'target_profit_pct', 'price_deviation_pct')
+RANKINGS = {
+    'pnl': lambda result: -result.pnl,
+    'turnover': lambda result: -result.turnover,
+    'drawdown': lambda result: result.max_drawdown_pct
+}
+
+# Set in each worker by _attach
+_series = {}
+
+def _share(array):
+    block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    np.ndarray(array.shape, dtype=np.float64, buffer=block.buf)[:] = array
+    return block
+
+def _attach(names, lengths, pair, log_level):
+    logging.basicConfig(level=log_level)
+    for key, name in names.items():
+        block = shared_memory.SharedMemory(name=name)
+        _series[key + '_block'] = block  # The array is only valid while its block is referenced
+        _series[key] = np.ndarray((lengths[key],), dtype=np.float64, buffer=block.buf)
+    _series['pair'] = pair
+
+def _run(params, options):
+    return run_backtest(_series['prices'], params, times=_series.get('times'), pair=_series['pair'], **options)
+
+def sweep(prices, grid, base_params=None, times=None, pair=DEFAULT_PAIR, workers=None, rank='pnl',
+          log_level=logging.ERROR, **options):
+    """run_backtest for every combination in grid ({param: [values]}), best first by rank"""
+    prices = np.ascontiguousarray(prices, dtype=np.float64)
+    series = {'prices': prices}
+    if times is not None:
+        series['times'] = np.ascontiguousarray(times, dtype=np.float64)
+    keys = list(grid)
+    combinations = [
+        {**(base_params or {}), **dict(zip(keys, values))}
+        for values in itertools.product(*(grid[key] for key in keys))
+    ]
+
+    blocks = {key: _share(array) for key, array in series.items()}
+    try:
+        with ProcessPoolExecutor(
+            max_workers=workers or os.cpu_count(),
+            mp_context=get_context('spawn'),
+            initializer=_attach,
+            initargs=(
+                {key: block.name for key, block in blocks.items()},
+                {key: len(array) for key, array in series.items()},
+                pair,
+                log_level
+            )
+        ) as pool:
+            results = list(pool.map(_run, combinations, itertools.repeat(options),
+                                    chunksize=max(1, len(combinations) // ((workers or os.cpu_count()) * 4))))
+    finally:
+        for block in blocks.values():
+            block.close()
+            block.unlink()
+    return sorted(results, key=RANKINGS[rank])
+
+def print_table(results, top):
+    columns = SWEPT + ('pnl', 'pnl_pct', 'turnover', 'max_drawdown_pct', 'cycles', 'fees')
+    print("  ".join(f"{column:>12.12}" for column in columns))
+    for result in results[:top]:
+        row = [result.params[key] for key in SWEPT] + [
+            result.pnl, result.pnl_pct, result.turnover, result.max_drawdown_pct, result.cycles, result.fees
+        ]
+        print("  ".join(f"{value:>12.4g}" for value in row))
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtest parameter sweep over a price series")
+    parser.add_argument('path', nargs='?', default='random',
+                        help="'random', a file of prices (.csv/.txt/.npy) or a tick store directory")
+    parser.add_argument('--symbol', default=DEFAULT_PAIR['symbol'], help="recorded symbol to read from a tick store")
+    parser.add_argument('--start', type=float, help="first recorded time (unix seconds)")
+    parser.add_argument('--end', type=float, help="end of the recorded window (unix seconds)")
+    parser.add_argument('--ticks', type=int, default=100_000, help="length of the random walk")
+    parser.add_argument('--volatility', type=float, default=0.0005)
+    parser.add_argument('--seed', type=int, default=0)
+    for key in SWEPT:
+        parser.add_argument('--' + key.replace('_', '-'), type=float, nargs='+', default=[DEFAULT_PARAMS[key]])
+    parser.add_argument('--mode', default=DEFAULT_PARAMS['mode'])
+    parser.add_argument('--usdt-amount', type=float, default=DEFAULT_PARAMS['usdt_amount'])
+    parser.add_argument('--min-delay', type=float, default=DEFAULT_PARAMS['min_delay'])
+    parser.add_argument('--max-delay', type=float, default=DEFAULT_PARAMS['max_delay'])
+    parser.add_argument('--trailing', action='store_true', help="trailing limit sells in volume mode")
+    parser.add_argument('--fee-pct', type=float, default=0.0)
+    parser.add_argument('--spread', type=float, default=0.0002)
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--rank', choices=list(RANKINGS), default='pnl')
+    parser.add_argument('--top', type=int, default=20)
+    parser.add_argument('--json', help="write every result to this file")
+    args = parser.parse_args()
+
+    if args.path == 'random':
+        times, prices = None, random_walk(args.ticks, volatility=args.volatility, seed=args.seed)
+    elif os.path.isdir(args.path):
+        times, prices = load_recorded(args.symbol, args.start, args.end, root=args.path)
+    else:
+        times, prices = load_prices(args.path)
+    grid = {key: getattr(args, key) for key in SWEPT}
+    grid['num_orders'] = [int(value) for value in grid['num_orders']]
+    base_params = {
+        'mode': args.mode,
+        'usdt_amount': args.usdt_amount,
+        'min_delay': args.min_delay,
+        'max_delay': args.max_delay,
+        'use_trailing_limit': args.trailing
+    }
+
+    results = sweep(prices, grid, base_params, times=times, workers=args.workers, rank=args.rank,
+                    fee_pct=args.fee_pct, spread=args.spread, seed=args.seed)
+    print(f"{len(results)} runs over {len(prices)} ticks, ranked by {args.rank}")
+    print_table(results, args.top)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump([result.to_dict() for result in results], f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""
+Simulated venue for backtests.
+
+Implements the trading.venue.Venue calls on top of the simulator's matching
+engine and account, in process and without HTTP. Orders are rounded and
+validated by the same build_order as live ones, then matched against the
+current price; moving the price fills every resting order it crosses at
+the order's own price. Each fill comes back as the OrderEvent the private
+order stream would push. Fees are charged on filled notional, in quote.
+"""
+import threading
+from collections import deque
+from api.order_stream import OrderEvent
+from api.pair_registry import get_pair_spec
+from api.trading_api import build_order
+from simulator.exchange_server import Account
+from simulator.matching_engine import MatchingEngine, Order, next_order_id
+
+HISTORY_SIZE = 1000
+
+class SimulatedBook:
+    """Top of book as the strategy sees it: the engine's outside quotes"""
+
+    def __init__(self, engine):
+        self.engine = engine
+
+    def best_bid(self):
+        return self.engine.outside_bid
+
+    def best_ask(self):
+        return self.engine.outside_ask
+
+class SimulatedVenue:
+    def __init__(self, pair, price, balances, fee_pct=0.0, spread=0.0002):
+        self.pair = pair
+        self.symbol = pair['symbol']
+        self.base = pair['baseSymbol']
+        self.quote = pair['quoteSymbol']
+        self.engine = MatchingEngine(self.symbol, price, spread)
+        self.book = SimulatedBook(self.engine)
+        self.account = Account(balances)
+        self.fee_rate = fee_pct / 100
+        self.lock = threading.RLock()  # Grid placement and cancels fan out on threads
+        self.history = deque(maxlen=HISTORY_SIZE)  # Closed and cancelled Orders, oldest first
+        self.events = []  # OrderEvents not yet taken by drain_events()
+        self.fills = 0
+        self.turnover = 0.0
+        self.fees = 0.0
+
+    # Venue calls
+
+    def place_order(self, symbol, side, order_type, size, price=None):
+        with self.lock:
+            try:
+                data = build_order(get_pair_spec(symbol), symbol, side, order_type, size, price)
+            except Exception:
+                return None
+            size = float(data['size'])
+            price = float(data['price']) if 'price' in data else None
+            if side == 'buy':
+                asset, need = self.quote, size * (price if price is not None else self.engine.outside_ask)
+            else:
+                asset, need = self.base, size
+            if self.account.free(asset) + 1e-9 < need:
+                return None
+            if price is not None:
+                self.account.lock(asset, need)
+
+            order = Order(next_order_id(), symbol, side, order_type, size, price)
+            self._settle(self.engine.submit(order))
+            return order.to_dict()
+
+    def cancel_order(self, order_id):
+        with self.lock:
+            order = self.engine.cancel(order_id)
+            if order is None:
+                return None
+            if order.side == 'buy':
+                self.account.unlock(self.quote, order.remaining * order.price)
+            else:
+                self.account.unlock(self.base, order.remaining)
+            self.history.append(order)
+            self.events.append(self._event('cancel', order, 0.0, None))
+            return {'orderId': order_id}
+
+    def cancel_all_orders(self):
+        with self.lock:
+            for order in self.engine.open_orders():
+                self.cancel_order(order.order_id)
+            return {}
+
+    def get_active_orders(self, symbol=None):
+        with self.lock:
+            return [order.to_dict() for order in self.engine.open_orders()]
+
+    def get_order_history(self, symbol=None, limit=100):
+        with self.lock:
+            return [order.to_dict() for order in list(self.history)[:-limit - 1:-1]]
+
+    def get_current_price(self, symbol):
+        return self.engine.price
+
+    def get_order_book(self, symbol):
+        return self.book
+
+    def available_usdt(self):
+        return self.account.free(self.quote)
+
+    # Simulation
+
+    def move_price(self, price):
+        """Set the market price and fill whatever it crosses"""
+        with self.lock:
+            self._settle(self.engine.move_price(price))
+
+    def drain_events(self):
+        with self.lock:
+            events, self.events = self.events, []
+            return events
+
+    def free(self, asset):
+        return self.account.free(asset)
+
+    def total(self, asset):
+        entry = self.account.balances.get(asset)
+        return entry['free'] + entry['locked'] if entry else 0.0
+
+    def resting_range(self):
+        """(highest resting bid, lowest resting ask); None where a side is empty"""
+        return self.engine.bids.best(), self.engine.asks.best()
+
+    def _settle(self, fills):
+        for fill in fills:
+            order = fill.order
+            notional = fill.size * fill.price
+            fee = notional * self.fee_rate
+            if order.side == 'buy':
+                self.account.adjust(self.base, free=fill.size)
+                if order.price is not None:
+                    # Locked at the limit price; any improvement goes back to free
+                    self.account.adjust(self.quote, free=fill.size * (order.price - fill.price) - fee,
+                                        locked=-fill.size * order.price)
+                else:
+                    self.account.adjust(self.quote, free=-notional - fee)
+            else:
+                self.account.adjust(self.quote, free=notional - fee)
+                if order.price is not None:
+                    self.account.adjust(self.base, locked=-fill.size)
+                else:
+                    self.account.adjust(self.base, free=-fill.size)
+            self.fills += 1
+            self.turnover += notional
+            self.fees += fee
+            if not order.is_open:
+                self.history.append(order)
+            self.events.append(self._event('fill' if not order.is_open else 'partial_fill', order, fill.size, fill.price))
+
+    def _event(self, event_type, order, fill_size, fill_price):
+        return OrderEvent(
+            type=event_type,
+            order_id=order.order_id,
+            symbol=order.symbol,
+            side=order.side,
+            fill_size=fill_size,
+            fill_price=fill_price,
+            executed_size=order.executed,
+            avg_price=order.notional / order.executed if order.executed else None,
+            order=order.to_dict()
+        )
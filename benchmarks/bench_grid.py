@@ -0,0 +1,82 @@
+"""
+Grid construction cost: the old per-level Decimal loop against the
+vectorized integer-tick engine.
+
+    python -m benchmarks.bench_grid --levels 5 500 5000
+
+The old loop is copied from trading/grid_calculator.py before the engine
+replaced it, minus the balance and order-book lookups both versions share.
+"""
+import argparse
+import time
+from decimal import Decimal
+
+from trading.grid_engine import build_grid, LINEAR, GEOMETRIC
+
+PRICE = 64321.5
+BUDGET = 250000.0
+PRICE_DROP = 20.0
+FIRST_OFFSET = 0.5
+TICK = 0.01
+LOT = 0.00001
+MIN_SIZE = 0.00001
+MIN_NOTIONAL = 5.0
+
+def legacy_order_size(price, usdt_amount, min_notional):
+    price = Decimal(str(price))
+    usdt = Decimal(str(usdt_amount))
+    min_notional = Decimal(str(min_notional))
+    max_size = usdt / price
+    if price * max_size < min_notional:
+        return 0
+    adjusted_size = max_size * Decimal('0.998')
+    return float(adjusted_size.quantize(Decimal('0.0001'), rounding='ROUND_DOWN'))
+
+def legacy_grid(current_price, usdt_amount, num_orders, price_drop, first_order_offset, min_notional):
+    current_price = Decimal(str(current_price))
+    usdt_per_order = Decimal(str(usdt_amount)) / Decimal(str(num_orders))
+    first_price = current_price * (1 - Decimal(str(first_order_offset)) / 100)
+    grid_levels = []
+    price_step = (Decimal(str(price_drop)) / 100) / (num_orders - 1)
+    for i in range(num_orders):
+        price = first_price * (1 - price_step * i)
+        size = legacy_order_size(float(price), float(usdt_per_order), min_notional)
+        if size > 0:
+            grid_levels.append({'price': float(price), 'size': size})
+    return grid_levels
+
+def engine_grid(num_orders, spacing):
+    first_price = PRICE * (1 - FIRST_OFFSET / 100)
+    return build_grid(first_price, num_orders, PRICE_DROP, BUDGET, TICK, LOT, MIN_SIZE, MIN_NOTIONAL, spacing)
+
+def measure(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--levels', type=int, nargs='+', default=[5, 500, 5000])
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'levels':>7} {'legacy':>12} {'engine':>12} {'to_levels':>12} {'geometric':>12} {'speedup':>8}")
+    for levels in args.levels:
+        legacy, legacy_levels = measure(
+            lambda: legacy_grid(PRICE, BUDGET, levels, PRICE_DROP, FIRST_OFFSET, MIN_NOTIONAL), args.repeat
+        )
+        engine, ladder = measure(lambda: engine_grid(levels, LINEAR), args.repeat)
+        export, _ = measure(ladder.to_levels, args.repeat)
+        geometric, _ = measure(lambda: engine_grid(levels, GEOMETRIC), args.repeat)
+        print(
+            f"{levels:>7} {legacy * 1e3:>9.3f} ms {engine * 1e3:>9.3f} ms {export * 1e3:>9.3f} ms "
+            f"{geometric * 1e3:>9.3f} ms {legacy / engine:>7.1f}x"
+        )
+        assert len(ladder) <= len(legacy_levels) or levels < 2
+        assert ladder.notional <= BUDGET
+
+if __name__ == "__main__":
+    main()
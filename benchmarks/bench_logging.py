@@ -0,0 +1,123 @@
+"""
+Time spent logging per trading-loop iteration: the old synchronous setup
+against the queued writer.
+
+Each iteration logs what one trailing-monitor pass logs (trailing price,
+available balance, total balance) at INFO. The old setup formats eager
+f-strings and writes to the console and file on the calling thread; the
+queued setup only enqueues lazily formatted records.
+
+    python -m benchmarks.bench_logging --iterations 5000 --io-delay-ms 0.2
+
+--io-delay-ms adds a delay to every console write, standing in for a slow
+terminal or a busy disk. --pause-ms is the rest of the loop iteration
+(waiting on the network, sleeping); the writer catches up during it. With
+--pause-ms 0 the writer competes with the caller for the GIL.
+"""
+import argparse
+import logging
+import os
+import statistics
+import tempfile
+import time
+
+from utils.logger import setup_logger, stop_logging, TEXT_FORMAT
+
+class SlowStream:
+    """File stream whose writes take at least delay seconds"""
+
+    def __init__(self, path, delay):
+        self.file = open(path, 'w')
+        self.delay = delay
+
+    def write(self, data):
+        if self.delay:
+            time.sleep(self.delay)
+        return self.file.write(data)
+
+    def flush(self):
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+def legacy_setup(directory, stream):
+    """What utils.logger.setup_logger used to do"""
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    formatter = logging.Formatter(TEXT_FORMAT)
+    for handler in (logging.StreamHandler(stream), logging.FileHandler(os.path.join(directory, 'legacy.log'))):
+        handler.setFormatter(formatter)
+        root.addHandler(handler)
+    root.setLevel(logging.INFO)
+
+def legacy_iteration(logger, i):
+    price = 64000 + i * 0.5
+    logger.info(f"Calculated trailing price: {price * 1.001} (current: {price}, highest: {price + 10}, deviation: 1.0%, offset: 0.1%)")
+    logger.info(f"Available BTC balance: {0.015 + i * 1e-6}")
+    logger.info(f"Total BTC balance: {0.02} (available: {0.015}, in orders: {0.005})")
+
+def queued_iteration(logger, i):
+    price = 64000 + i * 0.5
+    logger.info("Calculated trailing price: %s (current: %s, highest: %s, deviation: %s%%, offset: %s%%)",
+                price * 1.001, price, price + 10, 1.0, 0.1)
+    logger.info("Available %s balance: %s", 'BTC', 0.015 + i * 1e-6)
+    logger.info("Total %s balance: %s (available: %s, in orders: %s)", 'BTC', 0.02, 0.015, 0.005)
+
+def measure(iteration, iterations, pause):
+    logger = logging.getLogger('trading.volume.price_monitor')
+    samples = []
+    for i in range(iterations):
+        start = time.perf_counter()
+        iteration(logger, i)
+        samples.append(time.perf_counter() - start)
+        if pause:
+            time.sleep(pause)
+    samples.sort()
+    return {
+        'mean_us': statistics.fmean(samples) * 1e6,
+        'p99_us': samples[int(len(samples) * 0.99)] * 1e6,
+        'max_us': samples[-1] * 1e6
+    }
+
+def report(label, stats):
+    print(f"{label:<10} mean {stats['mean_us']:>9.1f} us  p99 {stats['p99_us']:>9.1f} us  max {stats['max_us']:>10.1f} us per iteration")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--iterations', type=int, default=5000)
+    parser.add_argument('--io-delay-ms', type=float, default=0)
+    parser.add_argument('--pause-ms', type=float, default=0.5)
+    args = parser.parse_args()
+    delay = args.io_delay_ms / 1000
+    pause = args.pause_ms / 1000
+
+    with tempfile.TemporaryDirectory() as directory:
+        stream = SlowStream(os.path.join(directory, 'legacy_console.txt'), delay)
+        legacy_setup(directory, stream)
+        legacy = measure(legacy_iteration, args.iterations, pause)
+        for handler in list(logging.getLogger().handlers):
+            logging.getLogger().removeHandler(handler)
+            handler.close()
+        stream.close()
+
+        stream = SlowStream(os.path.join(directory, 'queued_console.txt'), delay)
+        # Size the queue for the whole run so nothing is dropped while measuring
+        setup_logger(log_file=os.path.join(directory, 'queued.log'), stream=stream,
+                     queue_size=args.iterations * 3 + 1, module_levels={})
+        queued = measure(queued_iteration, args.iterations, pause)
+        drain_start = time.perf_counter()
+        stop_logging()
+        drain = time.perf_counter() - drain_start
+        stream.close()
+
+    print(f"{args.iterations} iterations, 3 INFO records each, console write delay {args.io_delay_ms} ms, "
+          f"{args.pause_ms} ms between iterations")
+    report('legacy', legacy)
+    report('queued', queued)
+    print(f"speedup    {legacy['mean_us'] / queued['mean_us']:.1f}x on the calling thread "
+          f"(writer drained the backlog in {drain:.2f}s afterwards)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""
+Order-build cost: Decimal and float quantizing against fixed-point ticks
+and lots.
+
+    python -m benchmarks.bench_order_build --orders 20000
+
+Two paths are timed over the same random prices and sizes: building the
+/orders/new body, and folding fills into a position to price the
+take-profit. "decimal" is the original per-order Decimal/format_number
+build, "float" the PairSpec quantizers that replaced it, both copied from
+before the switch. The run also counts inputs where the float path landed
+on a different tick or lot than exact arithmetic on the decimal digits.
+"""
+import argparse
+import math
+import random
+import time
+from decimal import Decimal
+
+from api.pair_registry import PairSpec
+from api.trading_api import build_order
+from utils.fixed_point import Scale, DOWN, UP, NEAREST, divide, to_units
+
+PAIR = {'symbol': 'BTC_USDT', 'minTickPrice': '0.01', 'minLotSize': '0.00001', 'minSize': '0.00001', 'minNotional': '5'}
+
+def decimal_format_number(number, tick_size):
+    tick_decimals = abs(Decimal(str(tick_size)).as_tuple().exponent)
+    return f"{{:.{tick_decimals}f}}".format(float(number))
+
+def decimal_build_order(info, symbol, side, order_type, size, price):
+    min_size = Decimal(info['minSize'])
+    min_tick_price = Decimal(info['minTickPrice'])
+    min_notional = Decimal(info['minNotional'])
+    size = Decimal(str(size))
+    if size < min_size:
+        raise Exception("size")
+    size = decimal_format_number(size, min_size)
+    data = {"symbol": symbol, "side": side, "type": order_type, "size": size, "postOnly": False}
+    price = decimal_format_number(Decimal(str(price)), min_tick_price)
+    data["price"] = price
+    if Decimal(price) * Decimal(size) < min_notional:
+        raise Exception("notional")
+    return data
+
+def float_decimals(value):
+    return max(0, -Decimal(str(value)).normalize().as_tuple().exponent)
+
+class FloatPair:
+    def __init__(self, info):
+        self.tick = float(info['minTickPrice'])
+        self.tick_decimals = float_decimals(info['minTickPrice'])
+        self.lot = float(info['minLotSize'])
+        self.lot_decimals = float_decimals(info['minLotSize'])
+        self.min_size = float(info['minSize'])
+        self.min_notional = float(info['minNotional'])
+
+    def format_price(self, price):
+        return f"{int(round(float(price) / self.tick)) * self.tick:.{self.tick_decimals}f}"
+
+    def format_size(self, size):
+        return f"{int(math.floor(float(size) / self.lot + 1e-9)) * self.lot:.{self.lot_decimals}f}"
+
+def float_build_order(pair, symbol, side, order_type, size, price):
+    size = pair.format_size(size)
+    if not float(size) + 1e-12 >= pair.min_size:
+        raise Exception("size")
+    data = {"symbol": symbol, "side": side, "type": order_type, "size": size, "postOnly": False}
+    price = pair.format_price(price)
+    data["price"] = price
+    if not float(price) * float(size) + 1e-12 >= pair.min_notional:
+        raise Exception("notional")
+    return data
+
+def decimal_take_profit(fills, profit_percentage):
+    total_size = sum(Decimal(str(size)) for _, size in fills)
+    weighted_sum = sum(Decimal(str(price)) * Decimal(str(size)) for price, size in fills)
+    entry_price = Decimal(str(float(weighted_sum / total_size)))
+    return float(entry_price * (1 + Decimal(str(profit_percentage)) / 100))
+
+def fixed_take_profit(fills, profit_percentage, price_scale, size_scale):
+    total_lots = cost = 0
+    for price, size in fills:
+        lots = size_scale.steps(size)
+        total_lots += lots
+        cost += price_scale.steps(price) * lots
+    pct_scale = 100 * 10 ** 4
+    return price_scale.to_float(divide(cost * (pct_scale + to_units(profit_percentage, 4)), total_lots * pct_scale, UP))
+
+def measure(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--orders', type=int, default=20000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    # Grid-style inputs: prices and sizes computed in float, a few digits past the tick and lot
+    prices = [round(rng.uniform(20000, 90000), rng.choice((2, 3, 4))) for _ in range(args.orders)]
+    sizes = [round(250 / price * rng.uniform(0.5, 2), rng.choice((5, 6))) for price in prices]
+    # Fill strings as the API reports them: already on the tick and lot grid
+    fills = [(f"{price:.2f}", f"{size:.5f}") for price, size in zip(prices, sizes)]
+
+    float_pair = FloatPair(PAIR)
+    pair = PairSpec(PAIR)
+
+    def run_decimal():
+        for price, size in zip(prices, sizes):
+            decimal_build_order(PAIR, 'BTC_USDT', 'buy', 'limitGtc', size, price)
+
+    def run_float():
+        for price, size in zip(prices, sizes):
+            float_build_order(float_pair, 'BTC_USDT', 'buy', 'limitGtc', size, price)
+
+    def run_fixed():
+        for price, size in zip(prices, sizes):
+            build_order(pair, 'BTC_USDT', 'buy', 'limitGtc', size, price)
+
+    batches = [fills[i:i + 10] for i in range(0, len(fills), 10)]
+
+    def run_decimal_tp():
+        for batch in batches:
+            decimal_take_profit(batch, 1.5)
+
+    def run_fixed_tp():
+        for batch in batches:
+            fixed_take_profit(batch, 1.5, pair.price_scale, pair.size_scale)
+
+    decimal = measure(run_decimal, args.repeat)
+    float_time = measure(run_float, args.repeat)
+    fixed = measure(run_fixed, args.repeat)
+    decimal_tp = measure(run_decimal_tp, args.repeat)
+    fixed_tp = measure(run_fixed_tp, args.repeat)
+
+    # Ticks and lots against exact decimal rounding of the same digits
+    exact_ticks = Scale(PAIR['minTickPrice'])
+    exact_lots = Scale(PAIR['minLotSize'])
+    off_ticks = sum(
+        float_pair.format_price(price) != exact_ticks.format(exact_ticks.steps(repr(price), NEAREST))
+        for price in prices
+    )
+    off_lots = sum(
+        float_pair.format_size(size) != exact_lots.format(exact_lots.steps(repr(size), DOWN))
+        for size in sizes
+    )
+    off_tp = sum(
+        abs(decimal_take_profit(batch, 1.5) * 100 - fixed_take_profit(batch, 1.5, pair.price_scale, pair.size_scale) * 100) >= 1
+        for batch in batches
+    )
+
+    n = args.orders
+    print(f"{n} orders, best of {args.repeat}")
+    print(f"build_order  decimal {decimal / n * 1e6:>7.2f} us  float {float_time / n * 1e6:>7.2f} us  "
+          f"fixed {fixed / n * 1e6:>7.2f} us  {decimal / fixed:>5.1f}x vs decimal")
+    print(f"take-profit  decimal {decimal_tp / len(batches) * 1e6:>7.2f} us  fixed {fixed_tp / len(batches) * 1e6:>7.2f} us"
+          f"  {decimal_tp / fixed_tp:>5.1f}x  (10 fills per position)")
+    print(f"float path off the exact grid: {off_ticks} prices, {off_lots} sizes; "
+          f"{off_tp}/{len(batches)} take-profits differ by a tick or more")
+
+if __name__ == "__main__":
+    main()
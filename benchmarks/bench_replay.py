@@ -0,0 +1,89 @@
+"""
+Run the bot loop offline against a recorded session tape.
+
+Record a tape during a real session, then replay it as often as needed:
+
+    ARKHAM_TRANSPORT_MODE=record ARKHAM_TRANSPORT_TAPE=grid.jsonl python main.py
+    python -m benchmarks.bench_replay --tape grid.jsonl --speed 0 --duration 30 --profile
+
+--speed 1 replays recorded latencies, --speed 0 serves as fast as possible.
+--params takes a JSON file with the same keys MainWindow passes to BotWorker.
+"""
+import argparse
+import cProfile
+import json
+import os
+import pstats
+import threading
+import time
+
+GRID_PARAMS = {
+    'symbol': 'BTC_USDT',
+    'usdt_amount': 100.0,
+    'num_orders': 10,
+    'price_drop': 5.0,
+    'first_order_offset': 0.5,
+    'mode': 'Grid Trading',
+    'price_deviation_pct': 1.0,
+    'target_profit_pct': 1.0
+}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--tape', required=True)
+    parser.add_argument('--speed', type=float, default=0)
+    parser.add_argument('--duration', type=float, default=30)
+    parser.add_argument('--params')
+    parser.add_argument('--profile', action='store_true')
+    parser.add_argument('--top', type=int, default=25)
+    args = parser.parse_args()
+
+    # The transport mode is read when the api modules are first imported
+    os.environ['ARKHAM_TRANSPORT_MODE'] = 'replay'
+    os.environ['ARKHAM_TRANSPORT_TAPE'] = args.tape
+    os.environ['ARKHAM_REPLAY_SPEED'] = str(args.speed)
+
+    from api.scheduler import get_scheduler
+    from api.transport import get_session
+    from gui.bot_worker import BotWorker
+    from utils.tracing import get_tracer, summarize
+
+    params = dict(GRID_PARAMS)
+    if args.params:
+        with open(args.params) as f:
+            params.update(json.load(f))
+    # The private stream is not on the tape; fills come from the replayed REST reads
+    params['use_order_stream'] = False
+
+    worker = BotWorker(params)
+    profiler = cProfile.Profile() if args.profile else None
+
+    def run():
+        if profiler:
+            profiler.enable()
+        worker.run()
+        if profiler:
+            profiler.disable()
+
+    start = time.perf_counter()
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    thread.join(args.duration)
+    worker.stop()
+    thread.join(10)
+    elapsed = time.perf_counter() - start
+
+    adapter = get_session().get_adapter('https://')
+    print(f"replayed {args.tape} for {elapsed:.2f}s at speed {args.speed}")
+    print(f"responses {adapter.stats}")
+    for lane, stats in get_scheduler().get_stats().items():
+        print(f"{lane:<9} {stats['requests']:>6} requests  avg wait {stats['avg_wait_ms']:.1f} ms")
+    for kind, data in summarize(get_tracer().traces()).items():
+        total = data['total']
+        print(f"{kind}: {total['count']} reactions, p50 {total['p50']:.1f} ms, max {total['max']:.1f} ms")
+
+    if profiler:
+        pstats.Stats(profiler).sort_stats('cumulative').print_stats(args.top)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Sign-and-encode cost per order: the old per-call path against RequestSigner.
+
+The old path base64-decodes the secret, builds a new HMAC and serializes the
+body twice (once to sign, once when requests encodes json=). The signer
+reuses the decoded key and HMAC state and encodes the body once.
+
+    python -m benchmarks.bench_signing
+"""
+import argparse
+import base64
+import hashlib
+import hmac
+import json
+import os
+import time
+
+from utils.auth import RequestSigner
+
+API_KEY = 'benchmark-key'
+API_SECRET = base64.b64encode(os.urandom(32)).decode('ascii')
+
+ORDER = {
+    "symbol": "BTC_USDT",
+    "side": "buy",
+    "type": "limitGtc",
+    "size": "0.00150",
+    "postOnly": False,
+    "price": "64321.50"
+}
+
+def legacy_sign_and_encode(method, path, data):
+    body = json.dumps(data)
+    timestamp = str(int((time.time() + 300) * 1_000_000))
+    message = f"{API_KEY}{timestamp}{method}{path}{body}"
+    signature = hmac.new(base64.b64decode(API_SECRET), message.encode('utf-8'), hashlib.sha256).digest()
+    headers = {
+        'Arkham-Api-Key': API_KEY,
+        'Arkham-Expires': timestamp,
+        'Arkham-Signature': base64.b64encode(signature).decode('ascii'),
+        'Content-Type': 'application/json',
+        'Accept': 'application/json'
+    }
+    # requests re-serializes json=data before sending
+    sent = json.dumps(data).encode('utf-8')
+    return headers, sent
+
+def measure(label, fn, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn('POST', '/orders/new', ORDER)
+    elapsed = time.perf_counter() - start
+    per_call = elapsed / iterations * 1_000_000
+    print(f"{label:<8} {iterations / elapsed:>12,.0f} orders/s  {per_call:.2f} us/order")
+    return per_call
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--iterations', type=int, default=200_000)
+    args = parser.parse_args()
+
+    signer = RequestSigner(API_KEY, API_SECRET)
+    legacy = measure('legacy', legacy_sign_and_encode, args.iterations)
+    fast = measure('signer', signer.sign_json, args.iterations)
+    print(f"speedup  {legacy / fast:.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Tick store: append rate, time-window reads and OHLCV over memory-mapped
+columns against loading the whole series.
+
+    python -m benchmarks.bench_tick_store --ticks 5000000
+
+The series is written through TickStore.record_price into a temporary
+directory. "load" reads both columns into RAM and masks the window, as a
+reader without the index would; "mapped" is TickStore.read on a fresh
+read-only store, which maps the files and binary-searches the window.
+"""
+import argparse
+import shutil
+import tempfile
+import time
+import numpy as np
+from api.tick_store import TickStore
+
+def measure(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--ticks', type=int, default=5_000_000)
+    parser.add_argument('--window', type=float, default=3600, help="seconds read per range query")
+    parser.add_argument('--interval', type=float, default=60, help="candle seconds")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    times = 1.7e9 + np.cumsum(rng.exponential(0.1, args.ticks))  # ~10 ticks a second
+    prices = 65000 * np.exp(np.cumsum(rng.normal(0, 0.0002, args.ticks)))
+    root = tempfile.mkdtemp(prefix='ticks-')
+    try:
+        store = TickStore(root)
+        start = time.perf_counter()
+        for t, price in zip(times.tolist(), prices.tolist()):
+            store.record_price('BTC_USDT', price, at=t)
+        store.flush()
+        append = time.perf_counter() - start
+
+        middle = times[len(times) // 2]
+        window = (middle, middle + args.window)
+        reader = TickStore(root, readonly=True)
+        series = reader.get_series('BTC_USDT')
+        files = series.files
+
+        def load():
+            loaded_times = np.fromfile(files[0])
+            mask = (loaded_times >= window[0]) & (loaded_times < window[1])
+            return np.fromfile(files[1])[mask]
+
+        def mapped():
+            return reader.read('BTC_USDT', start=window[0], end=window[1])['price']
+
+        def candles_load():
+            loaded_times = np.fromfile(files[0])
+            mask = (loaded_times >= window[0]) & (loaded_times < window[1])
+            return len(np.unique(np.floor_divide(loaded_times[mask], args.interval)))
+
+        def candles_mapped():
+            return len(reader.ohlcv('BTC_USDT', args.interval, *window)['open'])
+
+        load_time, loaded = measure(load, args.repeat)
+        mapped_time, window_prices = measure(mapped, args.repeat)
+        candles_load_time, _ = measure(candles_load, args.repeat)
+        candles_time, candles = measure(candles_mapped, args.repeat)
+        full_time, full = measure(lambda: reader.ohlcv('BTC_USDT', args.interval), 1)
+        assert np.array_equal(loaded, window_prices)
+
+        n = args.ticks
+        print(f"{n} ticks, {n * 16 / 1e6:.0f} MB on disk; best of {args.repeat}")
+        print(f"append        {append / n * 1e6:>8.2f} us/tick")
+        print(f"window read   load {load_time * 1e3:>8.2f} ms  mapped {mapped_time * 1e3:>8.3f} ms  "
+              f"({len(window_prices)} ticks in {args.window:.0f} s)")
+        print(f"window OHLCV  load {candles_load_time * 1e3:>8.2f} ms  mapped {candles_time * 1e3:>8.3f} ms  "
+              f"({candles} candles of {args.interval:.0f} s)")
+        print(f"full OHLCV    {full_time * 1e3:>8.2f} ms  ({len(full['open'])} candles)")
+    finally:
+        shutil.rmtree(root)
+
+if __name__ == "__main__":
+    main()
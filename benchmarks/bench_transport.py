@@ -0,0 +1,93 @@
+"""
+Compare bare requests.get calls with the pooled keep-alive transport.
+
+Runs against a local HTTP/1.1 server by default. Pass --url to measure a
+real endpoint, where TLS handshakes make the difference much larger:
+
+    python -m benchmarks.bench_transport --url https://arkm.com/api/public/server-time
+"""
+import argparse
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from api.transport import create_session, DEFAULT_TIMEOUT
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # Keep-alive aware
+    disable_nagle_algorithm = True  # Avoid 40ms delayed-ACK stalls on reused sockets
+
+    def do_GET(self):
+        body = b'{"serverTime": 0}'
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def start_local_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/public/server-time"
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+def run(label, fetch, url, total, workers):
+    latencies = []
+    lock = threading.Lock()
+
+    def one(_):
+        start = time.perf_counter()
+        fetch(url).content
+        elapsed = time.perf_counter() - start
+        with lock:
+            latencies.append(elapsed)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(one, range(total)))
+    wall = time.perf_counter() - start
+
+    print(
+        f"{label:<10} {total / wall:>10.1f} req/s"
+        f"  p50={statistics.median(latencies) * 1000:.2f}ms"
+        f"  p99={percentile(latencies, 99) * 1000:.2f}ms"
+        f"  max={max(latencies) * 1000:.2f}ms"
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--url', help="Endpoint to hit instead of the local server")
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--workers', type=int, default=4)
+    args = parser.parse_args()
+
+    server = None
+    url = args.url
+    if not url:
+        server, url = start_local_server()
+
+    print(f"Target: {url} ({args.requests} requests, {args.workers} workers)")
+    try:
+        # Today's behaviour: a fresh connection for every call
+        run('bare', lambda u: requests.get(u, timeout=DEFAULT_TIMEOUT), url, args.requests, args.workers)
+
+        session = create_session(pool_size=args.workers)
+        run('pooled', lambda u: session.get(u, timeout=DEFAULT_TIMEOUT), url, args.requests, args.workers)
+        session.close()
+    finally:
+        if server:
+            server.shutdown()
+
+if __name__ == "__main__":
+    main()
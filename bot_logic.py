@@ -2,6 +2,10 @@ import time
 import logging
 from decimal import Decimal
 from api_client import ArkhamClient
+from api.market_api import get_current_price
+from trading.order_batch import submit_grid_orders
+from trading.mass_cancel import MassCanceller
+from api.retry import Backoff
 
 class TradingBot:
     def __init__(self):
@@ -10,6 +14,8 @@ class TradingBot:
         self.active_orders = []
         self.current_position = None
         self.is_running = False
+        # The legacy client has no active-orders call, so cancels are not confirmed
+        self.mass_canceller = MassCanceller(cancel_fn=self.api.cancel_order, active_orders_fn=None)
         
     def calculate_grid_levels(self, current_price, usdt_amount, num_orders, price_drop, first_order_offset):
         try:
@@ -33,33 +39,33 @@ class TradingBot:
             self.logger.error(f"Error calculating grid levels: {e}")
             return []
             
-    def place_grid_orders(self, symbol, grid_levels):
+    def place_grid_orders(self, symbol, grid_levels, current_price=None):
         try:
-            placed_orders = []
-            for level in grid_levels:
-                order = self.api.place_order(
-                    symbol=symbol,
-                    side='buy',
-                    order_type='limitGtc',
-                    size=level['size'],
-                    price=level['price']
-                )
-                if order:
-                    placed_orders.append(order)
-                    
-            return placed_orders
+            submission = submit_grid_orders(
+                self.api.place_order,
+                symbol,
+                grid_levels,
+                side='buy',
+                reference_price=current_price
+            )
+            for result in submission.failed:
+                self.logger.error(f"Failed to place order at price {result.level['price']}: {result.error}")
+
+            return [result.order for result in submission.placed]
         except Exception as e:
             self.logger.error(f"Error placing grid orders: {e}")
             return []
             
     def monitor_orders(self, symbol, target_profit_pct, price_deviation_pct):
+        backoff = Backoff(base=1, max_delay=30)
         while self.is_running:
             try:
-                ticker = self.api.get_ticker(symbol)
-                if not ticker:
+                current_price = get_current_price(symbol)
+                if not current_price:
+                    # No price yet: wait with backoff instead of spinning on the API
+                    time.sleep(backoff.next())
                     continue
                     
-                current_price = float(ticker['price'])
                 
                 # Check for filled orders
                 for order in self.active_orders:
@@ -70,11 +76,12 @@ class TradingBot:
                 if self.should_adjust_grid(current_price, price_deviation_pct):
                     self.adjust_grid(symbol, current_price)
                     
+                backoff.reset()
                 time.sleep(1)  # Avoid excessive API calls
                 
             except Exception as e:
                 self.logger.error(f"Error monitoring orders: {e}")
-                time.sleep(5)
+                time.sleep(backoff.next())
                 
     def handle_filled_order(self, filled_order, current_price, target_profit_pct):
         try:
@@ -126,8 +133,7 @@ class TradingBot:
     def adjust_grid(self, symbol, current_price):
         try:
             # Cancel all existing orders
-            for order in self.active_orders:
-                self.api.cancel_order(order['orderId'])
+            self.mass_canceller.cancel([order['orderId'] for order in self.active_orders])
                 
             # Calculate and place new grid orders
             self.active_orders = []
@@ -148,7 +154,7 @@ class TradingBot:
                 current_price, usdt_amount, num_orders, price_drop, first_order_offset
             )
             
-            self.active_orders = self.place_grid_orders(symbol, grid_levels)
+            self.active_orders = self.place_grid_orders(symbol, grid_levels, current_price)
             self.monitor_orders(symbol, target_profit_pct, price_deviation_pct)
             
         except Exception as e:
@@ -158,5 +164,4 @@ class TradingBot:
     def stop(self):
         self.is_running = False
         # Cancel all active orders
-        for order in self.active_orders:
-            self.api.cancel_order(order['orderId'])
\ No newline at end of file
+        self.mass_canceller.cancel([order['orderId'] for order in self.active_orders])
\ No newline at end of file
@@ -4,7 +4,92 @@ from dotenv import load_dotenv
 load_dotenv()
 
 # API Configuration
-API_KEY = '-----'
-API_SECRET = '------'
-BASE_URL = 'https://arkm.com/api'
-WS_URL = 'wss://arkm.com/ws'
\ No newline at end of file
+API_KEY = os.getenv('ARKHAM_API_KEY', '-----')
+API_SECRET = os.getenv('ARKHAM_API_SECRET', '------')
+BASE_URL = os.getenv('ARKHAM_BASE_URL', 'https://arkm.com/api')  # Point at simulator.exchange_server for load tests
+WS_URL = os.getenv('ARKHAM_WS_URL', 'wss://arkm.com/ws')
+
+# HTTP transport settings
+HTTP_POOL_SIZE = 10  # Max keep-alive connections held open to BASE_URL
+HTTP_CONNECT_TIMEOUT = 3.05  # seconds
+HTTP_READ_TIMEOUT = 10  # seconds
+HTTP_PREWARM_CONNECTIONS = 4  # Connections opened at startup
+HTTP_PREWARM_PATH = '/public/server-time'
+
+# Pair metadata cache
+PAIR_CACHE_FILE = 'pair_cache.json'
+PAIR_CACHE_TTL = 3600  # seconds before /public/pairs is fetched again
+
+# Async client settings
+ASYNC_HTTP_POOL_SIZE = 100  # Max concurrent connections for AsyncArkhamClient
+
+# WebSocket settings
+WS_HEARTBEAT = 20  # seconds between pings
+WS_RECONNECT_MAX_DELAY = 30  # seconds, cap for reconnect backoff
+WS_STALE_AFTER = 30  # seconds without updates before falling back to REST
+
+# Request scheduler token buckets: endpoint class -> (requests per second, burst)
+RATE_LIMITS = {
+    'orders': (10, 20),  # /orders/new, /orders/cancel
+    'account': (5, 10),  # /orders, /orders/history, /account/*
+    'public': (10, 20)   # /public/*
+}
+# Longest pause the scheduler takes from a rate-limit header (seconds)
+MAX_RATE_LIMIT_PAUSE = 60.0
+
+# Identical account reads within this window share one response (seconds)
+READ_COALESCE_WINDOW = 0.5
+
+# Balance ledger: full REST reconciliation interval (seconds)
+BALANCE_RECONCILE_INTERVAL = 30
+
+# Retries: exponential backoff with jitter inside a per-call deadline
+RETRY_ATTEMPTS = 3
+RETRY_BASE_DELAY = 0.1  # seconds, doubled per attempt
+RETRY_MAX_DELAY = 2.0
+READ_DEADLINE = 10.0  # seconds for a read including retries
+ORDER_DEADLINE = 5.0  # seconds for a placement or cancel including retries
+
+# Circuit breaker per endpoint: open after this many consecutive failures
+CIRCUIT_FAILURE_THRESHOLD = 5
+CIRCUIT_RESET_TIMEOUT = 10.0  # seconds before a trial request is let through
+
+# Transport mode: 'live', 'record' (live plus a JSONL tape) or 'replay' (served from the tape)
+TRANSPORT_MODE = os.getenv('ARKHAM_TRANSPORT_MODE', 'live')
+TRANSPORT_TAPE = os.getenv('ARKHAM_TRANSPORT_TAPE', 'session_tape.jsonl')
+REPLAY_SPEED = float(os.getenv('ARKHAM_REPLAY_SPEED', '1'))  # 1 = recorded latency, 0 = as fast as possible
+
+# Local order/trade store (SQLite, WAL mode)
+ORDER_STORE_FILE = 'orders.db'
+ORDER_HISTORY_PAGE = 20  # history rows fetched per sync while nothing new is missed
+ORDER_HISTORY_MAX_PAGE = 500
+
+# Local market history: memory-mapped float64 columns per symbol. Recording is
+# opt-in: set ARKHAM_TICK_STORE to a directory (e.g. 'ticks') to enable it
+TICK_STORE_DIR = os.getenv('ARKHAM_TICK_STORE', '')
+TICK_STORE_FLUSH_ROWS = 1024  # rows buffered per series before they are appended to the files
+TICK_STORE_FLUSH_INTERVAL = 1.0  # seconds a buffered row may wait
+TICK_STORE_INDEX_STRIDE = 4096  # rows per entry of the in-memory time index
+
+# API metrics export (Prometheus text format); unset disables that output
+METRICS_FILE = os.getenv('ARKHAM_METRICS_FILE')  # e.g. a node_exporter textfile collector path
+METRICS_PORT = int(os.getenv('ARKHAM_METRICS_PORT', '0')) or None  # serves http://127.0.0.1:<port>/metrics
+METRICS_EXPORT_INTERVAL = 15  # seconds between file writes
+
+# Reaction tracing: finished traces kept in memory, appended to the dump file on request
+TRACE_BUFFER_SIZE = 1000
+TRACE_DUMP_FILE = 'traces.jsonl'
+
+# Logging: queued writer, JSONL file with size rotation, per-module levels
+LOG_LEVEL = os.getenv('ARKHAM_LOG_LEVEL', 'INFO')
+LOG_LEVELS = {  # module -> level, extended by ARKHAM_LOG_LEVELS="api.transport=DEBUG,..."
+    'urllib3': 'WARNING',
+    **dict(
+        item.strip().split('=', 1) for item in os.getenv('ARKHAM_LOG_LEVELS', '').split(',') if '=' in item
+    )
+}
+LOG_FILE = os.getenv('ARKHAM_LOG_FILE', 'trading_bot.log')
+LOG_FILE_FORMAT = os.getenv('ARKHAM_LOG_FORMAT', 'jsonl')  # 'jsonl' or 'text'
+LOG_MAX_BYTES = 10 * 1024 * 1024
+LOG_BACKUPS = 5
+LOG_QUEUE_SIZE = 10000  # records; more are dropped instead of blocking the caller
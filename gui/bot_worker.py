@@ -1,27 +1,42 @@
 import logging
+import queue
 import time
 from PyQt6.QtCore import QThread, pyqtSignal
-from decimal import Decimal
 
-from api.market_api import get_ticker
-from api.trading_api import place_order, cancel_order, get_active_orders
-from trading.grid_calculator import calculate_grid_levels
+from api.balance_ledger import get_balance_ledger
+from api.coalescer import get_account_reads
+from api.order_stream import OrderStream
+from api.order_tracker import get_order_tracker, CANCELLED
+from api.retry import Backoff
+from trading.grid_calculator import calculate_grid_ladder
+from trading.grid_engine import LINEAR
+from trading.grid_reconciler import GridReconciler
+from trading.order_batch import submit_grid_orders, MAX_CONCURRENT_ORDERS
+from trading.mass_cancel import MassCanceller, FLATTEN_DEADLINE
 from trading.position_manager import PositionManager
+from trading.venue import Venue
 from trading.volume_trader import VolumeTrader
+from utils.tracing import trace, span
 
 class BotWorker(QThread):
     error = pyqtSignal(str)
     delay_updated = pyqtSignal(float)
     
-    def __init__(self, params):
+    def __init__(self, params, venue=None, volume_trader=None):
         super().__init__()
         self.logger = logging.getLogger(__name__)
         self.params = params
+        self.venue = venue or Venue()  # Live API unless a backtest passes a simulated one
         self.grid_orders = {}  # Track grid orders by order ID
+        self.applied_fills = {}  # orderId -> (size, notional) of its executions already in the position
+        self.failed_grid_levels = []  # Levels rejected during the last placement
+        self.last_grid_placement_time = None  # seconds
+        self.grid_origin_ticks = 0  # Lattice origin of the current grid, kept across re-centers
+        self.last_recenter = None  # RecenterReport of the last re-center
         self.take_profit_order = None
-        self.position_manager = PositionManager()
+        self.position_manager = PositionManager(params['symbol'])
         self.has_filled_orders = False
-        self.volume_trader = None if params['mode'] == "Grid Trading" else VolumeTrader(
+        self.volume_trader = None if params['mode'] == "Grid Trading" else volume_trader or VolumeTrader(
             params['symbol'],
             params['min_delay'],
             params['max_delay'],
@@ -31,25 +46,54 @@ class BotWorker(QThread):
         if self.volume_trader:
             self.volume_trader.use_trailing_limit = params.get('use_trailing_limit', False)
             self.volume_trader.price_deviation_pct = params.get('price_deviation_pct', 0)
+        self.mass_canceller = MassCanceller(
+            params['symbol'],
+            cancel_fn=self.venue.cancel_order,
+            active_orders_fn=self.venue.get_active_orders,
+            # Account-wide endpoint, only safe when nothing else trades on the account
+            cancel_all_fn=self.venue.cancel_all_orders if params.get('use_cancel_all') else None
+        )
+        self.grid_reconciler = GridReconciler(
+            params['symbol'],
+            canceller=self.mass_canceller,
+            place_order_fn=self.venue.place_order,
+            max_concurrency=params.get('max_concurrent_orders', MAX_CONCURRENT_ORDERS)
+        )
+        # Fills are pushed by the private order stream; REST diffing is the fallback
+        self.order_events = queue.Queue()
+        self.needs_reconcile = False
+        self.order_stream = None
+        if params.get('use_order_stream', True):
+            self.order_stream = OrderStream()
+            self.order_stream.add_order_listener(self.order_events.put)
+            self.order_stream.add_reconnect_listener(self.request_reconcile)
         self.is_running = False
         
     def run(self):
         try:
             self.is_running = True
             self.logger.info(f"Starting bot with parameters: {self.params}")
+
+            if self.order_stream:
+                self.order_stream.start()
+            # Seed the order tracker with orders placed before this run
+            self.venue.get_active_orders(self.params['symbol'])
             
             # Initial grid setup
             self.setup_grid()
             
             # Main monitoring loop
+            backoff = Backoff(base=1, max_delay=30)
             while self.is_running:
                 try:
                     self.monitor_orders()
-                    time.sleep(2)  # Avoid excessive API calls
+                    # Returns as soon as a stream event arrives, otherwise after 2s
+                    self.process_order_events(timeout=2)
+                    backoff.reset()
                 except Exception as e:
                     self.logger.error(f"Error in monitoring loop: {e}")
                     self.error.emit(str(e))
-                    time.sleep(5)
+                    time.sleep(backoff.next())
                     
         except Exception as e:
             self.logger.error(f"Bot error: {e}")
@@ -57,12 +101,29 @@ class BotWorker(QThread):
         finally:
             self.is_running = False
             
-    def stop(self):
-        """Stop the bot and cancel all orders"""
+    def stop(self, flatten=False):
+        """Stop the bot and cancel all orders, optionally selling the position"""
         self.is_running = False
         if self.volume_trader:
             self.volume_trader.stop()
-        self.cancel_all_orders()
+        if self.order_stream:
+            self.order_stream.stop()
+        if flatten:
+            self.flatten()
+        else:
+            self.cancel_all_orders()
+
+        stats = get_account_reads().get_stats()
+        self.logger.info(f"Account reads: {stats['calls']} calls, {stats['executed']} sent, {stats['saved']} coalesced")
+
+    def flatten(self):
+        """Cancel everything for the symbol and sell the base balance"""
+        report = self.mass_canceller.flatten(self.params.get('flatten_deadline', FLATTEN_DEADLINE))
+        self.grid_orders.clear()
+        self.applied_fills.clear()
+        self.take_profit_order = None
+        self.position_manager.clear_position()
+        return report
         
     def setup_grid(self):
         """Set up initial grid orders"""
@@ -71,53 +132,86 @@ class BotWorker(QThread):
             self.has_filled_orders = False
             
             # Get current price
-            ticker = get_ticker(self.params['symbol'])
-            if not ticker:
+            current_price = self.venue.get_current_price(self.params['symbol'])
+            if not current_price:
                 raise Exception("Could not get current price")
                 
-            current_price = float(ticker['price'])
-            self.logger.info(f"Current price for {self.params['symbol']}: {current_price}")
+            self.logger.info("Current price for %s: %s", self.params['symbol'], current_price)
             
             # Calculate grid levels
-            grid_levels = calculate_grid_levels(
-                current_price,
-                self.params['usdt_amount'],
-                self.params['num_orders'],
-                self.params['price_drop'],
-                self.params['first_order_offset'],
-                self.params['symbol']
-            )
+            with span('grid_levels'):
+                ladder = self.calculate_ladder(current_price)
+            grid_levels = ladder.to_levels() if ladder else []
+            self.grid_origin_ticks = ladder.origin_ticks if ladder else 0
             
             self.logger.info(f"Calculated {len(grid_levels)} grid levels")
             
             # Place grid orders
             self.logger.info("Placing grid orders...")
-            self.place_grid_orders(grid_levels)
+            with span('place_grid_orders'):
+                self.place_grid_orders(grid_levels, current_price)
             
         except Exception as e:
             self.logger.error(f"Error setting up grid: {e}")
             raise
             
-    def place_grid_orders(self, grid_levels):
-        """Place all grid buy orders"""
+    def calculate_ladder(self, current_price, origin_ticks=None, reserved_usdt=0.0):
+        """Target ladder for the current price, on the lattice through origin_ticks so re-centers overlap"""
+        return calculate_grid_ladder(
+            current_price,
+            self.params['usdt_amount'],
+            self.params['num_orders'],
+            self.params['price_drop'],
+            self.params['first_order_offset'],
+            self.params['symbol'],
+            spacing=self.params.get('grid_spacing', LINEAR),
+            origin_ticks=origin_ticks,
+            reserved_usdt=reserved_usdt,
+            balance_fn=self.venue.available_usdt,
+            book_fn=self.venue.get_order_book
+        )
+
+    def recenter_grid(self, current_price):
+        """Move the grid to the current price, only touching levels that change"""
+        # Quote locked in the live grid is available to the new ladder
+        reserved_usdt = sum(float(order['price']) * float(order['size']) for order in self.grid_orders.values())
+        with span('grid_levels'):
+            ladder = self.calculate_ladder(current_price, self.grid_origin_ticks or None, reserved_usdt)
+        if not ladder:
+            self.logger.warning("No grid levels to re-center onto, keeping the current grid")
+            return None
+
+        with span('reconcile_grid'):
+            report = self.grid_reconciler.recenter(self.grid_orders, ladder, current_price)
+        self.grid_origin_ticks = ladder.origin_ticks or self.grid_origin_ticks
+        self.failed_grid_levels = report.place_failed
+        self.last_grid_placement_time = report.elapsed
+        self.last_recenter = report
+        return report
+
+    def place_grid_orders(self, grid_levels, current_price=None):
+        """Place all grid buy orders concurrently, nearest to price first"""
         try:
-            for level in grid_levels:
-                self.logger.info(f"Placing buy order at price {level['price']} with size {level['size']}")
-                
-                order = place_order(
-                    symbol=self.params['symbol'],
-                    side='buy',
-                    order_type='limitGtc',
-                    size=level['size'],
-                    price=level['price']
-                )
-                
-                if order:
-                    self.logger.info(f"Successfully placed buy order: {order}")
-                    self.grid_orders[order['orderId']] = order
-                else:
-                    self.logger.error(f"Failed to place order at price {level['price']}")
-                    
+            submission = submit_grid_orders(
+                self.venue.place_order,
+                self.params['symbol'],
+                grid_levels,
+                side='buy',
+                reference_price=current_price,
+                max_concurrency=self.params.get('max_concurrent_orders', MAX_CONCURRENT_ORDERS)
+            )
+
+            for result in submission.placed:
+                self.grid_orders[result.order['orderId']] = result.order
+
+            # Failed levels are kept apart, grid_orders only tracks live orders
+            self.failed_grid_levels = submission.failed
+            for result in submission.failed:
+                self.logger.error(f"Failed to place order at price {result.level['price']}: {result.error}")
+
+            self.last_grid_placement_time = submission.elapsed
+            return submission
+
         except Exception as e:
             self.logger.error(f"Error placing grid orders: {e}")
             raise
@@ -125,25 +219,12 @@ class BotWorker(QThread):
     def monitor_orders(self):
         """Monitor orders for fills and price deviations"""
         try:
-            active_orders = get_active_orders(self.params['symbol'])
-            active_order_ids = {order['orderId'] for order in active_orders}
-            
-            # Check for filled buy orders
-            for order_id in list(self.grid_orders.keys()):
-                if order_id not in active_order_ids:
-                    filled_order = self.grid_orders.pop(order_id)
-                    self.logger.info(f"Buy order filled: {filled_order}")
-                    
-                    if self.params['mode'] == "Grid Trading":
-                        self.handle_filled_buy_order_grid(filled_order)
-                    else:
-                        # Start volume trading cycle
-                        self.volume_trader.handle_filled_buy(filled_order, self.setup_grid)
-                    
-            if self.params['mode'] == "Grid Trading":
-                # Check if take-profit order was filled
-                if self.take_profit_order and self.take_profit_order['orderId'] not in active_order_ids:
-                    self.handle_filled_sell_order_grid()
+            if self.order_stream and self.order_stream.connected:
+                # Fills arrive as events; only catch up after a (re)connect
+                if self.needs_reconcile:
+                    self.reconcile_orders()
+            else:
+                self.diff_active_orders()
             
             # Check price deviation for both modes if no orders are filled
             if not self.has_filled_orders:
@@ -152,6 +233,174 @@ class BotWorker(QThread):
         except Exception as e:
             self.logger.error(f"Error monitoring orders: {e}")
             
+    def diff_active_orders(self):
+        """Detect fills of grid orders from the order tracker, refreshed by an active-order poll"""
+        # The poll brings the tracker up to date: orders missing from it are flagged vanished
+        self.venue.get_active_orders(self.params['symbol'])
+        detected = time.perf_counter()
+        tracker = get_order_tracker()
+        self.resolve_vanished(tracker)
+
+        # Check for filled buy orders
+        for order_id in list(self.grid_orders.keys()):
+            tracked = tracker.get(order_id)
+            if tracked and tracked.is_open:
+                continue
+            order = self.grid_orders.pop(order_id)
+            applied_size, applied_notional = self.applied_fills.pop(order_id, (0.0, 0.0))
+            if tracked and tracked.state == CANCELLED:
+                self.logger.info(f"Buy order cancelled: {order}")
+                executed = tracked.executed
+            else:
+                self.logger.info(f"Buy order filled: {order}")
+                # No stream event moved the balances for this fill
+                get_balance_ledger().record_closed(order_id, tracked.avg_price if tracked else None)
+                executed = float(order['size'])
+            # Stream partials before the stream dropped are already in the position
+            remaining = executed - applied_size
+            if remaining <= 0:
+                continue
+            avg_price = tracked.avg_price if tracked else None
+            if avg_price and executed > 0:
+                # What the aggregate executions not yet applied cost, per unit
+                price = (executed * avg_price - applied_notional) / remaining
+            else:
+                price = float(order['price'])
+            filled_order = {**order, 'size': remaining, 'price': price}
+
+            if self.params['mode'] == "Grid Trading":
+                with trace('tp_replace', started=detected, order_id=order_id, source='poll'):
+                    self.handle_filled_buy_order_grid(filled_order)
+            else:
+                # Start volume trading cycle
+                self.volume_trader.handle_filled_buy(filled_order, self.setup_grid)
+
+        if self.params['mode'] == "Grid Trading" and self.take_profit_order:
+            # Check if take-profit order was filled
+            order_id = self.take_profit_order['orderId']
+            tracked = tracker.get(order_id)
+            if tracked and tracked.state == CANCELLED:
+                # Cancelled outside the bot, put the take-profit back
+                self.logger.warning(f"Take-profit order {order_id} was cancelled, re-placing")
+                self.take_profit_order = None
+                self.place_take_profit_order()
+            elif not (tracked and tracked.is_open):
+                get_balance_ledger().record_closed(order_id, tracked.avg_price if tracked else None)
+                with trace('regrid', started=detected, reason='take_profit', source='poll'):
+                    self.handle_filled_sell_order_grid()
+
+        # The stream missed whatever happened while we were polling
+        self.needs_reconcile = True
+
+    def resolve_vanished(self, tracker):
+        """Learn from history how our vanished orders ended, so a cancel is not taken for a fill"""
+        order_ids = set(self.grid_orders)
+        if self.take_profit_order:
+            order_ids.add(self.take_profit_order['orderId'])
+        vanished = set()
+        for order_id in order_ids:
+            tracked = tracker.get(order_id)
+            if tracked and tracked.vanished:
+                vanished.add(order_id)
+        if not vanished:
+            return
+        for order in self.venue.get_order_history(self.params['symbol']):
+            if order.get('orderId') in vanished:
+                tracker.apply(order)
+
+    def request_reconcile(self):
+        """Called by the order stream after each (re)connect"""
+        self.needs_reconcile = True
+
+    def reconcile_orders(self):
+        """Replay missed updates for tracked orders that are no longer active"""
+        self.needs_reconcile = False
+        tracked_ids = set(self.grid_orders)
+        if self.take_profit_order:
+            tracked_ids.add(self.take_profit_order['orderId'])
+        if not tracked_ids:
+            return
+
+        active_ids = {order['orderId'] for order in self.venue.get_active_orders(self.params['symbol'])}
+        missing_ids = tracked_ids - active_ids
+        if not missing_ids:
+            return
+
+        self.logger.info(f"Reconciling {len(missing_ids)} orders after reconnect")
+        history = {order['orderId']: order for order in self.venue.get_order_history(self.params['symbol'])}
+        for order_id in missing_ids:
+            order = history.get(order_id)
+            if order:
+                # Same path as a live update, events land in the queue
+                self.order_stream.process_order_update(order)
+            else:
+                # Not in recent history either, assume filled as the REST diff does
+                order = self.grid_orders.get(order_id) or self.take_profit_order
+                self.order_stream.process_order_update({
+                    **order,
+                    'status': 'closed',
+                    'executedSize': order['size']
+                })
+
+    def process_order_events(self, timeout=0):
+        """Handle queued order stream events, waiting up to timeout for the first"""
+        try:
+            event = self.order_events.get(timeout=timeout) if timeout else self.order_events.get_nowait()
+        except queue.Empty:
+            return
+        while True:
+            self.handle_order_event(event)
+            try:
+                event = self.order_events.get_nowait()
+            except queue.Empty:
+                return
+
+    def handle_order_event(self, event):
+        """Apply a fill, partial fill or cancel pushed by the order stream"""
+        try:
+            order_id = event.order_id
+            if order_id in self.grid_orders:
+                order = self.grid_orders[order_id]
+                if event.fill_size > 0 and self.params['mode'] == "Grid Trading":
+                    # Average in every execution, partial or not
+                    self.logger.info("Buy order %s executed %s at %s", order_id, event.fill_size, event.fill_price)
+                    fill_price = float(event.fill_price or order['price'])
+                    applied_size, applied_notional = self.applied_fills.get(order_id, (0.0, 0.0))
+                    self.applied_fills[order_id] = (applied_size + event.fill_size,
+                                                    applied_notional + event.fill_size * fill_price)
+                    with trace('tp_replace', started=event.received, order_id=order_id, source='stream'):
+                        self.handle_filled_buy_order_grid({
+                            **order,
+                            'size': event.fill_size,
+                            'price': fill_price
+                        })
+
+                if event.type in ('fill', 'cancel'):
+                    self.grid_orders.pop(order_id, None)
+                    self.applied_fills.pop(order_id, None)
+                    if event.type == 'cancel':
+                        self.logger.warning(f"Grid order {order_id} was cancelled (executed {event.executed_size})")
+                    if self.params['mode'] != "Grid Trading" and event.executed_size > 0:
+                        # Start volume trading cycle with everything that executed
+                        self.volume_trader.handle_filled_buy({
+                            **order,
+                            'size': event.executed_size,
+                            'price': event.avg_price or order['price']
+                        }, self.setup_grid)
+
+            elif self.take_profit_order and order_id == self.take_profit_order['orderId']:
+                if event.type == 'fill':
+                    with trace('regrid', started=event.received, reason='take_profit', source='stream'):
+                        self.handle_filled_sell_order_grid()
+                elif event.type == 'cancel':
+                    # Cancelled outside the bot, put the take-profit back
+                    self.logger.warning(f"Take-profit order {order_id} was cancelled, re-placing")
+                    self.take_profit_order = None
+                    self.place_take_profit_order()
+
+        except Exception as e:
+            self.logger.error(f"Error handling order event: {e}")
+            
     def handle_filled_buy_order_grid(self, filled_order):
         """Handle a filled buy order in grid trading mode"""
         try:
@@ -161,14 +410,16 @@ class BotWorker(QThread):
             self.has_filled_orders = True
             
             # Update position
-            self.position_manager.update_position(filled_order)
+            with span('position_update'):
+                self.position_manager.update_position(filled_order)
             self.logger.info(f"Updated position: {self.position_manager.current_position}")
             
             if self.position_manager.current_position:
                 # Cancel existing take-profit order if any
                 if self.take_profit_order:
                     self.logger.info("Cancelling existing take-profit order")
-                    cancel_order(self.take_profit_order['orderId'])
+                    with span('cancel_tp'):
+                        self.venue.cancel_order(self.take_profit_order['orderId'])
                     self.take_profit_order = None
                 
                 # Place new take-profit order
@@ -189,10 +440,12 @@ class BotWorker(QThread):
             self.take_profit_order = None
             
             # Cancel remaining grid orders
-            self.cancel_all_orders()
+            with span('cancel_grid'):
+                self.cancel_all_orders()
             
             # Start new grid with same parameters
-            self.setup_grid()
+            with span('setup_grid'):
+                self.setup_grid()
             
         except Exception as e:
             self.logger.error(f"Error handling filled sell order: {e}")
@@ -204,18 +457,19 @@ class BotWorker(QThread):
                 self.logger.warning("No position exists to place take-profit order")
                 return
                 
-            take_profit_price = self.position_manager.get_take_profit_price(
-                self.params['target_profit_pct']
-            )
-            position_size = self.position_manager.get_position_size()
+            with span('tp_price'):
+                take_profit_price = self.position_manager.get_take_profit_price(
+                    self.params['target_profit_pct']
+                )
+                position_size = self.position_manager.get_position_size()
             
             if not take_profit_price or position_size <= 0:
                 self.logger.error(f"Invalid take-profit parameters: price={take_profit_price}, size={position_size}")
                 return
                 
-            self.logger.info(f"Placing take-profit order: price={take_profit_price}, size={position_size}")
+            self.logger.info("Placing take-profit order: price=%s, size=%s", take_profit_price, position_size)
             
-            order = place_order(
+            order = self.venue.place_order(
                 symbol=self.params['symbol'],
                 side='sell',
                 order_type='limitGtc',
@@ -238,11 +492,11 @@ class BotWorker(QThread):
             if not self.grid_orders:
                 return
                 
-            ticker = get_ticker(self.params['symbol'])
-            if not ticker:
+            current_price = self.venue.get_current_price(self.params['symbol'])
+            if not current_price:
                 return
+            detected = time.perf_counter()
                 
-            current_price = float(ticker['price'])
             highest_order_price = max(float(order['price']) for order in self.grid_orders.values())
             
             price_difference_pct = ((current_price - highest_order_price) / highest_order_price) * 100
@@ -250,22 +504,27 @@ class BotWorker(QThread):
             # Check if price deviation exceeds threshold
             if price_difference_pct > self.params['price_deviation_pct']:
                 self.logger.info(f"Price moved too far (diff: {price_difference_pct}%), adjusting grid...")
-                self.cancel_all_orders()
-                self.setup_grid()
+                with trace('regrid', started=detected, reason='price_deviation') as regrid:
+                    report = self.recenter_grid(current_price)
+                    if report:
+                        regrid.attrs['touched'] = report.touched
                 
         except Exception as e:
             self.logger.error(f"Error checking price deviation: {e}")
             
     def cancel_all_orders(self):
-        """Cancel all active orders"""
+        """Cancel all active orders concurrently"""
         try:
-            for order_id in list(self.grid_orders.keys()):
-                cancel_order(order_id)
-                del self.grid_orders[order_id]
-                
+            order_ids = list(self.grid_orders.keys())
             if self.take_profit_order:
-                cancel_order(self.take_profit_order['orderId'])
-                self.take_profit_order = None
+                order_ids.append(self.take_profit_order['orderId'])
+
+            report = self.mass_canceller.cancel(order_ids)
+
+            self.grid_orders.clear()
+            self.applied_fills.clear()
+            self.take_profit_order = None
+            return report
                 
         except Exception as e:
             self.logger.error(f"Error cancelling orders: {e}")
\ No newline at end of file
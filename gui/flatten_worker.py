@@ -0,0 +1,27 @@
+import logging
+from PyQt6.QtCore import QThread, pyqtSignal
+
+from trading.mass_cancel import MassCanceller
+
+class FlattenWorker(QThread):
+    """Flattens off the GUI thread: stops a running bot with flatten, or flattens the pair directly"""
+    error = pyqtSignal(str)
+    flattened = pyqtSignal(object)  # FlattenReport, or None when a bot did the flatten
+
+    def __init__(self, symbol, bot_thread=None):
+        super().__init__()
+        self.logger = logging.getLogger(__name__)
+        self.symbol = symbol
+        self.bot_thread = bot_thread
+
+    def run(self):
+        try:
+            if self.bot_thread and self.bot_thread.isRunning():
+                self.bot_thread.stop(flatten=True)
+                self.bot_thread.wait()
+                self.flattened.emit(None)
+            else:
+                self.flattened.emit(MassCanceller(self.symbol).flatten())
+        except Exception as e:
+            self.logger.error(f"Error flattening position: {e}")
+            self.error.emit(str(e))
@@ -3,19 +3,27 @@ import time
 from PyQt6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QLabel, QComboBox, QLineEdit, QPushButton,
-    QTableWidget, QTableWidgetItem, QCheckBox
+    QTableWidget, QTableWidgetItem, QCheckBox, QMessageBox
 )
 from PyQt6.QtCore import QTimer
 
 from api.market_api import get_trading_pairs
-from api.trading_api import get_active_orders, get_order_history, get_balances
+from api.metrics import get_metrics
+from api.trading_api import get_active_orders, get_balances
+from api.order_store import get_order_store
+from api.scheduler import Priority, request_priority
 from gui.bot_worker import BotWorker
+from gui.flatten_worker import FlattenWorker
+from utils.tracing import get_tracer
 
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
         self.bot_thread = None
+        self.flatten_thread = None
         self.logger = logging.getLogger(__name__)
+        self.order_store = get_order_store()
+        self.history_painted = None  # (symbol, store version) of the painted history
         self.init_ui()
         self.load_trading_pairs()
         
@@ -27,6 +35,10 @@ class MainWindow(QMainWindow):
         self.orders_timer = QTimer()
         self.orders_timer.timeout.connect(self.update_orders)
         self.orders_timer.start(5000)  # Update every 5 seconds
+
+        self.metrics_timer = QTimer()
+        self.metrics_timer.timeout.connect(self.update_metrics)
+        self.metrics_timer.start(2000)  # Local only, no API calls
         
         # Initial updates
         self.update_balances()
@@ -136,8 +148,14 @@ class MainWindow(QMainWindow):
         self.stop_button = QPushButton("Stop Bot")
         self.stop_button.clicked.connect(self.stop_bot)
         self.stop_button.setEnabled(False)
+        self.flatten_button = QPushButton("Flatten")
+        self.flatten_button.clicked.connect(self.flatten_position)
         button_layout.addWidget(self.start_button)
         button_layout.addWidget(self.stop_button)
+        button_layout.addWidget(self.flatten_button)
+        self.dump_traces_button = QPushButton("Dump Traces")
+        self.dump_traces_button.clicked.connect(self.dump_traces)
+        button_layout.addWidget(self.dump_traces_button)
         layout.addLayout(button_layout)
         
         # Status display
@@ -176,6 +194,16 @@ class MainWindow(QMainWindow):
         
         layout.addLayout(tables_layout)
 
+        # API latency panel
+        layout.addWidget(QLabel("API Latency:"))
+        self.metrics_table = QTableWidget()
+        self.metrics_table.setColumnCount(9)
+        self.metrics_table.setHorizontalHeaderLabels(
+            ["Endpoint", "Requests", "Errors", "Retries", "In Flight", "p50 ms", "p90 ms", "p99 ms", "Max ms"]
+        )
+        self.metrics_table.setMaximumHeight(200)
+        layout.addWidget(self.metrics_table)
+
         # Initial UI state
         self.on_mode_changed(self.mode_combo.currentText())
 
@@ -197,14 +225,16 @@ class MainWindow(QMainWindow):
 
     def load_trading_pairs(self):
         self.logger.info("Loading trading pairs...")
-        pairs = get_trading_pairs()
+        with request_priority(Priority.UI_READ):
+            pairs = get_trading_pairs()
         for pair in pairs:
             if pair['quoteSymbol'] == 'USDT':
                 self.pair_combo.addItem(pair['symbol'])
 
     def update_balances(self):
         try:
-            balances = get_balances()
+            with request_priority(Priority.UI_READ):
+                balances = get_balances()
             self.balance_table.setRowCount(len(balances))
             for i, balance in enumerate(balances):
                 self.balance_table.setItem(i, 0, QTableWidgetItem(balance['symbol']))
@@ -218,7 +248,8 @@ class MainWindow(QMainWindow):
             current_symbol = self.pair_combo.currentText()
             
             # Update active orders
-            active_orders = get_active_orders(current_symbol)
+            with request_priority(Priority.UI_READ):
+                active_orders = get_active_orders(current_symbol)
             self.active_orders_table.setRowCount(len(active_orders))
             for i, order in enumerate(active_orders):
                 self.active_orders_table.setItem(i, 0, QTableWidgetItem(str(order['orderId'])))
@@ -228,8 +259,14 @@ class MainWindow(QMainWindow):
                 self.active_orders_table.setItem(i, 4, QTableWidgetItem(str(order['size'])))
                 self.active_orders_table.setItem(i, 5, QTableWidgetItem(order['status']))
             
-            # Update order history
-            order_history = get_order_history(current_symbol)
+            # Update order history: fetch only rows the local store lacks, repaint only on change
+            with request_priority(Priority.UI_READ):
+                self.order_store.sync_history(current_symbol)
+            painted = (current_symbol, self.order_store.history_version(current_symbol))
+            if painted == self.history_painted:
+                return
+            self.history_painted = painted
+            order_history = self.order_store.history(current_symbol, limit=100)
             self.order_history_table.setRowCount(len(order_history))
             for i, order in enumerate(order_history):
                 self.order_history_table.setItem(i, 0, QTableWidgetItem(str(order['orderId'])))
@@ -245,6 +282,18 @@ class MainWindow(QMainWindow):
         except Exception as e:
             self.logger.error(f"Error updating orders: {e}")
 
+    def update_metrics(self):
+        rows = get_metrics().snapshot()
+        self.metrics_table.setRowCount(len(rows))
+        for i, row in enumerate(rows):
+            self.metrics_table.setItem(i, 0, QTableWidgetItem(f"{row['method']} {row['path']}"))
+            self.metrics_table.setItem(i, 1, QTableWidgetItem(str(row['requests'])))
+            self.metrics_table.setItem(i, 2, QTableWidgetItem(str(row['errors'])))
+            self.metrics_table.setItem(i, 3, QTableWidgetItem(str(row['retries'])))
+            self.metrics_table.setItem(i, 4, QTableWidgetItem(str(row['in_flight'])))
+            for column, key in enumerate(('p50_ms', 'p90_ms', 'p99_ms', 'max_ms'), start=5):
+                self.metrics_table.setItem(i, column, QTableWidgetItem(f"{row[key]:.1f}"))
+
     def start_bot(self):
         try:
             params = {
@@ -294,6 +343,48 @@ class MainWindow(QMainWindow):
         self.status_label.setText("Bot Status: Stopped")
         self.current_delay_label.setText("Not active")
 
+    def flatten_position(self):
+        """Stop the bot, cancel all orders for the pair and sell the base balance"""
+        symbol = self.pair_combo.currentText()
+        answer = QMessageBox.question(
+            self,
+            "Flatten",
+            f"Cancel all {symbol} orders and market sell the whole base balance?",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+            QMessageBox.StandardButton.No
+        )
+        if answer != QMessageBox.StandardButton.Yes:
+            return
+
+        # Cancels, the sell and the flat check take seconds; keep them off the GUI thread
+        self.flatten_thread = FlattenWorker(symbol, self.bot_thread)
+        self.flatten_thread.flattened.connect(self.on_flattened)
+        self.flatten_thread.error.connect(self.on_flatten_error)
+        self.flatten_button.setEnabled(False)
+        self.start_button.setEnabled(False)
+        self.stop_button.setEnabled(False)
+        self.status_label.setText("Bot Status: Flattening")
+        self.flatten_thread.start()
+
+    def on_flattened(self, report):
+        self.flatten_button.setEnabled(True)
+        self.stop_bot()
+        if report is not None and not report.is_flat:
+            self.status_label.setText("Bot Status: Stopped, flatten incomplete")
+
+    def on_flatten_error(self, message):
+        self.flatten_button.setEnabled(True)
+        self.stop_bot()
+        self.status_label.setText(f"Bot Status: Flatten failed: {message}")
+
+    def dump_traces(self):
+        """Append buffered reaction traces to the trace dump file"""
+        try:
+            count = get_tracer().dump()
+            self.status_label.setText(f"Dumped {count} traces")
+        except Exception as e:
+            self.logger.error(f"Error dumping traces: {e}")
+
     def update_current_delay(self, delay):
         """Update the display of current delay before market sell"""
         self.current_delay_label.setText(f"{delay:.1f} seconds")
\ No newline at end of file
@@ -1,10 +1,19 @@
+import signal
 import sys
 from PyQt6.QtWidgets import QApplication
+from api.metrics import start_exporter
+from api.transport import prewarm
 from gui.main_window import MainWindow
 from utils.logger import setup_logger
+from utils.tracing import get_tracer
 
 def main():
     logger = setup_logger()
+    prewarm()  # Open keep-alive connections while the UI starts
+    start_exporter()
+    if hasattr(signal, 'SIGUSR1'):
+        # kill -USR1 <pid> dumps the reaction traces without touching the UI
+        signal.signal(signal.SIGUSR1, lambda signum, frame: get_tracer().dump())
     app = QApplication(sys.argv)
     window = MainWindow()
     window.show()
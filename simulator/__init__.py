@@ -0,0 +1,3 @@
+"""
+Local stand-in servers for exercising the bot without the real exchange.
+"""
\ No newline at end of file
@@ -0,0 +1,487 @@
+"""
+Stand-in Arkham exchange for load tests.
+
+Serves the REST endpoints the bot uses under /api, verifies Arkham-Signature
+headers, matches orders with simulator.matching_engine and streams ticker,
+l1_updates and the private order_statuses channel on /ws. A scripted or
+random price path fills resting orders as it moves. Latency, error-rate and
+rate-limit injection make it usable as a load-test target:
+
+    python -m simulator.exchange_server --port 8080 --latency-ms 20 --error-rate 0.01 --rate-limit 20
+
+    ARKHAM_BASE_URL=http://127.0.0.1:8080/api ARKHAM_WS_URL=ws://127.0.0.1:8080/ws \
+    ARKHAM_API_KEY=... ARKHAM_API_SECRET=... python main.py
+
+Or in-process:
+
+    server = ExchangeServer(api_key=key, api_secret=secret)
+    server.start()
+    server.set_price('BTC_USDT', 64000)
+
+Fees are not charged.
+"""
+import argparse
+import asyncio
+import base64
+import hmac
+import json
+import logging
+import os
+import random
+import time
+from collections import deque
+from aiohttp import web
+from simulator.market_ws_server import MarketWsServer
+from simulator.matching_engine import MatchingEngine, Order, next_order_id, now_us
+from utils.auth import RequestSigner
+
+DEFAULT_PAIRS = [{
+    'symbol': 'BTC_USDT',
+    'baseSymbol': 'BTC',
+    'quoteSymbol': 'USDT',
+    'minTickPrice': '0.01',
+    'minLotSize': '0.00001',
+    'minSize': '0.00001',
+    'minNotional': '5',
+    'status': 'listed'
+}]
+DEFAULT_PRICES = {'BTC_USDT': 65000.0}
+DEFAULT_BALANCES = {'USDT': 1_000_000.0, 'BTC': 10.0}
+
+PRIVATE_PREFIXES = ('/api/orders', '/api/account')
+
+class Account:
+    """Free and locked balances of the single simulated account"""
+
+    def __init__(self, balances):
+        self.balances = {asset: {'free': float(amount), 'locked': 0.0} for asset, amount in balances.items()}
+
+    def _entry(self, asset):
+        return self.balances.setdefault(asset, {'free': 0.0, 'locked': 0.0})
+
+    def free(self, asset):
+        return self._entry(asset)['free']
+
+    def adjust(self, asset, free=0.0, locked=0.0):
+        entry = self._entry(asset)
+        entry['free'] += free
+        entry['locked'] = max(0.0, entry['locked'] + locked)
+
+    def lock(self, asset, amount):
+        self.adjust(asset, free=-amount, locked=amount)
+
+    def unlock(self, asset, amount):
+        self.adjust(asset, free=amount, locked=-amount)
+
+    def to_list(self):
+        return [
+            {'symbol': asset, 'balance': str(entry['free'] + entry['locked']), 'free': str(entry['free'])}
+            for asset, entry in self.balances.items()
+        ]
+
+class RateLimiter:
+    """Token bucket per client, answering like the exchange's rate-limit headers"""
+
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.burst = float(burst or rate)
+        self.buckets = {}  # client -> (tokens, last refill)
+
+    def take(self, client):
+        """(allowed, remaining, seconds until a token is back)"""
+        now = time.monotonic()
+        tokens, last = self.buckets.get(client, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - last) * self.rate)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        self.buckets[client] = (tokens, now)
+        reset = 0.0 if tokens >= 1 else (1 - tokens) / self.rate
+        return allowed, int(tokens), reset
+
+def random_walk(price, volatility=0.0005, seed=None):
+    """Endless geometric random walk"""
+    rng = random.Random(seed)
+    while True:
+        price *= 1 + rng.gauss(0, volatility)
+        yield price
+
+def load_price_path(path):
+    """Prices from a file with one price (or 'time,price') per line"""
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            try:
+                yield float(line.split(',')[-1])
+            except ValueError:
+                continue  # Header row
+
+class ExchangeServer(MarketWsServer):
+    def __init__(self, host='127.0.0.1', port=0, api_key=None, api_secret=None,
+                 pairs=DEFAULT_PAIRS, prices=DEFAULT_PRICES, balances=DEFAULT_BALANCES,
+                 latency=0.0, latency_jitter=0.0, error_rate=0.0,
+                 rate_limit=None, rate_burst=None, seed=None):
+        super().__init__(host, port)
+        self.logger = logging.getLogger(__name__)
+        self.api_key = api_key or 'simulator-key'
+        self.api_secret = api_secret or base64.b64encode(os.urandom(32)).decode('ascii')
+        self.signer = RequestSigner(self.api_key, self.api_secret)
+        self.pairs = {pair['symbol']: pair for pair in pairs}
+        self.engines = {
+            symbol: MatchingEngine(symbol, prices.get(symbol, 1.0))
+            for symbol in self.pairs
+        }
+        self.account = Account(balances)
+        self.history = deque(maxlen=10_000)  # closed and cancelled Orders, oldest first
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.error_rate = error_rate
+        self.rate_limiter = RateLimiter(rate_limit, rate_burst) if rate_limit else None
+        self.random = random.Random(seed)
+        self.stats = {'requests': 0, 'unauthorized': 0, 'injected_errors': 0, 'rate_limited': 0, 'fills': 0}
+        self.price_task = None
+
+    @property
+    def base_url(self):
+        """REST base URL to use as ARKHAM_BASE_URL"""
+        if not self.url:
+            return None
+        return 'http' + self.url[len('ws'):].rsplit('/ws', 1)[0] + '/api'
+
+    def create_app(self):
+        app = super().create_app()
+        app.middlewares.append(self.injection_middleware)
+        app.router.add_get('/api/public/server-time', self.handle_server_time)
+        app.router.add_get('/api/public/pairs', self.handle_pairs)
+        app.router.add_get('/api/public/pair', self.handle_pair)
+        app.router.add_get('/api/public/ticker', self.handle_ticker)
+        app.router.add_post('/api/orders/new', self.handle_new_order)
+        app.router.add_post('/api/orders/cancel', self.handle_cancel)
+        app.router.add_post('/api/orders/cancel/all', self.handle_cancel_all)
+        app.router.add_get('/api/orders', self.handle_open_orders)
+        app.router.add_get('/api/orders/history', self.handle_history)
+        app.router.add_get('/api/account/balances', self.handle_balances)
+        return app
+
+    # Thread-safe controls, called from tests and load-test drivers
+
+    def set_price(self, symbol, price):
+        """Move the market price; resting orders it crosses are filled"""
+        asyncio.run_coroutine_threadsafe(self._set_price(symbol, price), self.loop).result(timeout=5)
+
+    def start_price_path(self, symbol, prices, interval=0.5):
+        """Step through an iterable of prices every interval seconds"""
+        async def run():
+            for price in prices:
+                await self._set_price(symbol, price)
+                await asyncio.sleep(interval)
+
+        def schedule():
+            self.price_task = self.loop.create_task(run())
+
+        self.loop.call_soon_threadsafe(schedule)
+
+    def stop_price_path(self):
+        if self.price_task:
+            self.loop.call_soon_threadsafe(self.price_task.cancel)
+            self.price_task = None
+
+    def stop(self):
+        self.stop_price_path()
+        super().stop()
+
+    def verify(self, headers, method, path, body=b''):
+        """Check Arkham-Api-Key, Arkham-Expires and Arkham-Signature"""
+        if not headers or headers.get('Arkham-Api-Key') != self.api_key:
+            return False
+        expires = headers.get('Arkham-Expires', '')
+        if not expires.isdigit() or int(expires) < now_us():
+            return False
+        expected = self.signer.signature(expires, method, path, body)
+        return hmac.compare_digest(expected, headers.get('Arkham-Signature', ''))
+
+    # Injection and auth
+
+    @web.middleware
+    async def injection_middleware(self, request, handler):
+        if request.path == '/ws':
+            return await handler(request)
+        self.stats['requests'] += 1
+
+        if self.latency or self.latency_jitter:
+            await asyncio.sleep(self.latency + self.random.uniform(0, self.latency_jitter))
+
+        headers = {}
+        if self.rate_limiter:
+            client = request.headers.get('Arkham-Api-Key') or request.remote
+            allowed, remaining, reset = self.rate_limiter.take(client)
+            headers = {
+                'X-RateLimit-Limit': str(int(self.rate_limiter.burst)),
+                'X-RateLimit-Remaining': str(remaining),
+                'X-RateLimit-Reset': f"{reset:.3f}"
+            }
+            if not allowed:
+                self.stats['rate_limited'] += 1
+                headers['Retry-After'] = f"{reset:.3f}"
+                return web.json_response({'message': 'rate limit exceeded'}, status=429, headers=headers)
+
+        if self.error_rate and self.random.random() < self.error_rate:
+            self.stats['injected_errors'] += 1
+            return web.json_response({'message': 'injected error'}, status=503, headers=headers)
+
+        if request.path.startswith(PRIVATE_PREFIXES):
+            body = await request.read()
+            if not self.verify(request.headers, request.method, request.path_qs[len('/api'):], body):
+                self.stats['unauthorized'] += 1
+                return web.json_response({'message': 'invalid signature'}, status=401, headers=headers)
+
+        response = await handler(request)
+        response.headers.update(headers)
+        return response
+
+    # Public endpoints
+
+    async def handle_server_time(self, request):
+        return web.json_response({'serverTime': now_us()})
+
+    async def handle_pairs(self, request):
+        return web.json_response(list(self.pairs.values()))
+
+    async def handle_pair(self, request):
+        pair = self.pairs.get(request.query.get('symbol'))
+        if not pair:
+            return web.json_response({'message': 'unknown symbol'}, status=404)
+        return web.json_response(pair)
+
+    async def handle_ticker(self, request):
+        symbol = request.query.get('symbol')
+        engine = self.engines.get(symbol)
+        if not engine:
+            return web.json_response({'message': 'unknown symbol'}, status=404)
+        return web.json_response({
+            'symbol': symbol,
+            'price': str(engine.price),
+            'bidPrice': str(engine.outside_bid),
+            'askPrice': str(engine.outside_ask)
+        })
+
+    # Private endpoints
+
+    def _reject(self, message):
+        return web.json_response({'message': message}, status=400)
+
+    async def handle_new_order(self, request):
+        data = json.loads(await request.read())
+        symbol = data.get('symbol')
+        pair = self.pairs.get(symbol)
+        if not pair:
+            return self._reject('unknown symbol')
+        side = data.get('side')
+        order_type = data.get('type')
+        if side not in ('buy', 'sell') or order_type not in ('limitGtc', 'market'):
+            return self._reject('invalid side or type')
+
+        engine = self.engines[symbol]
+        size = float(data.get('size') or 0)
+        price = float(data['price']) if data.get('price') and order_type != 'market' else None
+        if size < float(pair['minSize']):
+            return self._reject(f"size below minimum {pair['minSize']}")
+        if order_type != 'market':
+            if price is None:
+                return self._reject('price required for limit orders')
+            if price * size < float(pair.get('minNotional') or 0):
+                return self._reject(f"notional below minimum {pair['minNotional']}")
+            if data.get('postOnly') and engine.would_cross(side, price):
+                return self._reject('post only order would cross')
+
+        base, quote = pair['baseSymbol'], pair['quoteSymbol']
+        if side == 'buy':
+            asset, need = quote, size * (price if price is not None else engine.outside_ask)
+        else:
+            asset, need = base, size
+        free = self.account.free(asset)
+        if free + 1e-9 < need:
+            return self._reject(f"insufficient balance: has {free} {asset}, needs {need}")
+        if price is not None:
+            self.account.lock(asset, need)
+
+        order = Order(next_order_id(), symbol, side, order_type, size, price)
+        fills = engine.submit(order)
+        await self._settle(pair, fills, [order])
+        return web.json_response(order.to_dict())
+
+    def _find_open(self, order_id):
+        for engine in self.engines.values():
+            if order_id in engine.orders:
+                return engine
+        return None
+
+    async def _cancel(self, engine, order_id):
+        order = engine.cancel(order_id)
+        pair = self.pairs[engine.symbol]
+        if order.side == 'buy':
+            self.account.unlock(pair['quoteSymbol'], order.remaining * order.price)
+        else:
+            self.account.unlock(pair['baseSymbol'], order.remaining)
+        self.history.append(order)
+        await self._push_orders([order])
+        return order
+
+    async def handle_cancel(self, request):
+        data = json.loads(await request.read())
+        order_id = data.get('orderId')
+        engine = self._find_open(order_id)
+        if not engine:
+            return self._reject('order not found')
+        await self._cancel(engine, order_id)
+        return web.json_response({'orderId': order_id})
+
+    async def handle_cancel_all(self, request):
+        for engine in self.engines.values():
+            for order in engine.open_orders():
+                await self._cancel(engine, order.order_id)
+        return web.json_response({})
+
+    async def handle_open_orders(self, request):
+        symbol = request.query.get('symbol')
+        orders = [
+            order.to_dict()
+            for engine in self.engines.values() if not symbol or engine.symbol == symbol
+            for order in engine.open_orders()
+        ]
+        return web.json_response(orders)
+
+    async def handle_history(self, request):
+        symbol = request.query.get('symbol')
+        limit = int(request.query.get('limit', 100))
+        orders = []
+        for order in reversed(self.history):
+            if not symbol or order.symbol == symbol:
+                orders.append(order.to_dict())
+                if len(orders) >= limit:
+                    break
+        return web.json_response(orders)
+
+    async def handle_balances(self, request):
+        return web.json_response(self.account.to_list())
+
+    # Matching side effects
+
+    async def _set_price(self, symbol, price):
+        engine = self.engines[symbol]
+        fills = engine.move_price(price)
+        await self._settle(self.pairs[symbol], fills)
+        now = now_us()
+        await self._broadcast('ticker', symbol, {
+            'channel': 'ticker', 'type': 'update',
+            'data': {'symbol': symbol, 'price': str(engine.price), 'time': now}
+        })
+        await self._broadcast('l1_updates', symbol, {
+            'channel': 'l1_updates', 'type': 'update',
+            'data': {
+                'symbol': symbol,
+                'bidPrice': str(engine.outside_bid), 'bidSize': '1',
+                'askPrice': str(engine.outside_ask), 'askSize': '1',
+                'time': now
+            }
+        })
+
+    async def _settle(self, pair, fills, changed=()):
+        """Move balances for fills and push every changed order on order_statuses"""
+        base, quote = pair['baseSymbol'], pair['quoteSymbol']
+        changed = {order.order_id: order for order in changed}
+        for fill in fills:
+            order = fill.order
+            self.stats['fills'] += 1
+            if order.side == 'buy':
+                self.account.adjust(base, free=fill.size)
+                if order.price is not None:
+                    # Locked at the limit price; any improvement goes back to free
+                    self.account.adjust(quote, free=fill.size * (order.price - fill.price), locked=-fill.size * order.price)
+                else:
+                    self.account.adjust(quote, free=-fill.size * fill.price)
+            else:
+                self.account.adjust(quote, free=fill.size * fill.price)
+                if order.price is not None:
+                    self.account.adjust(base, locked=-fill.size)
+                else:
+                    self.account.adjust(base, free=-fill.size)
+            changed.setdefault(order.order_id, order)
+        for order in changed.values():
+            if not order.is_open:
+                self.history.append(order)
+        await self._push_orders(changed.values())
+
+    async def _push_orders(self, orders):
+        for order in orders:
+            await self._broadcast('order_statuses', None, {
+                'channel': 'order_statuses', 'type': 'update', 'data': order.to_dict()
+            })
+
+    async def handle_message(self, ws, message):
+        args = message.get('args') or {}
+        if message.get('method') == 'subscribe' and args.get('channel') == 'order_statuses':
+            if not self.verify(self.client_headers.get(ws), 'GET', '/ws'):
+                await ws.send_json({'channel': 'errors', 'message': 'unauthorized'})
+                return
+            self.clients[ws].add(('order_statuses', None))
+            await ws.send_json({'channel': 'confirmations', 'confirmationId': message.get('confirmationId')})
+            if (args.get('params') or {}).get('snapshot'):
+                orders = [order.to_dict() for engine in self.engines.values() for order in engine.open_orders()]
+                await ws.send_json({'channel': 'order_statuses', 'type': 'snapshot', 'data': orders})
+            return
+        await super().handle_message(ws, message)
+
+def main():
+    parser = argparse.ArgumentParser(description="Stand-in Arkham exchange with a matching engine")
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--symbol', default='BTC_USDT')
+    parser.add_argument('--price', type=float, default=DEFAULT_PRICES['BTC_USDT'])
+    parser.add_argument('--path', default='random', help="'random' or a file of prices")
+    parser.add_argument('--interval', type=float, default=0.5)
+    parser.add_argument('--volatility', type=float, default=0.0005)
+    parser.add_argument('--latency-ms', type=float, default=0)
+    parser.add_argument('--jitter-ms', type=float, default=0)
+    parser.add_argument('--error-rate', type=float, default=0)
+    parser.add_argument('--rate-limit', type=float, help="requests per second per client")
+    parser.add_argument('--burst', type=float)
+    parser.add_argument('--api-key', default=os.getenv('ARKHAM_API_KEY'))
+    parser.add_argument('--api-secret', default=os.getenv('ARKHAM_API_SECRET'))
+    parser.add_argument('--seed', type=int)
+    args = parser.parse_args()
+
+    if args.symbol not in DEFAULT_PRICES:
+        parser.error(f"unknown symbol {args.symbol}; known: {', '.join(DEFAULT_PRICES)}")
+
+    logging.basicConfig(level=logging.INFO)
+    server = ExchangeServer(
+        port=args.port,
+        api_key=args.api_key,
+        api_secret=args.api_secret,
+        prices={args.symbol: args.price},
+        latency=args.latency_ms / 1000,
+        latency_jitter=args.jitter_ms / 1000,
+        error_rate=args.error_rate,
+        rate_limit=args.rate_limit,
+        rate_burst=args.burst,
+        seed=args.seed
+    )
+    server.start()
+    print(f"ARKHAM_BASE_URL={server.base_url}")
+    print(f"ARKHAM_WS_URL={server.url}")
+    print(f"ARKHAM_API_KEY={server.api_key}")
+    print(f"ARKHAM_API_SECRET={server.api_secret}")
+
+    prices = random_walk(args.price, args.volatility, args.seed) if args.path == 'random' else load_price_path(args.path)
+    server.start_price_path(args.symbol, prices, args.interval)
+    try:
+        while True:
+            time.sleep(10)
+            print(f"stats {server.stats}")
+    except KeyboardInterrupt:
+        server.stop()
+
+if __name__ == "__main__":
+    main()
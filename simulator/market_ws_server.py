@@ -0,0 +1,198 @@
+"""
+Stand-in for the Arkham public WebSocket.
+
+Speaks the subscribe/unsubscribe/ping protocol used by api.ws_client and
+pushes ticker, l1_updates and l2_updates messages on demand, so MarketStream can be
+exercised locally, including reconnects:
+
+    server = MarketWsServer()
+    url = server.start()
+    server.publish_ticker('BTC_USDT', 65000)
+    server.drop_connections()
+
+Run as a module to stream a random walk:
+
+    python -m simulator.market_ws_server --symbol BTC_USDT --price 65000
+"""
+import argparse
+import asyncio
+import json
+import logging
+import random
+import threading
+import time
+from aiohttp import web
+
+class MarketWsServer:
+    def __init__(self, host='127.0.0.1', port=0):
+        self.logger = logging.getLogger(__name__)
+        self.host = host
+        self.port = port
+        self.clients = {}  # WebSocketResponse -> set of (channel, symbol)
+        self.client_headers = {}  # WebSocketResponse -> handshake headers
+        self.books = {}  # symbol -> {'bids': {price: size}, 'asks': {price: size}, 'revision': int}
+        self.loop = None
+        self.thread = None
+        self.runner = None
+        self.url = None
+        self._ready = threading.Event()
+
+    def create_app(self):
+        app = web.Application()
+        app.router.add_get('/ws', self.handle_ws)
+        return app
+
+    def start(self):
+        """Serve on a background thread and return the ws:// URL"""
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        self._ready.wait(timeout=5)
+        return self.url
+
+    def stop(self):
+        if self.loop:
+            asyncio.run_coroutine_threadsafe(self._shutdown(), self.loop).result(timeout=5)
+            self.loop.call_soon_threadsafe(self.loop.stop)
+        if self.thread:
+            self.thread.join(timeout=5)
+
+    def publish(self, channel, data, message_type='update'):
+        """Push a message to every client subscribed to the channel and symbol"""
+        message = {'channel': channel, 'type': message_type, 'data': data}
+        asyncio.run_coroutine_threadsafe(self._broadcast(channel, data.get('symbol'), message), self.loop).result(timeout=5)
+
+    def publish_ticker(self, symbol, price):
+        self.publish('ticker', {'symbol': symbol, 'price': str(price), 'time': int(time.time() * 1_000_000)})
+
+    def publish_l1(self, symbol, bid, ask, bid_size=1, ask_size=1):
+        self.publish('l1_updates', {
+            'symbol': symbol,
+            'bidPrice': str(bid),
+            'bidSize': str(bid_size),
+            'askPrice': str(ask),
+            'askSize': str(ask_size),
+            'time': int(time.time() * 1_000_000)
+        })
+
+    def set_book(self, symbol, bids, asks):
+        """Set the L2 book sent as a snapshot to new l2_updates subscribers"""
+        self.books[symbol] = {
+            'bids': {float(price): float(size) for price, size in bids},
+            'asks': {float(price): float(size) for price, size in asks},
+            'revision': 0
+        }
+
+    def publish_l2_update(self, symbol, side, price, size, skip_revisions=0):
+        """Change one level and push the delta; skip_revisions simulates lost messages"""
+        book = self.books.setdefault(symbol, {'bids': {}, 'asks': {}, 'revision': 0})
+        levels = book['bids'] if side == 'buy' else book['asks']
+        if size > 0:
+            levels[float(price)] = float(size)
+        else:
+            levels.pop(float(price), None)
+        book['revision'] += 1 + skip_revisions
+        self.publish('l2_updates', {
+            'symbol': symbol,
+            'side': side,
+            'price': str(price),
+            'size': str(size),
+            'revisionId': book['revision']
+        })
+
+    def book_snapshot(self, symbol):
+        book = self.books.get(symbol) or {'bids': {}, 'asks': {}, 'revision': 0}
+        return {
+            'symbol': symbol,
+            'bids': [{'price': str(p), 'size': str(s)} for p, s in sorted(book['bids'].items(), reverse=True)],
+            'asks': [{'price': str(p), 'size': str(s)} for p, s in sorted(book['asks'].items())],
+            'revisionId': book['revision']
+        }
+
+    def drop_connections(self):
+        """Close every client socket to force a reconnect"""
+        asyncio.run_coroutine_threadsafe(self._close_clients(), self.loop).result(timeout=5)
+
+    def subscriber_count(self, channel, symbol):
+        return sum(1 for subscriptions in self.clients.values() if (channel, symbol) in subscriptions)
+
+    async def handle_ws(self, request):
+        ws = web.WebSocketResponse(heartbeat=20)
+        await ws.prepare(request)
+        self.clients[ws] = set()
+        self.client_headers[ws] = request.headers
+        try:
+            async for msg in ws:
+                if msg.type != web.WSMsgType.TEXT:
+                    continue
+                await self.handle_message(ws, json.loads(msg.data))
+        finally:
+            self.clients.pop(ws, None)
+            self.client_headers.pop(ws, None)
+        return ws
+
+    async def handle_message(self, ws, message):
+        method = message.get('method')
+        args = message.get('args') or {}
+        channel = args.get('channel')
+        symbol = (args.get('params') or {}).get('symbol')
+
+        if method == 'subscribe':
+            self.clients[ws].add((channel, symbol))
+            await ws.send_json({'channel': 'confirmations', 'confirmationId': message.get('confirmationId')})
+            if channel == 'l2_updates' and (args.get('params') or {}).get('snapshot'):
+                await ws.send_json({'channel': channel, 'type': 'snapshot', 'data': self.book_snapshot(symbol)})
+        elif method == 'unsubscribe':
+            self.clients[ws].discard((channel, symbol))
+        elif method == 'ping':
+            await ws.send_json({'channel': 'pong'})
+
+    async def _broadcast(self, channel, symbol, message):
+        for ws, subscriptions in list(self.clients.items()):
+            if (channel, symbol) in subscriptions and not ws.closed:
+                await ws.send_json(message)
+
+    async def _close_clients(self):
+        for ws in list(self.clients):
+            await ws.close()
+
+    async def _shutdown(self):
+        await self._close_clients()
+        if self.runner:
+            await self.runner.cleanup()
+
+    def _run(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.runner = web.AppRunner(self.create_app())
+        self.loop.run_until_complete(self.runner.setup())
+        site = web.TCPSite(self.runner, self.host, self.port)
+        self.loop.run_until_complete(site.start())
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"ws://{self.host}:{port}/ws"
+        self._ready.set()
+        self.loop.run_forever()
+
+def main():
+    parser = argparse.ArgumentParser(description="Stand-in Arkham market-data WebSocket")
+    parser.add_argument('--symbol', default='BTC_USDT')
+    parser.add_argument('--price', type=float, default=65000)
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--interval', type=float, default=0.5)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    server = MarketWsServer(port=args.port)
+    print(f"Serving {server.start()}")
+
+    price = args.price
+    try:
+        while True:
+            price *= 1 + random.gauss(0, 0.0005)
+            server.publish_ticker(args.symbol, round(price, 2))
+            server.publish_l1(args.symbol, round(price * 0.9999, 2), round(price * 1.0001, 2))
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        server.stop()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+"""
+Price-time priority matching engine for the stand-in exchange.
+
+Resting limit orders sit in a per-symbol book. An incoming order first
+trades against the book at the resting orders' prices, oldest first at
+each level, then against unlimited outside liquidity quoted around the
+current market price. Moving the market price fills every resting order
+it crosses, which is how scripted or random price paths drive the bot.
+"""
+import bisect
+import itertools
+import time
+from collections import deque
+
+EPSILON = 1e-12
+
+def now_us():
+    return int(time.time() * 1_000_000)
+
+class Order:
+    __slots__ = (
+        'order_id', 'symbol', 'side', 'type', 'price', 'size',
+        'executed', 'notional', 'status', 'time', 'last_price', 'last_size'
+    )
+
+    def __init__(self, order_id, symbol, side, order_type, size, price=None):
+        self.order_id = order_id
+        self.symbol = symbol
+        self.side = side
+        self.type = order_type
+        self.price = price
+        self.size = size
+        self.executed = 0.0
+        self.notional = 0.0
+        self.status = 'new'
+        self.time = now_us()
+        self.last_price = None
+        self.last_size = None
+
+    @property
+    def remaining(self):
+        return max(0.0, self.size - self.executed)
+
+    @property
+    def is_open(self):
+        return self.status in ('new', 'booked')
+
+    def fill(self, size, price):
+        self.executed += size
+        self.notional += size * price
+        self.last_price = price
+        self.last_size = size
+        if self.remaining <= EPSILON:
+            self.status = 'closed'
+
+    def to_dict(self):
+        return {
+            'orderId': self.order_id,
+            'symbol': self.symbol,
+            'side': self.side,
+            'type': self.type,
+            'price': str(self.price) if self.price is not None else '0',
+            'size': str(self.size),
+            'executedSize': str(round(self.executed, 12)),
+            'avgPrice': str(self.notional / self.executed) if self.executed else '0',
+            'lastPrice': str(self.last_price) if self.last_price is not None else None,
+            'lastSize': str(self.last_size) if self.last_size is not None else None,
+            'status': self.status,
+            'time': self.time
+        }
+
+class Fill:
+    __slots__ = ('order', 'size', 'price', 'maker')
+
+    def __init__(self, order, size, price, maker):
+        self.order = order
+        self.size = size
+        self.price = price
+        self.maker = maker
+
+class BookSide:
+    """Resting orders on one side: price levels in a sorted list, FIFO within a level"""
+
+    def __init__(self, is_bid):
+        self.is_bid = is_bid
+        self.prices = []  # ascending
+        self.levels = {}  # price -> deque of Orders
+
+    def __len__(self):
+        return sum(len(level) for level in self.levels.values())
+
+    def add(self, order):
+        level = self.levels.get(order.price)
+        if level is None:
+            level = self.levels[order.price] = deque()
+            bisect.insort(self.prices, order.price)
+        level.append(order)
+
+    def remove(self, order):
+        level = self.levels.get(order.price)
+        if not level:
+            return
+        try:
+            level.remove(order)
+        except ValueError:
+            return
+        if not level:
+            self._drop_level(order.price)
+
+    def _drop_level(self, price):
+        del self.levels[price]
+        index = bisect.bisect_left(self.prices, price)
+        if index < len(self.prices) and self.prices[index] == price:
+            del self.prices[index]
+
+    def best(self):
+        if not self.prices:
+            return None
+        return self.prices[-1] if self.is_bid else self.prices[0]
+
+    def crossed_by(self, price):
+        """Whether an opposite order at price (None = market) trades with the best level"""
+        best = self.best()
+        if best is None:
+            return False
+        if price is None:
+            return True
+        return price <= best if self.is_bid else price >= best
+
+    def pop_front(self):
+        """Oldest order at the best price"""
+        best = self.best()
+        level = self.levels[best]
+        order = level[0]
+        return order, level
+
+    def discard_front(self, level, price):
+        level.popleft()
+        if not level:
+            self._drop_level(price)
+
+    def depth(self, levels=10):
+        prices = self.prices[::-1] if self.is_bid else self.prices
+        return [
+            (price, sum(order.remaining for order in self.levels[price]))
+            for price in prices[:levels]
+        ]
+
+class MatchingEngine:
+    def __init__(self, symbol, price, spread=0.0002):
+        self.symbol = symbol
+        self.price = float(price)
+        self.spread = spread  # Outside liquidity quoted at price * (1 -/+ spread / 2)
+        self.bids = BookSide(True)
+        self.asks = BookSide(False)
+        self.orders = {}  # orderId -> open Order
+
+    @property
+    def outside_bid(self):
+        return self.price * (1 - self.spread / 2)
+
+    @property
+    def outside_ask(self):
+        return self.price * (1 + self.spread / 2)
+
+    def would_cross(self, side, price):
+        """Whether a limit order would trade immediately (for postOnly checks)"""
+        if side == 'buy':
+            return self.asks.crossed_by(price) or price >= self.outside_ask
+        return self.bids.crossed_by(price) or price <= self.outside_bid
+
+    def submit(self, order):
+        """Match an incoming order and rest any limit remainder; returns the fills"""
+        fills = []
+        book = self.asks if order.side == 'buy' else self.bids
+        limit = order.price if order.type != 'market' else None
+
+        # 1. Resting orders, best price first, oldest first within a price
+        while order.remaining > EPSILON and book.crossed_by(limit):
+            resting, level = book.pop_front()
+            size = min(order.remaining, resting.remaining)
+            price = resting.price
+            resting.fill(size, price)
+            order.fill(size, price)
+            fills.append(Fill(resting, size, price, maker=True))
+            fills.append(Fill(order, size, price, maker=False))
+            if not resting.is_open:
+                book.discard_front(level, price)
+                self.orders.pop(resting.order_id, None)
+
+        # 2. Outside liquidity at the quoted market
+        if order.remaining > EPSILON:
+            outside = self.outside_ask if order.side == 'buy' else self.outside_bid
+            crosses = limit is None or (limit >= outside if order.side == 'buy' else limit <= outside)
+            if crosses:
+                size = order.remaining
+                order.fill(size, outside)
+                fills.append(Fill(order, size, outside, maker=False))
+
+        # 3. Rest the remainder
+        if order.remaining > EPSILON:
+            if order.type == 'market':
+                order.status = 'closed'
+            else:
+                order.status = 'booked'
+                (self.bids if order.side == 'buy' else self.asks).add(order)
+                self.orders[order.order_id] = order
+        return fills
+
+    def cancel(self, order_id):
+        order = self.orders.pop(order_id, None)
+        if order is None:
+            return None
+        (self.bids if order.side == 'buy' else self.asks).remove(order)
+        order.status = 'cancelled'
+        return order
+
+    def move_price(self, price):
+        """Set the market price; resting orders it crosses fill at their own price"""
+        self.price = float(price)
+        fills = []
+        for book, crossed in (
+            (self.bids, lambda best: best >= self.price),
+            (self.asks, lambda best: best <= self.price)
+        ):
+            while book.best() is not None and crossed(book.best()):
+                order, level = book.pop_front()
+                size = order.remaining
+                order.fill(size, order.price)
+                fills.append(Fill(order, size, order.price, maker=True))
+                book.discard_front(level, order.price)
+                self.orders.pop(order.order_id, None)
+        return fills
+
+    def open_orders(self):
+        return list(self.orders.values())
+
+_order_ids = itertools.count(1)
+
+def next_order_id():
+    return next(_order_ids)
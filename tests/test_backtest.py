@@ -0,0 +1,27 @@
+import logging
+import pytest
+from backtest.data import random_walk
+from backtest.engine import run_backtest
+
+GRID = {'usdt_amount': 1000}
+VOLUME = {'mode': 'Volume', 'min_delay': 1, 'max_delay': 5, 'price_deviation_pct': 1.5, 'first_order_offset': 0.2}
+
+@pytest.fixture(autouse=True)
+def quiet_logs():
+    logging.disable(logging.WARNING)
+    yield
+    logging.disable(logging.NOTSET)
+
+@pytest.mark.parametrize('params', [
+    GRID,
+    VOLUME,
+    {**VOLUME, 'use_trailing_limit': True}
+], ids=['grid', 'volume-market', 'volume-trailing'])
+def test_fast_path_matches_tick_by_tick(params):
+    prices = random_walk(3000, start=65000, volatility=0.0005, seed=3)
+    fast = run_backtest(prices, params, fee_pct=0.1, seed=1)
+    slow = run_backtest(prices, params, fee_pct=0.1, seed=1, fast_path=False)
+    assert fast.fills > 0
+    assert fast.steps < slow.steps
+    for field in ('pnl', 'turnover', 'fills', 'cycles', 'fees', 'max_drawdown_pct'):
+        assert getattr(fast, field) == getattr(slow, field), field
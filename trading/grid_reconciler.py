@@ -0,0 +1,102 @@
+"""
+Incremental grid re-centering
+
+Instead of cancelling the whole grid and rebuilding it, the live grid is
+diffed against the target ladder by price tick: levels on both sides stay
+put, levels the target no longer has are cancelled and levels it gained are
+placed. Anchored ladders keep levels on a fixed lattice, so a re-center
+after a small move only touches the few levels at either end.
+"""
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import List
+from api.trading_api import place_order
+from trading.mass_cancel import MassCanceller
+from trading.order_batch import LevelResult, submit_grid_orders, MAX_CONCURRENT_ORDERS
+
+@dataclass
+class GridDiff:
+    keep: List[str] = field(default_factory=list)  # order ids already on a target level
+    cancel: List[str] = field(default_factory=list)  # order ids off the target, or duplicates
+    place: List[dict] = field(default_factory=list)  # target levels without a live order
+
+@dataclass
+class RecenterReport:
+    kept: int = 0
+    cancelled: List[str] = field(default_factory=list)
+    cancel_failed: List[str] = field(default_factory=list)  # Still live, left tracked
+    placed: List[LevelResult] = field(default_factory=list)
+    place_failed: List[LevelResult] = field(default_factory=list)
+    elapsed: float = 0.0
+
+    @property
+    def touched(self):
+        """Orders this re-center sent a cancel or a placement for"""
+        return len(self.cancelled) + len(self.cancel_failed) + len(self.placed) + len(self.place_failed)
+
+def diff_grid(grid_orders, ladder):
+    """Split live grid orders and target levels into keep/cancel/place.
+
+    Orders match a level on price alone; a kept order's size may differ a
+    little from the target's, which is not worth a cancel and re-place.
+    """
+    diff = GridDiff()
+    targets = dict(zip(ladder.price_ticks.tolist(), ladder.to_levels()))
+    matched = set()
+    for order_id, order in grid_orders.items():
+        ticks = int(round(float(order['price']) / ladder.tick))
+        if ticks in targets and ticks not in matched:
+            matched.add(ticks)
+            diff.keep.append(order_id)
+        else:
+            diff.cancel.append(order_id)
+    diff.place = [level for ticks, level in targets.items() if ticks not in matched]
+    return diff
+
+class GridReconciler:
+    def __init__(self, symbol, canceller=None, place_order_fn=place_order, max_concurrency=MAX_CONCURRENT_ORDERS):
+        self.logger = logging.getLogger(__name__)
+        self.symbol = symbol
+        self.canceller = canceller or MassCanceller(symbol)
+        self.place_order_fn = place_order_fn
+        self.max_concurrency = max_concurrency
+
+    def recenter(self, grid_orders, ladder, reference_price=None):
+        """Move grid_orders (order id -> order, updated in place) onto the ladder"""
+        start = time.perf_counter()
+        diff = diff_grid(grid_orders, ladder)
+        report = RecenterReport(kept=len(diff.keep))
+
+        # Cancel first so the freed quote is available to the new levels
+        if diff.cancel:
+            cancel_report = self.canceller.cancel(diff.cancel)
+            gone = set(cancel_report.cancelled) - set(cancel_report.remaining)
+            for order_id in diff.cancel:
+                if order_id in gone:
+                    grid_orders.pop(order_id, None)
+                    report.cancelled.append(order_id)
+                else:
+                    report.cancel_failed.append(order_id)
+
+        if diff.place:
+            submission = submit_grid_orders(
+                self.place_order_fn,
+                self.symbol,
+                diff.place,
+                side='buy',
+                reference_price=reference_price,
+                max_concurrency=self.max_concurrency
+            )
+            for result in submission.placed:
+                grid_orders[result.order['orderId']] = result.order
+            report.placed = submission.placed
+            report.place_failed = submission.failed
+
+        report.elapsed = time.perf_counter() - start
+        self.logger.info(
+            "Re-centered %s grid: touched %s orders (kept %s, cancelled %s, placed %s, failed %s) in %.0f ms",
+            self.symbol, report.touched, report.kept, len(report.cancelled), len(report.placed),
+            len(report.cancel_failed) + len(report.place_failed), report.elapsed * 1000
+        )
+        return report
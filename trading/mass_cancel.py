@@ -0,0 +1,184 @@
+"""
+Concurrent mass-cancel and emergency flatten
+"""
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import List, Optional
+from api.pair_registry import get_pair_spec
+from api.trading_api import cancel_order, get_active_orders, get_balances, place_order
+
+MAX_CONCURRENT_CANCELS = 8
+CANCEL_TIMEOUT = 3.0  # seconds to wait for cancels to be acknowledged and confirmed
+FLATTEN_DEADLINE = 5.0  # seconds from start to fully flat
+CONFIRM_POLL_INTERVAL = 0.25
+
+@dataclass
+class CancelReport:
+    requested: int = 0
+    cancelled: List[str] = field(default_factory=list)
+    failed: List[str] = field(default_factory=list)
+    remaining: List[str] = field(default_factory=list)  # Still active after confirmation
+    elapsed: float = 0.0
+
+    @property
+    def is_complete(self):
+        return not self.remaining and not self.failed
+
+@dataclass
+class FlattenReport:
+    cancel_report: Optional[CancelReport] = None
+    sold_size: float = 0.0
+    sell_order: Optional[dict] = None
+    is_flat: bool = False
+    elapsed: float = 0.0
+
+class MassCanceller:
+    def __init__(self, symbol=None, cancel_fn=cancel_order, active_orders_fn=get_active_orders,
+                 cancel_all_fn=None, max_concurrency=MAX_CONCURRENT_CANCELS, timeout=CANCEL_TIMEOUT):
+        self.logger = logging.getLogger(__name__)
+        self.symbol = symbol
+        self.cancel_fn = cancel_fn
+        self.active_orders_fn = active_orders_fn  # None skips confirmation
+        self.cancel_all_fn = cancel_all_fn  # Exchange cancel-all endpoint, if one is usable
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+
+    def cancel(self, order_ids, timeout=None):
+        """Cancel orders concurrently and confirm they are gone from the book"""
+        timeout = self.timeout if timeout is None else timeout
+        deadline = time.perf_counter() + timeout
+        order_ids = list(dict.fromkeys(order_ids))  # Drop duplicates, keep order
+        report = CancelReport(requested=len(order_ids))
+        start = time.perf_counter()
+
+        if order_ids:
+            cancelled, failed = self._fan_out(order_ids, deadline)
+            report.cancelled = cancelled
+            report.failed = failed
+            report.remaining = self._confirm(order_ids, deadline)
+
+        report.elapsed = time.perf_counter() - start
+        self._log_report("Cancelled", report)
+        return report
+
+    def cancel_all(self, timeout=None):
+        """Cancel every active order for the symbol"""
+        timeout = self.timeout if timeout is None else timeout
+        if self.cancel_all_fn:
+            start = time.perf_counter()
+            report = CancelReport()
+            if self.cancel_all_fn() is None:
+                self.logger.warning("Cancel-all request failed, falling back to individual cancels")
+            else:
+                report.remaining = self._confirm(None, start + timeout)
+                report.elapsed = time.perf_counter() - start
+                if not report.remaining:
+                    self._log_report("Cancel-all", report)
+                    return report
+
+        active_orders = self.active_orders_fn(self.symbol) if self.active_orders_fn else []
+        return self.cancel([order['orderId'] for order in active_orders], timeout)
+
+    def flatten(self, deadline=FLATTEN_DEADLINE, sell_fn=place_order, balances_fn=get_balances):
+        """Cancel everything and sell the whole base balance within the deadline"""
+        start = time.perf_counter()
+        end = start + deadline
+        report = FlattenReport()
+        base_currency = self.symbol.split('_')[0] if '_' in self.symbol else self.symbol.split('/')[0]
+        pair = get_pair_spec(self.symbol)
+        min_size = pair.min_size if pair else 0
+
+        try:
+            report.cancel_report = self.cancel_all(timeout=max(0.0, end - time.perf_counter()) / 2)
+
+            free = self._free_balance(balances_fn, base_currency)
+            if free > 0 and free >= min_size:
+                report.sell_order = sell_fn(
+                    symbol=self.symbol,
+                    side='sell',
+                    order_type='market',
+                    size=free
+                )
+                if report.sell_order:
+                    report.sold_size = free
+                else:
+                    self.logger.error(f"Flatten sell of {free} {base_currency} was rejected")
+
+            # Flat once what is left cannot be traded
+            while True:
+                free = self._free_balance(balances_fn, base_currency)
+                report.is_flat = free < min_size or free == 0
+                if report.is_flat or time.perf_counter() >= end:
+                    break
+                time.sleep(CONFIRM_POLL_INTERVAL)
+
+        except Exception as e:
+            self.logger.error(f"Error flattening {self.symbol}: {e}")
+
+        report.elapsed = time.perf_counter() - start
+        if report.is_flat:
+            self.logger.info(f"Flattened {self.symbol} in {report.elapsed * 1000:.0f} ms (sold {report.sold_size} {base_currency})")
+        else:
+            self.logger.error(f"Failed to flatten {self.symbol} within {deadline}s (elapsed {report.elapsed * 1000:.0f} ms)")
+        return report
+
+    def _fan_out(self, order_ids, deadline):
+        cancelled, failed = [], []
+        executor = ThreadPoolExecutor(max_workers=max(1, min(self.max_concurrency, len(order_ids))))
+        futures = {executor.submit(self.cancel_fn, order_id): order_id for order_id in order_ids}
+        done, not_done = wait(futures, timeout=max(0.0, deadline - time.perf_counter()))
+        # Do not block on stragglers, their own HTTP timeout ends them
+        executor.shutdown(wait=False)
+
+        for future in done:
+            order_id = futures[future]
+            try:
+                if future.result():
+                    cancelled.append(order_id)
+                else:
+                    failed.append(order_id)
+            except Exception as e:
+                self.logger.error(f"Error cancelling order {order_id}: {e}")
+                failed.append(order_id)
+        failed.extend(futures[future] for future in not_done)
+        return cancelled, failed
+
+    def _confirm(self, order_ids, deadline):
+        """Poll active orders until the given ids (or all for the symbol) are gone"""
+        if not self.active_orders_fn:
+            return []
+
+        remaining = []
+        retried = set()
+        while True:
+            active_ids = {order['orderId'] for order in self.active_orders_fn(self.symbol)}
+            remaining = list(active_ids) if order_ids is None else [
+                order_id for order_id in order_ids if order_id in active_ids
+            ]
+            if not remaining or time.perf_counter() >= deadline:
+                return remaining
+
+            # Re-issue once for anything the exchange still shows
+            for order_id in remaining:
+                if order_id not in retried:
+                    retried.add(order_id)
+                    self.cancel_fn(order_id)
+            time.sleep(CONFIRM_POLL_INTERVAL)
+
+    def _free_balance(self, balances_fn, currency):
+        for balance in balances_fn():
+            if balance['symbol'] == currency:
+                return float(balance['free'])
+        return 0
+
+    def _log_report(self, action, report):
+        message = (
+            f"{action} {len(report.cancelled)}/{report.requested} orders in {report.elapsed * 1000:.0f} ms"
+            f" (failed: {len(report.failed)}, still active: {len(report.remaining)})"
+        )
+        if report.is_complete:
+            self.logger.info(message)
+        else:
+            self.logger.warning(message)
@@ -0,0 +1,74 @@
+"""
+Concurrent submission of grid orders
+"""
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+MAX_CONCURRENT_ORDERS = 5  # Stay within the shared HTTP pool size
+
+@dataclass
+class LevelResult:
+    level: dict
+    order: Optional[dict] = None
+    error: Optional[str] = None
+
+@dataclass
+class GridSubmission:
+    placed: List[LevelResult] = field(default_factory=list)
+    failed: List[LevelResult] = field(default_factory=list)
+    elapsed: float = 0.0  # seconds to place the whole grid
+
+def order_levels_by_distance(grid_levels, reference_price=None):
+    """Sort levels so the ones nearest the market go out first"""
+    if not grid_levels:
+        return []
+    if reference_price is None:
+        # Buy grids sit below the market, so the highest level is the closest
+        reference_price = max(float(level['price']) for level in grid_levels)
+    return sorted(grid_levels, key=lambda level: abs(float(level['price']) - float(reference_price)))
+
+def submit_grid_orders(place_order_fn, symbol, grid_levels, side='buy', reference_price=None,
+                       max_concurrency=MAX_CONCURRENT_ORDERS):
+    """Place grid levels with bounded concurrency, nearest to price first"""
+    submission = GridSubmission()
+    levels = order_levels_by_distance(grid_levels, reference_price)
+    if not levels:
+        return submission
+
+    def place(level):
+        try:
+            order = place_order_fn(
+                symbol=symbol,
+                side=side,
+                order_type='limitGtc',
+                size=level['size'],
+                price=level['price']
+            )
+            if order and 'orderId' in order:
+                return LevelResult(level=level, order=order)
+            return LevelResult(level=level, error="Order rejected")
+        except Exception as e:
+            return LevelResult(level=level, error=str(e))
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, min(max_concurrency, len(levels)))) as executor:
+        # Submitting in distance order means the nearest levels get the first workers
+        futures = [executor.submit(place, level) for level in levels]
+        for future in as_completed(futures):
+            result = future.result()
+            if result.order:
+                submission.placed.append(result)
+            else:
+                submission.failed.append(result)
+    submission.elapsed = time.perf_counter() - start
+
+    logger.info(
+        f"Placed {len(submission.placed)}/{len(levels)} grid orders for {symbol} "
+        f"in {submission.elapsed * 1000:.0f} ms ({len(submission.failed)} failed)"
+    )
+    return submission
@@ -1,20 +1,36 @@
 import logging
-from decimal import Decimal
+from api.pair_registry import get_pair_spec
+from utils.fixed_point import Scale, UP, divide, to_units
+
+# Used when the pair is unknown; fine enough for any pair we trade
+DEFAULT_SCALE = Scale('0.00000001')
+PCT_DECIMALS = 4  # take-profit percentages are read to 0.0001%
 
 class PositionManager:
-    def __init__(self):
+    def __init__(self, symbol=None):
         self.logger = logging.getLogger(__name__)
+        self.symbol = symbol
         self.current_position = None
         self.filled_orders = []  # Track filled buy orders
+        # Running totals in whole ticks and lots, exact however many fills there are
+        self.total_lots = 0
+        self.cost = 0  # sum of ticks * lots
+
+    def _scales(self):
+        pair = get_pair_spec(self.symbol) if self.symbol else None
+        if pair:
+            return pair.price_scale, pair.size_scale
+        return DEFAULT_SCALE, DEFAULT_SCALE
         
     def update_position(self, filled_order):
         """Update position when a buy order is filled"""
         try:
             # Extract execution details using the correct field names from Arkham API
-            executed_size = Decimal(str(filled_order['size']))  # Use 'size' instead of 'lastSize'
-            executed_price = Decimal(str(filled_order['price']))  # Use 'price' instead of 'lastPrice'
+            price_scale, size_scale = self._scales()
+            executed_size = size_scale.parse(filled_order['size'])  # Use 'size' instead of 'lastSize'
+            executed_price = price_scale.parse(filled_order['price'])  # Use 'price' instead of 'lastPrice'
             
-            if executed_size <= 0 or executed_price <= 0:
+            if executed_size.steps <= 0 or executed_price.steps <= 0:
                 self.logger.error(f"Invalid order execution data: size={executed_size}, price={executed_price}")
                 return
                 
@@ -27,14 +43,14 @@ class PositionManager:
             })
             
             # Calculate total position
-            total_size = sum(Decimal(str(order['size'])) for order in self.filled_orders)
-            weighted_sum = sum(Decimal(str(order['price'])) * Decimal(str(order['size'])) for order in self.filled_orders)
+            self.total_lots += executed_size.steps
+            self.cost += executed_price.steps * executed_size.steps
             
-            if total_size > 0:
-                avg_price = weighted_sum / total_size
+            if self.total_lots > 0:
+                # Average price in ticks is cost / total_lots; divide once, in the float conversion
                 self.current_position = {
-                    'entry_price': float(avg_price),
-                    'size': float(total_size)
+                    'entry_price': self.cost * price_scale.step_units / (self.total_lots * price_scale.factor),
+                    'size': size_scale.to_float(self.total_lots)
                 }
                 self.logger.info(f"Updated position: entry_price={self.current_position['entry_price']}, size={self.current_position['size']}")
             else:
@@ -50,9 +66,16 @@ class PositionManager:
                 self.logger.warning("No position exists to calculate take-profit price")
                 return None
                 
-            entry_price = Decimal(str(self.current_position['entry_price']))
-            profit_mult = 1 + (Decimal(str(profit_percentage)) / 100)
-            take_profit_price = float(entry_price * profit_mult)
+            entry_price = self.current_position['entry_price']
+            price_scale, _ = self._scales()
+            # cost / total_lots * (1 + pct / 100) ticks, rounded up so the target is never undershot
+            pct_scale = 100 * 10 ** PCT_DECIMALS
+            take_profit_ticks = divide(
+                self.cost * (pct_scale + to_units(profit_percentage, PCT_DECIMALS)),
+                self.total_lots * pct_scale,
+                UP
+            )
+            take_profit_price = price_scale.to_float(take_profit_ticks)
             
             self.logger.info(f"Calculated take-profit price: {take_profit_price} (entry: {entry_price}, profit: {profit_percentage}%)")
             return take_profit_price
@@ -77,5 +100,7 @@ class PositionManager:
             self.logger.info("Clearing position and order history")
             self.current_position = None
             self.filled_orders.clear()
+            self.total_lots = 0
+            self.cost = 0
         except Exception as e:
             self.logger.error(f"Error clearing position: {e}")
\ No newline at end of file
@@ -0,0 +1,34 @@
+"""
+The exchange calls the grid loop makes, behind one object.
+
+BotWorker reaches the exchange only through a Venue. The default one is the
+live API; the backtester passes a simulated venue with the same methods, so
+the same grid rules run against historical prices.
+"""
+from api import market_api, trading_api
+from trading import grid_calculator
+
+class Venue:
+    def place_order(self, symbol, side, order_type, size, price=None):
+        return trading_api.place_order(symbol, side, order_type, size, price)
+
+    def cancel_order(self, order_id):
+        return trading_api.cancel_order(order_id)
+
+    def cancel_all_orders(self):
+        return trading_api.cancel_all_orders()
+
+    def get_active_orders(self, symbol=None):
+        return trading_api.get_active_orders(symbol)
+
+    def get_order_history(self, symbol=None, limit=100):
+        return trading_api.get_order_history(symbol, limit)
+
+    def get_current_price(self, symbol):
+        return market_api.get_current_price(symbol)
+
+    def get_order_book(self, symbol):
+        return market_api.get_order_book(symbol)
+
+    def available_usdt(self):
+        return grid_calculator.get_available_usdt()
@@ -1,7 +1,7 @@
 import logging
-import time
-from decimal import Decimal
-from api.trading_api import get_balances, get_active_orders, get_pair_info
+from api.balance_ledger import get_balance_ledger
+from api.order_tracker import get_order_tracker
+from api.pair_registry import get_pair_spec
 
 class BalanceManager:
     def __init__(self, symbol):
@@ -9,16 +9,16 @@ class BalanceManager:
         self.symbol = symbol
         self.base_currency = symbol.split('_')[0] if '_' in symbol else symbol.split('/')[0]
         self.last_known_balance = None
-        self.max_retries = 3
-        self.retry_delay = 3  # seconds
+        self.ledger = get_balance_ledger()
+        self.tracker = get_order_tracker()
         self.min_trade_size = self._get_min_trade_size()
 
     def _get_min_trade_size(self):
         """Get minimum trade size for the symbol"""
         try:
-            pair_info = get_pair_info(self.symbol)
-            if pair_info and 'minSize' in pair_info:
-                return float(pair_info['minSize'])
+            pair = get_pair_spec(self.symbol)
+            if pair:
+                return pair.min_size
             return 0
         except Exception as e:
             self.logger.error(f"Error getting minimum trade size: {e}")
@@ -28,15 +28,10 @@ class BalanceManager:
         """Get total balance including both available and in orders"""
         try:
             available = self.get_available_balance()
-            active_orders = get_active_orders(self.symbol)
-            in_orders = sum(
-                float(order['size']) - float(order.get('executedSize', 0))
-                for order in active_orders
-                if order['side'] == 'sell'
-            )
+            in_orders = self.tracker.open_size(self.symbol, 'sell')
             
             total = available + in_orders
-            self.logger.info(f"Total {self.base_currency} balance: {total} (available: {available}, in orders: {in_orders})")
+            self.logger.info("Total %s balance: %s (available: %s, in orders: %s)", self.base_currency, total, available, in_orders)
             return total
             
         except Exception as e:
@@ -44,30 +39,14 @@ class BalanceManager:
             return self.last_known_balance if self.last_known_balance is not None else 0
 
     def get_available_balance(self):
-        """Get available balance for the trading pair's base currency with retries"""
-        for attempt in range(self.max_retries):
-            try:
-                balances = get_balances()
-                if not balances:
-                    self.logger.error("Failed to retrieve balances")
-                    continue
-
-                for balance in balances:
-                    if balance['symbol'] == self.base_currency:
-                        available = float(balance['free'])
-                        self.last_known_balance = available
-                        self.logger.info(f"Available {self.base_currency} balance: {available}")
-                        return available
-
-                self.logger.error(f"Balance for {self.base_currency} not found in response")
-                if self.last_known_balance is not None:
-                    return self.last_known_balance
-                return 0
-
-            except Exception as e:
-                self.logger.error(f"Error getting balance (attempt {attempt + 1}): {e}")
-                if attempt < self.max_retries - 1:
-                    time.sleep(self.retry_delay)
+        """Get available balance for the trading pair's base currency from the local ledger"""
+        try:
+            available = self.ledger.free(self.base_currency)
+            self.last_known_balance = available
+            self.logger.info("Available %s balance: %s", self.base_currency, available)
+            return available
+        except Exception as e:
+            self.logger.error(f"Error getting balance: {e}")
 
         if self.last_known_balance is not None:
             self.logger.warning(f"Using last known balance: {self.last_known_balance}")
@@ -77,9 +56,7 @@ class BalanceManager:
     def check_active_sell_orders(self):
         """Check if there are any active sell orders"""
         try:
-            active_orders = get_active_orders(self.symbol)
-            sell_orders = [order for order in active_orders if order['side'] == 'sell']
-            return len(sell_orders) > 0
+            return self.tracker.has_open(self.symbol, 'sell')
         except Exception as e:
             self.logger.error(f"Error checking active sell orders: {e}")
             return False
@@ -96,7 +73,7 @@ class BalanceManager:
             # Get minimum trade size
             min_size = self.min_trade_size
             
-            self.logger.info(f"Checking cycle conditions: available={available}, min_size={min_size}, has_active_sells={has_active_sells}")
+            self.logger.info("Checking cycle conditions: available=%s, min_size=%s, has_active_sells=%s", available, min_size, has_active_sells)
             
             # Can start new cycle if:
             # 1. No available balance or balance below min trade size
@@ -111,7 +88,7 @@ class BalanceManager:
         """Validate and adjust sell size against total balance"""
         try:
             total_balance = self.get_total_balance()
-            self.logger.info(f"Validating sell size {desired_size} against total balance {total_balance}")
+            self.logger.info("Validating sell size %s against total balance %s", desired_size, total_balance)
 
             if total_balance <= 0:
                 if self.last_known_balance and self.last_known_balance > 0:
@@ -126,16 +103,21 @@ class BalanceManager:
                 self.logger.warning(f"Total balance {total_balance} is below minimum trade size {self.min_trade_size}")
                 return 0
 
-            total_balance = Decimal(str(total_balance))
-            desired_size = Decimal(str(desired_size))
-            buffer = Decimal('0.999')
-            max_size = total_balance * buffer
+            pair = get_pair_spec(self.symbol)
+            if not pair:
+                max_size = total_balance * 0.999
+                return min(float(desired_size), max_size)
+
+            # Whole lots, so the result is already on the lot grid
+            desired_lots = pair.size_lots(desired_size)
+            max_lots = pair.size_lots(total_balance) * 999 // 1000
 
-            if desired_size > max_size:
+            if desired_lots > max_lots:
+                max_size = pair.size_scale.to_float(max_lots)
                 self.logger.warning(f"Desired size {desired_size} exceeds total balance {total_balance}, adjusting to {max_size}")
-                return float(max_size)
+                return max_size
             
-            return float(desired_size)
+            return pair.size_scale.to_float(desired_lots)
 
         except Exception as e:
             self.logger.error(f"Error validating sell size: {e}")
@@ -1,179 +1,165 @@
 import logging
-import time
-from decimal import Decimal
-from api.trading_api import place_order, cancel_order, get_active_orders, get_order_history
+from api import retry
+from api.balance_ledger import get_balance_ledger, split_symbol
+from api.order_store import get_order_store, FINAL_STATUSES
+from api.order_tracker import get_order_tracker, FILLED, CANCELLED
+from api.pair_registry import get_pair_spec
+from api.trading_api import place_order, cancel_order, get_active_orders
+from utils.fixed_point import NEAREST
 from .order_status import (
-    OrderStatus, 
     create_insufficient_balance_status,
     create_placement_failed_status,
-    create_assumed_complete_status,
     is_valid_order
 )
 
+# A just-placed or just-closed order can take a moment to show up in /orders or /orders/history
+ORDER_LOOKUP_POLICY = retry.RetryPolicy(attempts=3, base_delay=0.25, max_delay=1.0, deadline=3.0)
+
 class OrderManager:
     def __init__(self, symbol):
         self.logger = logging.getLogger(__name__)
         self.symbol = symbol
-        self.retry_interval = 3
-        self.max_retries = 5
-        self.fail_threshold = 5
+        self.base_currency = split_symbol(symbol)[0]
+        self.order_store = get_order_store()
+        self.tracker = get_order_tracker()
+
+    def _insufficient_balance(self, size):
+        """Insufficient-balance status if the ledger cannot cover size, else None"""
+        available = get_balance_ledger().free(self.base_currency)
+        if available < float(size):
+            return create_insufficient_balance_status(available=available, required=float(size))
+        return None
 
     def place_market_sell(self, size):
-        """Place a market sell order with retries"""
-        fail_count = 0
-        
-        for attempt in range(self.max_retries):
-            try:
-                sell_order = place_order(
-                    symbol=self.symbol,
-                    side='sell',
-                    order_type='limitGtc',
-                    size=str(size)
-                )
-                
-                if sell_order and is_valid_order(sell_order):
-                    self.logger.info(f"Placed market sell order: {sell_order}")
-                    return sell_order
-                
-                fail_count += 1
-                self.logger.error(f"Failed to place market sell order (attempt {attempt + 1})")
-                
-                if fail_count >= self.fail_threshold:
-                    return create_assumed_complete_status()
-                    
-            except Exception as e:
-                self.logger.error(f"Error placing market sell order (attempt {attempt + 1}): {e}")
-                fail_count += 1
-                
-                if fail_count >= self.fail_threshold:
-                    return create_placement_failed_status(fail_count, str(e))
+        """Place a market sell order; transient API errors are retried by the transport"""
+        try:
+            sell_order = place_order(
+                symbol=self.symbol,
+                side='sell',
+                order_type='limitGtc',
+                size=str(size)
+            )
+            
+            if sell_order and is_valid_order(sell_order):
+                self.logger.info(f"Placed market sell order: {sell_order}")
+                return sell_order
             
-            if attempt < self.max_retries - 1:
-                time.sleep(self.retry_interval)
+            self.logger.error("Failed to place market sell order")
+            return self._insufficient_balance(size) or create_placement_failed_status(1, "Order rejected")
                 
-        return create_placement_failed_status(fail_count, "Max retries exceeded")
+        except Exception as e:
+            self.logger.error(f"Error placing market sell order: {e}")
+            return create_placement_failed_status(1, str(e))
 
     def place_limit_sell(self, size, price):
-        """Place a limit sell order with retries"""
-        fail_count = 0
-        last_error = None
-        
-        for attempt in range(self.max_retries):
-            try:
-                sell_order = place_order(
-                    symbol=self.symbol,
-                    side='sell',
-                    order_type='limitGtc',
-                    size=str(size),
-                    price=price
-                )
-                
-                if sell_order and is_valid_order(sell_order):
-                    self.logger.info(f"Placed limit sell order: price={price}")
-                    return sell_order
-                
-                fail_count += 1
-                self.logger.error(f"Failed to place limit sell order (attempt {attempt + 1})")
-                
-                if "insufficient balance" in str(last_error):
-                    return create_insufficient_balance_status(
-                        available=float(str(last_error).split("has ")[1].split(" ")[0]),
-                        required=float(size)
-                    )
-                    
-            except Exception as e:
-                last_error = e
-                self.logger.error(f"Error placing limit sell order (attempt {attempt + 1}): {e}")
-                fail_count += 1
+        """Place a limit sell order; rejections such as insufficient balance are not retried"""
+        try:
+            sell_order = place_order(
+                symbol=self.symbol,
+                side='sell',
+                order_type='limitGtc',
+                size=str(size),
+                price=price
+            )
             
-            if attempt < self.max_retries - 1:
-                time.sleep(self.retry_interval)
+            if sell_order and is_valid_order(sell_order):
+                self.logger.info(f"Placed limit sell order: price={price}")
+                return sell_order
+            
+            self.logger.error("Failed to place limit sell order")
+            return self._insufficient_balance(size) or create_placement_failed_status(1, "Order rejected")
                 
-        return create_placement_failed_status(fail_count, str(last_error) if last_error else "Unknown error")
+        except Exception as e:
+            self.logger.error(f"Error placing limit sell order: {e}")
+            return create_placement_failed_status(1, str(e))
 
     def cancel_order(self, order_id):
-        """Cancel an existing order with retries"""
-        fail_count = 0
-        
-        for attempt in range(self.max_retries):
-            try:
-                result = cancel_order(order_id)
-                if result:
-                    self.logger.info(f"Cancelled order {order_id}")
-                    return True
-                
-                fail_count += 1
-                self.logger.error(f"Failed to cancel order {order_id} (attempt {attempt + 1})")
-                
-                if fail_count >= self.fail_threshold:
-                    return None
-                    
-            except Exception as e:
-                self.logger.error(f"Error cancelling order (attempt {attempt + 1}): {e}")
-                fail_count += 1
-                
-                if fail_count >= self.fail_threshold:
-                    return None
+        """Cancel an existing order; transient API errors are retried by the transport"""
+        try:
+            result = cancel_order(order_id)
+            if result:
+                self.logger.info(f"Cancelled order {order_id}")
+                return True
             
-            if attempt < self.max_retries - 1:
-                time.sleep(self.retry_interval)
+            self.logger.error(f"Failed to cancel order {order_id}")
+            return False
                 
-        return False
-
-    def get_order_status(self, order_id):
-        """Get detailed order status with retries"""
-        fail_count = 0
-        
-        for attempt in range(self.max_retries):
-            try:
-                active_orders = get_active_orders(self.symbol)
-                for order in active_orders:
-                    if order['orderId'] == order_id:
-                        return {
-                            'status': 'active',
-                            'executed_size': float(order['executedSize']),
-                            'remaining_size': self.get_remaining_size(order)
-                        }
+        except Exception as e:
+            self.logger.error(f"Error cancelling order: {e}")
+            return False
 
-                history = get_order_history(self.symbol, limit=50)
-                for order in history:
-                    if order['orderId'] == order_id:
-                        return {
-                            'status': order['status'],
-                            'executed_size': float(order['executedSize']),
-                            'remaining_size': 0 if order['status'] == 'closed' else self.get_remaining_size(order)
-                        }
-                
-                fail_count += 1
-                if fail_count >= self.fail_threshold:
-                    return {
-                        'status': 'closed',
-                        'executed_size': None,
-                        'remaining_size': 0
-                    }
-                        
-            except Exception as e:
-                self.logger.error(f"Error getting order status (attempt {attempt + 1}): {e}")
-                fail_count += 1
-                
-                if fail_count >= self.fail_threshold:
-                    return {
-                        'status': 'closed',
-                        'executed_size': None,
-                        'remaining_size': 0
-                    }
-            
-            if attempt < self.max_retries - 1:
-                time.sleep(self.retry_interval)
-                
+    def _final_status(self, order_id):
+        order = self.order_store.get_order(order_id)
+        if order and order.get('status') in FINAL_STATUSES:
+            return {
+                'status': order['status'],
+                'executed_size': float(order['executedSize']),
+                'remaining_size': 0 if order['status'] == 'closed' else self.get_remaining_size(order)
+            }
         return None
 
+    def _lookup_order(self, order_id):
+        # Finished orders never change, so the local store answers for them
+        status = self._final_status(order_id)
+        if status:
+            return status
+
+        active_orders = get_active_orders(self.symbol)
+        for order in active_orders:
+            if order['orderId'] == order_id:
+                return {
+                    'status': 'active',
+                    'executed_size': float(order['executedSize']),
+                    'remaining_size': self.get_remaining_size(order)
+                }
+
+        # Only history rows the store has not seen yet cross the wire
+        self.order_store.sync_history(self.symbol)
+        status = self._final_status(order_id)
+        if status:
+            return status
+
+        raise retry.ApiError(None, f"Order {order_id} not found", retryable=True)
+
+    def _tracked_status(self, order_id):
+        """Status from the order tracker when it can be trusted, else None"""
+        tracked = self.tracker.get(order_id)
+        if tracked is None or tracked.vanished:
+            return None
+        if tracked.state == FILLED:
+            return {'status': 'closed', 'executed_size': tracked.executed, 'remaining_size': 0}
+        # Other states (and a cancel's final executed size) are only current
+        # while the order stream is delivering updates
+        if not self.tracker.live:
+            return None
+        if tracked.state == CANCELLED:
+            return {'status': 'cancelled', 'executed_size': tracked.executed, 'remaining_size': tracked.size - tracked.executed}
+        return {'status': 'active', 'executed_size': tracked.executed, 'remaining_size': tracked.remaining}
+
+    def get_order_status(self, order_id):
+        """Get detailed order status, retrying briefly while the order is not yet visible"""
+        status = self._tracked_status(order_id)
+        if status:
+            return status
+        try:
+            return retry.call(None, lambda deadline: self._lookup_order(order_id), ORDER_LOOKUP_POLICY)
+        except Exception as e:
+            self.logger.error(f"Error getting order status: {e}")
+            return {
+                'status': 'closed',
+                'executed_size': None,
+                'remaining_size': 0
+            }
+
     def get_remaining_size(self, order):
         """Calculate remaining size for partially filled orders"""
         try:
-            executed_size = Decimal(order['executedSize'])
-            total_size = Decimal(order['size'])
-            return float(total_size - executed_size)
+            pair = get_pair_spec(self.symbol)
+            if not pair:
+                return float(order['size']) - float(order['executedSize'])
+            # Both are wire strings on the lot grid; subtract whole lots
+            remaining = pair.size_lots(order['size'], NEAREST) - pair.size_lots(order['executedSize'], NEAREST)
+            return pair.size_scale.to_float(remaining)
         except Exception as e:
             self.logger.error(f"Error calculating remaining size: {e}")
             return None
\ No newline at end of file
@@ -1,10 +1,10 @@
 import logging
-from decimal import Decimal
-from api.market_api import get_ticker
+from api.market_api import get_current_price, get_order_book
 
 class PriceMonitor:
-    def __init__(self, first_order_offset=0.02):
+    def __init__(self, first_order_offset=0.02, symbol=None):
         self.logger = logging.getLogger(__name__)
+        self.symbol = symbol  # Enables order book pricing when set
         self.last_known_price = None
         self.highest_tracked_price = None
         self.first_order_offset_pct = first_order_offset
@@ -12,20 +12,23 @@ class PriceMonitor:
     def get_current_price(self, symbol):
         """Get current market price with validation"""
         try:
-            ticker = get_ticker(symbol)
-            if ticker and 'price' in ticker:
-                price = float(ticker['price'])
-                if price > 0:
-                    self.last_known_price = price
-                    # Update highest tracked price if this is a new high
-                    if self.highest_tracked_price is None or price > self.highest_tracked_price:
-                        self.highest_tracked_price = price
-                    return price
+            # Served from the WebSocket feed when it is up
+            price = get_current_price(symbol)
+            if price and price > 0:
+                return self.observe(price)
             return self.last_known_price
         except Exception as e:
             self.logger.error(f"Error getting current price: {e}")
             return self.last_known_price
 
+    def observe(self, price):
+        """Record a valid price from any source"""
+        self.last_known_price = price
+        # Update highest tracked price if this is a new high
+        if self.highest_tracked_price is None or price > self.highest_tracked_price:
+            self.highest_tracked_price = price
+        return price
+
     def calculate_price_deviation(self, current_price, order_price, target_deviation):
         """Calculate if price deviation exceeds threshold"""
         try:
@@ -66,6 +69,12 @@ class PriceMonitor:
             # Calculate minimum acceptable price (trailing stop level)
             min_acceptable_price = reference_price * (1 - deviation_pct / 100)
             
+            # A resting sell joins the ask queue, so price from the best ask when the book is live
+            book = get_order_book(self.symbol) if self.symbol else None
+            best_ask = book.best_ask() if book else None
+            if best_ask:
+                current_price = best_ask
+
             # Use the higher of current price and minimum acceptable price
             trailing_price = max(current_price, min_acceptable_price)
             
@@ -73,7 +82,10 @@ class PriceMonitor:
             markup = trailing_price * (self.first_order_offset_pct / 100)
             final_price = trailing_price + markup
             
-            self.logger.info(f"Calculated trailing price: {final_price} (current: {current_price}, highest: {reference_price}, deviation: {deviation_pct}%, offset: {self.first_order_offset_pct}%)")
+            self.logger.info(
+                "Calculated trailing price: %s (current: %s, highest: %s, deviation: %s%%, offset: %s%%)",
+                final_price, current_price, reference_price, deviation_pct, self.first_order_offset_pct
+            )
             return final_price
             
         except Exception as e:
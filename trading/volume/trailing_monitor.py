@@ -1,8 +1,13 @@
 import logging
 import time
 import threading
+from api.retry import Backoff
+from utils.tracing import trace, span
 from .order_status import is_valid_order
 
+MIN_ADJUSTMENT_INTERVAL = 3  # seconds between re-prices of the trailing sell
+POLL_INTERVAL = 1  # seconds between checks of the market price
+
 class TrailingMonitor:
     def __init__(self, symbol, price_monitor, order_manager, balance_manager):
         self.logger = logging.getLogger(__name__)
@@ -12,14 +17,18 @@ class TrailingMonitor:
         self.balance_manager = balance_manager
         self.is_running = True
         self.monitor_thread = None
-        self.min_adjustment_interval = 3
-        self.error_retry_interval = 3
+        self.stop_event = threading.Event()
+        self.min_adjustment_interval = MIN_ADJUSTMENT_INTERVAL
+        self.poll_interval = POLL_INTERVAL
+        self.error_backoff = Backoff(base=0.5, max_delay=10)
         self.max_balance_check_attempts = 5
         self.max_sell_attempts = 3
         
     def start_monitoring(self, initial_size, price_deviation_pct, setup_new_grid_callback):
         # Reset price tracking for new cycle
         self.price_monitor.reset_tracking()
+        self.stop_event.clear()
+        self.error_backoff.reset()
         
         self.monitor_thread = threading.Thread(
             target=self._monitor_loop,
@@ -77,6 +86,7 @@ class TrailingMonitor:
                     if current_order and is_valid_order(current_order):
                         current_time = time.time()
                         current_price = self.price_monitor.get_current_price(self.symbol)
+                        detected = time.perf_counter()
                         
                         if current_price:
                             current_order_price = float(current_order['price'])
@@ -87,24 +97,29 @@ class TrailingMonitor:
                             )
 
                             if needs_adjustment and current_time - last_adjustment_time >= self.min_adjustment_interval:
-                                order_status = self.order_manager.get_order_status(current_order['orderId'])
-                                if order_status and order_status['remaining_size'] > 0:
-                                    if self.order_manager.cancel_order(current_order['orderId']):
-                                        new_price = self.price_monitor.calculate_trailing_price(
-                                            current_price,
-                                            price_deviation_pct
-                                        )
-                                        current_order = self.order_manager.place_limit_sell(
-                                            order_status['remaining_size'],
-                                            new_price
-                                        )
-                                        if is_valid_order(current_order):
-                                            last_adjustment_time = current_time
-                                            self.logger.info(f"Adjusted sell order price to {new_price}")
-                                        else:
-                                            current_order = None
+                                with trace('trailing_reprice', started=detected, order_id=current_order['orderId']):
+                                    with span('order_status'):
+                                        order_status = self.order_manager.get_order_status(current_order['orderId'])
+                                    if order_status and order_status['remaining_size'] > 0:
+                                        with span('cancel_order'):
+                                            cancelled = self.order_manager.cancel_order(current_order['orderId'])
+                                        if cancelled:
+                                            with span('trailing_price'):
+                                                new_price = self.price_monitor.calculate_trailing_price(
+                                                    current_price,
+                                                    price_deviation_pct
+                                                )
+                                            current_order = self.order_manager.place_limit_sell(
+                                                order_status['remaining_size'],
+                                                new_price
+                                            )
+                                            if is_valid_order(current_order):
+                                                last_adjustment_time = current_time
+                                                self.logger.info("Adjusted sell order price to %s", new_price)
+                                            else:
+                                                current_order = None
                     
-                    time.sleep(self.error_retry_interval)
+                    self.stop_event.wait(self.poll_interval)
                     continue
 
                 # Check available balance
@@ -139,7 +154,7 @@ class TrailingMonitor:
                 else:
                     # No sufficient balance and no active orders
                     zero_balance_attempts += 1
-                    self.logger.warning(f"Zero balance check attempt {zero_balance_attempts}/{self.max_balance_check_attempts}")
+                    self.logger.warning("Zero balance check attempt %d/%d", zero_balance_attempts, self.max_balance_check_attempts)
                     
                     if zero_balance_attempts >= self.max_balance_check_attempts:
                         # Double check no active orders and no significant balance
@@ -149,14 +164,16 @@ class TrailingMonitor:
                                 setup_new_grid_callback()
                                 return
 
-                time.sleep(1)
+                self.error_backoff.reset()
+                self.stop_event.wait(self.poll_interval)
 
             except Exception as e:
                 self.logger.error(f"Error in monitoring loop: {e}")
                 if current_order and is_valid_order(current_order):
                     self.order_manager.cancel_order(current_order['orderId'])
                 current_order = None
-                time.sleep(self.error_retry_interval)
+                # Back off harder while errors persist, but wake immediately on stop()
+                self.stop_event.wait(self.error_backoff.next())
 
         if remaining_size <= 0:
             # Final check for any remaining balance
@@ -166,5 +183,6 @@ class TrailingMonitor:
 
     def stop(self):
         self.is_running = False
+        self.stop_event.set()
         if self.monitor_thread and self.monitor_thread.is_alive():
             self.monitor_thread.join()
\ No newline at end of file
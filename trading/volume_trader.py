@@ -16,7 +16,7 @@ class VolumeTrader:
         # Initialize components
         self.balance_manager = BalanceManager(symbol)
         self.order_manager = OrderManager(symbol)
-        self.price_monitor = PriceMonitor(first_order_offset)
+        self.price_monitor = PriceMonitor(first_order_offset, symbol)
         self.delay_manager = DelayManager(min_delay, max_delay, delay_callback)
         self.trailing_monitor = TrailingMonitor(
             symbol,
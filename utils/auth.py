@@ -1,26 +1,59 @@
 import hmac
 import hashlib
 import base64
+import json
 import time
 from config.api_config import API_KEY, API_SECRET
 
+class RequestSigner:
+    """Signs Arkham requests with a key decoded once and a prepared HMAC"""
+
+    def __init__(self, api_key=API_KEY, api_secret=API_SECRET):
+        self.api_key = api_key
+        self._api_key_bytes = api_key.encode('utf-8')
+        # Keyed HMAC state is built once; each signature starts from a copy
+        self._hmac = hmac.new(base64.b64decode(api_secret), digestmod=hashlib.sha256)
+        self._static_headers = {
+            'Arkham-Api-Key': api_key,
+            'Content-Type': 'application/json',
+            'Accept': 'application/json'
+        }
+
+    def encode(self, data):
+        """Serialize a request body once, into the exact bytes that are signed and sent"""
+        return json.dumps(data, separators=(',', ':')).encode('utf-8')
+
+    def signature(self, expires, method, path, body=b''):
+        """Base64 HMAC-SHA256 of key, expiry, method, path and body"""
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        mac = self._hmac.copy()
+        mac.update(self._api_key_bytes)
+        mac.update(f"{expires}{method}{path}".encode('utf-8'))
+        mac.update(body)
+        return base64.b64encode(mac.digest()).decode('ascii')
+
+    def sign(self, method, path, body=b''):
+        """Build auth headers for a request whose body is already encoded"""
+        timestamp = str(int((time.time() + 300) * 1_000_000))
+        headers = dict(self._static_headers)
+        headers['Arkham-Expires'] = timestamp
+        headers['Arkham-Signature'] = self.signature(timestamp, method, path, body)
+        return headers
+
+    def sign_json(self, method, path, data):
+        """Encode a JSON body and sign it, returning (headers, body bytes)"""
+        body = self.encode(data)
+        return self.sign(method, path, body), body
+
+_signer = None
+
+def get_signer():
+    """Get the shared signer for the configured API key"""
+    global _signer
+    if _signer is None:
+        _signer = RequestSigner()
+    return _signer
+
 def generate_auth_headers(method, path, body=''):
-    timestamp = str(int((time.time() + 300) * 1_000_000))
-    message = f"{API_KEY}{timestamp}{method}{path}{body}"
-    
-    secret_bytes = base64.b64decode(API_SECRET)
-    signature = hmac.new(
-        secret_bytes,
-        message.encode('utf-8'),
-        hashlib.sha256
-    ).digest()
-    
-    signature_b64 = base64.b64encode(signature).decode('ascii')
-    
-    return {
-        'Arkham-Api-Key': API_KEY,
-        'Arkham-Expires': timestamp,
-        'Arkham-Signature': signature_b64,
-        'Content-Type': 'application/json',
-        'Accept': 'application/json'
-    }
\ No newline at end of file
+    return get_signer().sign(method, path, body)
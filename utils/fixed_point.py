@@ -0,0 +1,195 @@
+"""
+Fixed-point prices and sizes.
+
+A Scale is one pair's tick or lot. Values on it are whole numbers of steps
+held as Python ints: parsed straight from API strings, compared and summed
+as ints and formatted straight back to wire strings. Nothing goes through
+Decimal, and no rounding decision rests on float division alone, so "0.29"
+is 29 ticks of 0.01 rather than 28.999999999999996 floored to 28.
+
+Quantizing takes a float shortcut when the value is clearly clear of a
+rounding boundary and reads the exact decimal digits only when it is not.
+"""
+import math
+from functools import total_ordering
+
+DOWN = 'down'
+UP = 'up'
+NEAREST = 'nearest'
+
+# Fraction of a step a float quotient may be off by; far above the ~1e-16
+# relative error of one conversion and one division
+GUARD = 1e-9
+RELATIVE_GUARD = 1e-12
+# Below this many units, units / factor printed to `decimals` places is exact
+FORMAT_LIMIT = 10 ** 15
+
+def parse(value):
+    """Exact (mantissa, exponent) of a number, value == mantissa * 10**exponent.
+
+    Strings are read digit by digit; floats through their shortest repr,
+    which is what str() and the API show for them.
+    """
+    if isinstance(value, int):
+        return value, 0
+    if isinstance(value, Fixed):
+        return value.steps * value.scale.step_units, -value.scale.decimals
+    text = value.strip() if isinstance(value, str) else repr(float(value))
+    negative = text.startswith('-')
+    mantissa, _, exponent = text.lstrip('+-').lower().partition('e')
+    whole, _, frac = mantissa.partition('.')
+    digits = int(whole + frac or '0')
+    if negative:
+        digits = -digits
+    return digits, (int(exponent) if exponent else 0) - len(frac)
+
+def divide(numerator, denominator, rounding=NEAREST):
+    """numerator / denominator as an int, rounded; denominator must be positive"""
+    quotient, remainder = divmod(numerator, denominator)
+    if rounding == DOWN:
+        return quotient
+    if rounding == UP:
+        return quotient + (remainder > 0)
+    return quotient + (2 * remainder >= denominator)
+
+def to_units(value, decimals, rounding=NEAREST):
+    """value as a whole number of 10**-decimals"""
+    mantissa, exponent = parse(value)
+    shift = exponent + decimals
+    if shift >= 0:
+        return mantissa * 10 ** shift
+    return divide(mantissa, 10 ** -shift, rounding)
+
+def decimals_of(value):
+    """Decimal places a number needs, trailing zeros ignored ("0.010" -> 2)"""
+    mantissa, exponent = parse(value)
+    while mantissa and mantissa % 10 == 0 and exponent < 0:
+        mantissa //= 10
+        exponent += 1
+    return max(0, -exponent)
+
+class Scale:
+    """Step size of a price or size grid, e.g. Scale('0.01')"""
+
+    __slots__ = ('decimals', 'factor', 'step_units', 'step', 'spec')
+
+    def __init__(self, step):
+        self.decimals = decimals_of(step)
+        self.factor = 10 ** self.decimals
+        self.step_units = to_units(step, self.decimals)  # step in 10**-decimals
+        if self.step_units <= 0:
+            raise ValueError(f"Step must be positive: {step}")
+        self.step = self.step_units / self.factor
+        self.spec = f".{self.decimals}f"
+
+    def steps(self, value, rounding=NEAREST):
+        """Whole number of steps in value, rounded once from its exact digits"""
+        kind = type(value)
+        if kind is float or kind is str:
+            quotient = float(value) / self.step
+            if quotient >= 0:
+                whole = int(quotient)
+                guard = GUARD + quotient * RELATIVE_GUARD
+            else:
+                whole = math.floor(quotient)
+                guard = GUARD - quotient * RELATIVE_GUARD
+            frac = quotient - whole
+            if rounding is NEAREST:
+                if frac - 0.5 > guard or 0.5 - frac > guard:
+                    return whole + (frac > 0.5)
+            elif guard < frac < 1 - guard:
+                return whole + (rounding is UP)
+        elif kind is Fixed and value.scale is self:
+            return value.steps
+        mantissa, exponent = parse(value)
+        shift = exponent + self.decimals
+        if shift >= 0:
+            return divide(mantissa * 10 ** shift, self.step_units, rounding)
+        return divide(mantissa, self.step_units * 10 ** -shift, rounding)
+
+    def parse(self, value, rounding=NEAREST):
+        return Fixed(self.steps(value, rounding), self)
+
+    def format(self, steps):
+        """Wire string for a number of steps, with exactly `decimals` places"""
+        units = steps * self.step_units
+        if not self.decimals:
+            return str(units)
+        if -FORMAT_LIMIT < units < FORMAT_LIMIT:
+            # The nearest float to units / factor prints back as exactly those digits
+            return format(units / self.factor, self.spec)
+        whole, frac = divmod(abs(units), self.factor)
+        return f"{'-' if units < 0 else ''}{whole}.{frac:0{self.decimals}d}"
+
+    def to_float(self, steps):
+        # int / int is correctly rounded, unlike steps * step
+        return steps * self.step_units / self.factor
+
+    def __call__(self, steps):
+        return Fixed(steps, self)
+
+    def __repr__(self):
+        return f"Scale('{self.format(1)}')"
+
+@total_ordering
+class Fixed:
+    """A whole number of steps on a Scale; arithmetic stays on that scale"""
+
+    __slots__ = ('steps', 'scale')
+
+    def __init__(self, steps, scale):
+        self.steps = steps
+        self.scale = scale
+
+    def _steps_of(self, other):
+        if isinstance(other, Fixed):
+            if other.scale is not self.scale and (other.scale.step_units, other.scale.decimals) != (
+                    self.scale.step_units, self.scale.decimals):
+                raise ValueError(f"Cannot mix {self.scale} and {other.scale}")
+            return other.steps
+        if other == 0:
+            return 0
+        return NotImplemented
+
+    def __add__(self, other):
+        steps = self._steps_of(other)
+        return steps if steps is NotImplemented else Fixed(self.steps + steps, self.scale)
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        steps = self._steps_of(other)
+        return steps if steps is NotImplemented else Fixed(self.steps - steps, self.scale)
+
+    def __mul__(self, other):
+        if isinstance(other, int):
+            return Fixed(self.steps * other, self.scale)
+        return NotImplemented
+
+    __rmul__ = __mul__
+
+    def __neg__(self):
+        return Fixed(-self.steps, self.scale)
+
+    def __eq__(self, other):
+        steps = self._steps_of(other)
+        return steps if steps is NotImplemented else self.steps == steps
+
+    def __lt__(self, other):
+        steps = self._steps_of(other)
+        return steps if steps is NotImplemented else self.steps < steps
+
+    def __hash__(self):
+        return hash((self.steps, self.scale.step_units, self.scale.decimals))
+
+    def __bool__(self):
+        return self.steps != 0
+
+    def __float__(self):
+        return self.scale.to_float(self.steps)
+
+    def __str__(self):
+        return self.scale.format(self.steps)
+
+    def __repr__(self):
+        return f"Fixed('{self}')"
@@ -1,12 +1,228 @@
+"""
+Queued logging: trading threads only enqueue records, a background writer
+formats them and does the console and file I/O.
+
+Records are formatted on the writer thread when their arguments are plain
+values, so `logger.info("price %s", price)` costs the caller little more
+than the level check. The writer drains whatever is queued and writes it
+with one write and one flush per sink. The log file is JSONL (one compact
+object per record, `extra=` fields included) with size-based rotation.
+Levels can be set per module through LOG_LEVELS or
+ARKHAM_LOG_LEVELS="api.transport=DEBUG,...". If the queue is full, records
+are dropped and counted rather than blocking the caller.
+"""
+import atexit
+import json
 import logging
+import os
+import queue
+import sys
+import threading
+from decimal import Decimal
+from logging.handlers import QueueHandler
+from config.api_config import (
+    LOG_LEVEL,
+    LOG_LEVELS,
+    LOG_FILE,
+    LOG_FILE_FORMAT,
+    LOG_MAX_BYTES,
+    LOG_BACKUPS,
+    LOG_QUEUE_SIZE
+)
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+MAX_BATCH = 1000  # records per write
+
+# Argument types that cannot change between enqueueing and formatting
+IMMUTABLE_ARGS = frozenset((str, int, float, bool, bytes, Decimal, type(None)))
+
+# Attributes every LogRecord has; anything else came in through extra=
+RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+class JsonFormatter(logging.Formatter):
+    """One compact JSON object per record"""
+
+    def format(self, record):
+        event = {
+            't': round(record.created, 6),
+            'lvl': record.levelname,
+            'mod': record.name,
+            'thr': record.threadName,
+            'msg': record.getMessage()
+        }
+        for key, value in record.__dict__.items():
+            if key not in RECORD_ATTRS:
+                event[key] = value
+        if record.exc_info:
+            event['exc'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            event['exc'] = record.exc_text
+        return json.dumps(event, default=str, separators=(',', ':'))
+
+class DroppingQueueHandler(QueueHandler):
+    """Enqueue without blocking; count what does not fit"""
+
+    def __init__(self, log_queue, max_size):
+        super().__init__(log_queue)
+        self.max_size = max_size
+        self.dropped = 0
+
+    def enqueue(self, record):
+        # SimpleQueue has no bound of its own but is much cheaper to put into than Queue
+        if self.queue.qsize() >= self.max_size:
+            self.dropped += 1
+        else:
+            self.queue.put_nowait(record)
+
+    def handle(self, record):
+        # The queue is thread-safe, skip the handler lock
+        if self.filter(record):
+            self.enqueue(self.prepare(record))
+            return True
+        return False
+
+    def prepare(self, record):
+        # Leave formatting to the writer thread unless an argument could still change
+        args = record.args if type(record.args) is tuple else (record.args,)
+        if record.exc_info:
+            return super().prepare(record)
+        for arg in args:
+            if type(arg) not in IMMUTABLE_ARGS:
+                return super().prepare(record)
+        return record
+
+class StreamSink:
+    def __init__(self, stream, formatter):
+        self.stream = stream
+        self.formatter = formatter
+
+    def write(self, records):
+        self.stream.write(''.join(self.formatter.format(record) + '\n' for record in records))
+        self.stream.flush()
+
+    def close(self):
+        pass
+
+class RotatingFileSink:
+    """Appends to path, rolling over to path.1 ... path.<backups> past max_bytes"""
+
+    def __init__(self, path, formatter, max_bytes=LOG_MAX_BYTES, backups=LOG_BACKUPS):
+        self.path = path
+        self.formatter = formatter
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.file = open(path, 'ab')
+        self.size = self.file.tell()
+
+    def write(self, records):
+        chunk = []
+        for record in records:
+            line = (self.formatter.format(record) + '\n').encode('utf-8')
+            if self.max_bytes and self.size and self.size + len(line) > self.max_bytes:
+                self.file.write(b''.join(chunk))
+                chunk = []
+                self.rotate()
+            chunk.append(line)
+            self.size += len(line)
+        self.file.write(b''.join(chunk))
+        self.file.flush()
+
+    def rotate(self):
+        self.file.close()
+        if self.backups:
+            for i in range(self.backups - 1, 0, -1):
+                if os.path.exists(f"{self.path}.{i}"):
+                    os.replace(f"{self.path}.{i}", f"{self.path}.{i + 1}")
+            os.replace(self.path, f"{self.path}.1")
+            self.file = open(self.path, 'ab')
+        else:
+            self.file = open(self.path, 'wb')
+        self.size = 0
+
+    def close(self):
+        self.file.close()
+
+class LogWriter:
+    """Background thread that drains the queue in batches into the sinks"""
+
+    _STOP = object()
+
+    def __init__(self, log_queue, sinks):
+        self.queue = log_queue
+        self.sinks = sinks
+        self.thread = threading.Thread(target=self._run, name='log-writer', daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.queue.put(self._STOP)
+        self.thread.join()
+        for sink in self.sinks:
+            sink.close()
+
+    def _run(self):
+        while True:
+            batch = [self.queue.get()]
+            while len(batch) < MAX_BATCH:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            stopping = batch[-1] is self._STOP
+            records = [record for record in batch if record is not self._STOP]
+            for sink in self.sinks:
+                try:
+                    sink.write(records)
+                except Exception as e:
+                    sys.stderr.write(f"Log writer failed: {e}\n")
+            if stopping:
+                return
+
+_writer = None
+_queue_handler = None
+
+def set_module_levels(levels):
+    """Per-module levels, e.g. {'api.transport': 'DEBUG'}"""
+    for name, level in levels.items():
+        logging.getLogger(name.strip()).setLevel(str(level).strip().upper())
+
+def setup_logger(level=LOG_LEVEL, log_file=LOG_FILE, file_format=LOG_FILE_FORMAT, module_levels=LOG_LEVELS,
+                 max_bytes=LOG_MAX_BYTES, backups=LOG_BACKUPS, queue_size=LOG_QUEUE_SIZE, stream=None):
+    """Route all logging through a queue to a background console and file writer"""
+    global _writer, _queue_handler
+    stop_logging()
+
+    sinks = [StreamSink(stream or sys.stderr, logging.Formatter(TEXT_FORMAT))]
+    if log_file:
+        formatter = JsonFormatter() if file_format == 'jsonl' else logging.Formatter(TEXT_FORMAT)
+        sinks.append(RotatingFileSink(log_file, formatter, max_bytes, backups))
+
+    log_queue = queue.SimpleQueue()
+    _queue_handler = DroppingQueueHandler(log_queue, queue_size)
+    _writer = LogWriter(log_queue, sinks)
+    _writer.start()
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(_queue_handler)
+    root.setLevel(level)
+    set_module_levels(module_levels)
+    return logging.getLogger(__name__)
+
+def stop_logging():
+    """Flush queued records and stop the writer"""
+    global _writer, _queue_handler
+    if _writer is not None:
+        logging.getLogger().removeHandler(_queue_handler)
+        _writer.stop()
+        if _queue_handler.dropped:
+            sys.stderr.write(f"Logging queue dropped {_queue_handler.dropped} records\n")
+        _writer = None
+        _queue_handler = None
+
+def dropped_records():
+    return _queue_handler.dropped if _queue_handler else 0
 
-def setup_logger():
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.StreamHandler(),
-            logging.FileHandler('trading_bot.log')
-        ]
-    )
-    return logging.getLogger(__name__)
\ No newline at end of file
+atexit.register(stop_logging)
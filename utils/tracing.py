@@ -0,0 +1,171 @@
+"""
+Lightweight span tracing for the bot's reaction paths.
+
+A trace covers one reaction (a fill turning into a new take-profit, a
+re-grid, a trailing re-price) from the moment the trigger was detected to
+the exchange's ack of our last order. Each stage inside it is a span with
+perf_counter timestamps, so the trace shows where every millisecond went.
+Spans opened on a thread without an active trace cost one attribute lookup.
+
+Finished traces are kept in a ring buffer. Dump them with the GUI button or
+SIGUSR1, then summarize a dump with:
+
+    python -m utils.tracing traces.jsonl
+"""
+import contextlib
+import json
+import sys
+import threading
+import time
+from collections import deque
+from config.api_config import TRACE_BUFFER_SIZE, TRACE_DUMP_FILE
+
+_NO_SPAN = contextlib.nullcontext()
+
+class Trace:
+    def __init__(self, kind, started=None, **attrs):
+        self.kind = kind
+        self.attrs = attrs
+        self.wall_time = time.time()
+        self.entered = time.perf_counter()
+        self.start = started if started is not None else self.entered
+        self.end = None
+        self.depth = 0
+        self.spans = []  # (name, start, end, depth)
+        if started is not None:
+            # Time between detecting the trigger and starting to react to it
+            self.spans.append(('pending', started, self.entered, 0))
+
+    def to_dict(self):
+        return {
+            'kind': self.kind,
+            'time': self.wall_time,
+            'total_ms': round((self.end - self.start) * 1000, 3),
+            'attrs': self.attrs,
+            'spans': [
+                {
+                    'name': name,
+                    'start_ms': round((start - self.start) * 1000, 3),
+                    'duration_ms': round((end - start) * 1000, 3),
+                    'depth': depth
+                }
+                for name, start, end, depth in sorted(self.spans, key=lambda s: s[1])
+            ]
+        }
+
+class Span:
+    __slots__ = ('trace', 'name', 'start', 'depth')
+
+    def __init__(self, trace, name):
+        self.trace = trace
+        self.name = name
+
+    def __enter__(self):
+        self.depth = self.trace.depth
+        self.trace.depth += 1
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.trace.spans.append((self.name, self.start, time.perf_counter(), self.depth))
+        self.trace.depth -= 1
+        return False
+
+class Tracer:
+    def __init__(self, size=TRACE_BUFFER_SIZE):
+        self.local = threading.local()
+        self.buffer = deque(maxlen=size)
+        self.lock = threading.Lock()
+
+    def current(self):
+        return getattr(self.local, 'trace', None)
+
+    @contextlib.contextmanager
+    def trace(self, kind, started=None, **attrs):
+        """Trace one reaction; started is the perf_counter time the trigger was detected.
+
+        Inside another trace on the same thread this is just a span.
+        """
+        if self.current() is not None:
+            with self.span(kind):
+                yield self.current()
+            return
+        trace = Trace(kind, started, **attrs)
+        self.local.trace = trace
+        try:
+            yield trace
+        except BaseException as e:
+            trace.attrs['error'] = type(e).__name__
+            raise
+        finally:
+            trace.end = time.perf_counter()
+            self.local.trace = None
+            with self.lock:
+                self.buffer.append(trace)
+
+    def span(self, name):
+        """Time a stage of the current trace; a no-op outside a trace"""
+        trace = getattr(self.local, 'trace', None)
+        if trace is None:
+            return _NO_SPAN
+        return Span(trace, name)
+
+    def traces(self):
+        with self.lock:
+            return [trace.to_dict() for trace in self.buffer]
+
+    def dump(self, path=TRACE_DUMP_FILE):
+        """Append the buffered traces to a JSONL file and clear the buffer; returns how many"""
+        with self.lock:
+            traces = [trace.to_dict() for trace in self.buffer]
+            self.buffer.clear()
+        with open(path, 'a') as f:
+            for trace in traces:
+                f.write(json.dumps(trace, separators=(',', ':')) + '\n')
+        return len(traces)
+
+def summarize(traces):
+    """Per reaction kind: count, total and per-stage p50/max in milliseconds"""
+    by_kind = {}
+    for trace in traces:
+        kind = by_kind.setdefault(trace['kind'], {'total': [], 'stages': {}})
+        kind['total'].append(trace['total_ms'])
+        for span in trace['spans']:
+            name = '  ' * span['depth'] + span['name']
+            kind['stages'].setdefault(name, []).append(span['duration_ms'])
+
+    def stats(values):
+        values = sorted(values)
+        return {'count': len(values), 'p50': values[len(values) // 2], 'max': values[-1]}
+
+    return {
+        kind: {
+            'total': stats(data['total']),
+            'stages': {name: stats(values) for name, values in data['stages'].items()}
+        }
+        for kind, data in by_kind.items()
+    }
+
+_tracer = Tracer()
+
+def get_tracer():
+    return _tracer
+
+def trace(kind, started=None, **attrs):
+    return _tracer.trace(kind, started, **attrs)
+
+def span(name):
+    return _tracer.span(name)
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else TRACE_DUMP_FILE
+    with open(path) as f:
+        traces = [json.loads(line) for line in f if line.strip()]
+    for kind, data in summarize(traces).items():
+        total = data['total']
+        print(f"{kind}: {total['count']} traces, p50 {total['p50']:.1f} ms, max {total['max']:.1f} ms")
+        for name, stage in data['stages'].items():
+            print(f"  {name:<40} n={stage['count']:<5} p50 {stage['p50']:>8.1f} ms  max {stage['max']:>8.1f} ms")
+
+if __name__ == "__main__":
+    main()